@@ -1,10 +1,12 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
+import { studentService } from '../services/api';
+import { LoadMore } from './ui/load-more';
 
 const IssueDetails = () => {
   const [issues, setIssues] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const { token, user } = useAuth();
   const navigate = useNavigate();
@@ -23,12 +25,9 @@ const IssueDetails = () => {
       }
 
       try {
-        const response = await axios.get('http://localhost:8000/api/my-issues/', {
-          headers: {
-            Authorization: `Bearer ${token.access}`,
-          },
-        });
-        setIssues(response.data);
+        const page = await studentService.getIssues();
+        setIssues(page.results);
+        setNextCursor(page.nextCursor);
         setLoading(false);
       } catch (error) {
         console.error('Error fetching issues:', error);
@@ -40,6 +39,12 @@ const IssueDetails = () => {
     fetchIssues();
   }, [token, user, navigate]);
 
+  const loadMore = async (cursor) => {
+    const page = await studentService.getIssues({ cursor });
+    setIssues(loaded => [...loaded, ...page.results]);
+    setNextCursor(page.nextCursor);
+  };
+
   const getStatusColor = (status) => {
     switch (status?.toLowerCase()) {
       case 'resolved':
@@ -106,6 +111,7 @@ const IssueDetails = () => {
                     </div>
                   </div>
                 ))}
+                <LoadMore cursor={nextCursor} onLoad={loadMore} />
               </div>
             ) : (
               <div className="text-center py-8">
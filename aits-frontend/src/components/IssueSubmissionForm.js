@@ -2,6 +2,7 @@ import React, { useState, useEffect, useCallback } from "react";
 import { useNavigate } from "react-router-dom";
 import { useDispatch, useSelector } from 'react-redux';
 import { createIssue, fetchStudentData } from '../redux/actions/studentActions';
+import { studentService } from '../services/api';
 import { Alert, AlertDescription } from './ui/alert';
 
 const IssueSubmissionForm = () => {
@@ -142,11 +143,13 @@ const IssueSubmissionForm = () => {
     issueData.append('programme', formData.programme);
     issueData.append('student_no', formData.student_no);
     
-    if (formData.attachments) {
-      issueData.append('attachments', formData.attachments);
-    }
-    
     try {
+      // The file goes up in resumable chunks first, the issue only carries its upload id
+      if (formData.attachments) {
+        const uploadId = await studentService.uploadAttachment(formData.attachments);
+        issueData.append('upload_id', uploadId);
+      }
+
       await dispatch(createIssue(issueData));
       setSuccessMessage('Issue submitted successfully!');
       
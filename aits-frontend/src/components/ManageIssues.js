@@ -8,6 +8,7 @@ import {
   assignIssue 
 } from '../redux/actions/registrarActions';
 import { Alert, AlertDescription } from './ui/alert';
+import { LoadMore } from './ui/load-more';
 
 const ManageIssues = () => {
   const dispatch = useDispatch();
@@ -431,6 +432,7 @@ useEffect(() => {
                       ))}
                     </tbody>
                   </table>
+                  <LoadMore cursor={issuesState.nextCursor} onLoad={(cursor) => dispatch(fetchAllIssues(cursor))} />
                 </div>
               ) : (
                 <div className="text-center py-8">
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useSelector, useDispatch } from 'react-redux';
 import { fetchIssues } from '../redux/actions/studentActions';
 import { useNavigate } from 'react-router-dom';
+import { LoadMore } from './ui/load-more';
 
 const ViewIssues = () => {
   const dispatch = useDispatch();
@@ -11,7 +12,7 @@ const ViewIssues = () => {
   const [statusFilter, setStatusFilter] = useState('all');
   const [searchTerm, setSearchTerm] = useState('');
 
-  const { issues, loading, error } = useSelector(state => state.issues || {});
+  const { issues, nextCursor, loading, error } = useSelector(state => state.issues || {});
 
   useEffect(() => {
     dispatch(fetchIssues());
@@ -143,6 +144,9 @@ const ViewIssues = () => {
                 </tbody>
               </table>
             </div>
+            <div className="pb-4">
+              <LoadMore cursor={nextCursor} onLoad={(cursor) => dispatch(fetchIssues(cursor))} />
+            </div>
           </div>
         )}
         
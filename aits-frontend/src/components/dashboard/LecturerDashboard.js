@@ -2,7 +2,9 @@ import React, { useEffect, useState } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
 import { useNavigate } from 'react-router-dom';
 import { logoutUser } from '../../redux/actions/authActions';
-import { fetchAssignedIssues, fetchResolvedIssues, resolveIssue } from '../../redux/actions/LecturerActions';
+import { fetchAssignedIssues, fetchResolvedIssues, resolveIssue, applyIssueEvent } from '../../redux/actions/LecturerActions';
+import { eventService, ISSUE_POLL_INTERVAL } from '../../services/api';
+import { LoadMore } from '../ui/load-more';
 
 const LecturerDashboard = () => {
   const dispatch = useDispatch();
@@ -20,9 +22,9 @@ const LecturerDashboard = () => {
   console.log('Full lecturer state:', lecturerState);
   
   // Destructure Issues From the Redux State
-  const { loading, issues, resolvedIssues, error } = useSelector(state => {
+  const { loading, issues, resolvedIssues, nextCursor, resolvedNextCursor, error } = useSelector(state => {
     return state.lecturer || {
-      loading: false, issues: [], resolvedIssues: [], error: null
+      loading: false, issues: [], resolvedIssues: [], nextCursor: null, resolvedNextCursor: null, error: null
     }
   });
 
@@ -41,13 +43,35 @@ const LecturerDashboard = () => {
       .catch(err => console.error("Fetch resolved error:", err));
   }, [dispatch]);
 
+  // Apply issue changes as they happen; a resync means some were missed, so refetch.
+  // Without a stream (the server isn't running under ASGI) poll instead.
+  useEffect(() => {
+    let poll = null;
+    const refetch = () => {
+      dispatch(fetchAssignedIssues());
+      dispatch(fetchResolvedIssues());
+    };
+    const close = eventService.subscribe((event) => {
+      if (event.type === 'resync') {
+        refetch();
+      } else {
+        dispatch(applyIssueEvent(event));
+      }
+    }, {
+      onUnavailable: () => {
+        poll = setInterval(refetch, ISSUE_POLL_INTERVAL);
+      },
+    });
+    return () => {
+      close();
+      clearInterval(poll);
+    };
+  }, [dispatch]);
+
   const handleResolve = async (issueId) => {
     try {
       console.log('Attempting to resolve issue ID:', issueId);
       await dispatch(resolveIssue(issueId));
-      // Refetch issues after resolving
-      dispatch(fetchAssignedIssues());
-      dispatch(fetchResolvedIssues());
       return true;
     } catch (error) {
       console.error('Failed: to resolve Issue', { issueId, error });
@@ -151,15 +175,15 @@ const LecturerDashboard = () => {
           </div>
         </header>
         <main className="p-6">
-          {/* Dashboard Summary */}
+          {/* Dashboard Summary, counts of the loaded pages ('+' while there are more) */}
           <div className="grid grid-cols-2 gap-4 mb-6">
             <div className="bg-white shadow rounded-lg p-4">
               <h3 className="text-lg font-semibold text-gray-700">Assigned Issues</h3>
-              <p className="text-2xl font-bold text-green-600">{issues.length}</p>
+              <p className="text-2xl font-bold text-green-600">{issues.length}{nextCursor ? '+' : ''}</p>
             </div>
             <div className="bg-white shadow rounded-lg p-4">
               <h3 className="text-lg font-semibold text-gray-700">Resolved Issues</h3>
-              <p className="text-2xl font-bold text-blue-600">{resolvedIssues ? resolvedIssues.length : 0}</p>
+              <p className="text-2xl font-bold text-blue-600">{resolvedIssues ? resolvedIssues.length : 0}{resolvedNextCursor ? '+' : ''}</p>
             </div>
           </div>
 
@@ -204,6 +228,7 @@ const LecturerDashboard = () => {
                       ))}
                     </tbody>
                   </table>
+                  <LoadMore cursor={nextCursor} onLoad={(cursor) => dispatch(fetchAssignedIssues(cursor))} />
                 </div>
               )}
             </>
@@ -241,6 +266,7 @@ const LecturerDashboard = () => {
                       ))}
                     </tbody>
                   </table>
+                  <LoadMore cursor={resolvedNextCursor} onLoad={(cursor) => dispatch(fetchResolvedIssues(cursor))} />
                 </div>
               )}
             </>
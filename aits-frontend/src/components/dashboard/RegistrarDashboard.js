@@ -2,9 +2,9 @@ import React, { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useSelector, useDispatch } from 'react-redux';
 import { Alert, AlertDescription } from '../ui/alert';
-import { fetchAllIssues, fetchRegistrarData, assignIssue } from '../../redux/actions/registrarActions';
+import { fetchAllIssues, fetchRegistrarData, assignIssue, applyIssueEvent } from '../../redux/actions/registrarActions';
 import { logoutUser } from '../../redux/actions/authActions';
-import { authService } from '../../services/api';
+import { registrarService, eventService, ISSUE_POLL_INTERVAL } from '../../services/api';
 
 const RegistrarDashboard = () => {
   const dispatch = useDispatch();
@@ -16,17 +16,17 @@ const RegistrarDashboard = () => {
     loading: issuesLoading = true,
     error: issuesError = null
   } = useSelector(state => state.registrar.issues);
-  const [users, setUsers] = useState(null);
+  const [lecturers, setLecturers] = useState(null);
 
+  // Every lecturer for the assignee picker; the directory isn't paginated, unlike /users/
   useEffect(() => {
-    const users = authService.fetchUsers()
-      .then(users => setUsers(users))
+    registrarService.getLecturers()
+      .then(lecturers => setLecturers(lecturers))
       .catch(error => {
-        console.error('Error fetching users:', error);
+        console.error('Error fetching lecturers:', error);
       });
   }, []);
 
-  console.log({ users })
   const {
     totalIssues = 0,
     pendingIssues = 0,
@@ -42,6 +42,30 @@ const RegistrarDashboard = () => {
       .catch(err => console.error('Error fetching registrar data:', err));
   }, [dispatch]);
 
+  // Apply issue changes as they happen; a resync means some were missed, so refetch.
+  // Without a stream (the server isn't running under ASGI) poll instead.
+  useEffect(() => {
+    let poll = null;
+    const refetch = () => {
+      dispatch(fetchAllIssues());
+    };
+    const close = eventService.subscribe((event) => {
+      if (event.type === 'resync') {
+        refetch();
+      } else {
+        dispatch(applyIssueEvent(event));
+      }
+    }, {
+      onUnavailable: () => {
+        poll = setInterval(refetch, ISSUE_POLL_INTERVAL);
+      },
+    });
+    return () => {
+      close();
+      clearInterval(poll);
+    };
+  }, [dispatch]);
+
   const handleLogout = async () => {
     try {
       await dispatch(logoutUser());
@@ -221,7 +245,7 @@ const RegistrarDashboard = () => {
                           <td className="px-4 py-3">{issue.programme}</td>
                           <td className="px-4 py-3">{issue.registration_no}</td>
                           {/* <td ClassName="px-4 py-3">{issue.assigned_to || 'Unassigned'}</td> */}
-                          <td className="px-4 py-3"><AssigneeSelect issue={issue} users={users || []} onChange={handleAssigneeChange} /></td>
+                          <td className="px-4 py-3"><AssigneeSelect issue={issue} lecturers={lecturers || []} onChange={handleAssigneeChange} /></td>
                           <td className="px-4 py-3">
                             <span className={`px-2 py-1 rounded-full text-xs ${issue.status === 'resolved'
                               ? 'bg-green-100 text-green-800'
@@ -253,8 +277,8 @@ const RegistrarDashboard = () => {
   );
 };
 
-function AssigneeSelect({ users, issue, onChange }) {
-  const assignedTo = users.filter(u => u.id === issue.assigned_to)[0] || null
+function AssigneeSelect({ lecturers, issue, onChange }) {
+  const assignedTo = lecturers.filter(u => u.id === issue.assigned_to)[0] || null
   console.log({ assignedTo })
   return <select
     className="appearance-none rounded relative block w-full px-3 py-2 border border-gray-300 text-gray-900 focus:outline-none focus:ring-green-500 focus:border-green-500"
@@ -271,13 +295,13 @@ function AssigneeSelect({ users, issue, onChange }) {
       >
         Unassigned
     </option>
-  {users.filter(u => u.role === "lecturer").map((user, i) => (
+  {lecturers.map((lecturer, i) => (
     <option key={i}
       className="hover:bg-green-500 hover:text-white"
-      value={user.id}
-      selected={assignedTo?.id === user.id}
+      value={lecturer.id}
+      selected={assignedTo?.id === lecturer.id}
       >
-        {user.username} - {user.role}
+        {lecturer.first_name} {lecturer.last_name} - {lecturer.department}
     </option>
   ))}
   </select>
@@ -1,7 +1,11 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../context/AuthContext';
-import axios from 'axios';
+import { studentService } from '../../services/api';
+import { LoadMore } from '../ui/load-more';
+
+// The api client refreshes an expired token itself and only fails once that fails too
+const sessionExpired = (err) => err.message === 'Session expired' || err.response?.status === 401;
 
 const StudentDashboard = () => {
 const navigate = useNavigate();
@@ -9,6 +13,7 @@ const { user, logout } = useAuth();
 
 const [profileData, setProfileData] = useState(null);
 const [issues, setIssues] = useState([]);
+const [nextCursor, setNextCursor] = useState(null);
 const [profileLoading, setProfileLoading] = useState(true);
 const [issuesLoading, setIssuesLoading] = useState(true);
 const [error, setError] = useState(null);
@@ -35,17 +40,12 @@ const fetchStudentData = async () => {
   }
   
   try {
-    const response = await axios.get('http://localhost:8000/api/student/profile/', {
-      headers: {
-        Authorization: `Bearer ${accessToken}`,
-      },
-    });
-    setProfileData(response.data);
+    setProfileData(await studentService.getProfile());
   } catch (err) {
     console.error("Error fetching profile data:", err);
     
     // Check If Error Is Due To Expired Token
-    if (err.response && err.response.status === 401) {
+    if (sessionExpired(err)) {
       setError("Your session has expired. Please log in again.");
       // Optional: Redirect To Login
       // Navigate('/login');
@@ -60,7 +60,18 @@ const fetchStudentData = async () => {
 fetchStudentData();
 }, [getAuthToken, navigate]);
 
-// Fetch Issues
+// One page of issues, only what the dashboard shows (sparse fieldset)
+const fetchIssuePage = useCallback((cursor) => (
+studentService.getIssues({ cursor, params: { fields: 'id,course_unit,description,status' } })
+), []);
+
+const loadMoreIssues = async (cursor) => {
+const page = await fetchIssuePage(cursor);
+setIssues(loaded => [...loaded, ...page.results]);
+setNextCursor(page.nextCursor);
+};
+
+// Fetch The First Page Of Issues
 useEffect(() => {
 const fetchIssues = async () => {
   const accessToken = getAuthToken();
@@ -71,17 +82,14 @@ const fetchIssues = async () => {
   }
   
   try {
-    const response = await axios.get('http://localhost:8000/api/my-issues/', {
-      headers: {
-        Authorization: `Bearer ${accessToken}`,
-      },
-    });
-    setIssues(response.data);
+    const page = await fetchIssuePage();
+    setIssues(page.results);
+    setNextCursor(page.nextCursor);
   } catch (err) {
     console.error("Error fetching issues:", err);
     // Don't Set Error Here To Avoid Duplicate Error Messages
     // If Profile Fetch Already Failed
-    if (!error && err.response && err.response.status === 401) {
+    if (!error && sessionExpired(err)) {
       setError("Your session has expired. Please log in again.");
     }
   } finally {
@@ -90,13 +98,14 @@ const fetchIssues = async () => {
 };
 
 fetchIssues();
-}, [getAuthToken, error]);
+}, [getAuthToken, fetchIssuePage, error]);
 
-// Derived Stats Based On Issues
+// Derived Stats Based On The Loaded Issues, '+' While There Are More Pages
+const more = nextCursor ? '+' : '';
 const statsData = {
-totalIssues: issues?.length || 0,
-resolvedIssues: issues?.filter(issue => issue.status === 'resolved').length || 0,
-pendingIssues: issues?.filter(issue => issue.status !== 'resolved').length || 0
+totalIssues: `${issues?.length || 0}${more}`,
+resolvedIssues: `${issues?.filter(issue => issue.status === 'resolved').length || 0}${more}`,
+pendingIssues: `${issues?.filter(issue => issue.status !== 'resolved').length || 0}${more}`
 };
 
 // Loading And Error States
@@ -253,6 +262,9 @@ const navItems = [
               </div>
             </div>
           </div>
+          <div className="-mt-6 mb-8">
+            <LoadMore cursor={nextCursor} onLoad={loadMoreIssues} />
+          </div>
           
           {/* Profile Information */}
           <div className="bg-white rounded-lg shadow mb-8">
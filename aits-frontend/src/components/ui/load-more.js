@@ -0,0 +1,33 @@
+// src/components/ui/load-more.js
+import React, { useState } from 'react';
+
+// Shown under a paginated list while there is a next page. onLoad(cursor) should
+// fetch that page and return a promise; the button is disabled until it settles.
+export const LoadMore = ({ cursor, onLoad }) => {
+  const [loading, setLoading] = useState(false);
+
+  if (!cursor) return null;
+
+  const handleClick = async () => {
+    setLoading(true);
+    try {
+      await onLoad(cursor);
+    } catch (error) {
+      console.error('Error loading more:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div className="flex justify-center pt-4">
+      <button
+        onClick={handleClick}
+        disabled={loading}
+        className="px-4 py-2 text-sm text-green-600 border border-green-600 rounded-md hover:bg-green-50 disabled:opacity-50"
+      >
+        {loading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
+};
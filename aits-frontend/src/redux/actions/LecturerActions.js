@@ -1,12 +1,12 @@
 import { lecturerService } from '../../services/api';
 
-// Action to fetch resolved issues
-export const fetchResolvedIssues = () => async (dispatch) => {
-  dispatch({ type: 'FETCH_ISSUES_REQUEST' });
+// Action to fetch resolved issues, one page at a time (pass nextCursor to append the next page)
+export const fetchResolvedIssues = (cursor) => async (dispatch) => {
+  if (!cursor) dispatch({ type: 'FETCH_ISSUES_REQUEST' });
 
   try {
-    const resolvedIssues = await lecturerService.getResolvedIssues();
-    dispatch({ type: 'FETCH_RESOLVED_ISSUES_SUCCESS', payload: resolvedIssues });
+    const { results, nextCursor } = await lecturerService.getResolvedIssues({ cursor });
+    dispatch({ type: 'FETCH_RESOLVED_ISSUES_SUCCESS', payload: { issues: results, nextCursor, append: Boolean(cursor) } });
   } catch (error) {
     dispatch({ type: 'FETCH_RESOLVED_ISSUES_FAILURE', payload: error.message });
   }
@@ -17,21 +17,26 @@ export const resolveIssue = (issueId) => async (dispatch) => {
   try {
     await lecturerService.resolveIssue(issueId);
     dispatch({ type: 'RESOLVE_ISSUE_SUCCESS', payload: issueId });
-    await dispatch(fetchResolvedIssues())
+    // Refetch even though the issue.resolved event would update the lists: the
+    // event stream isn't there when the server doesn't run under ASGI
+    await dispatch(fetchResolvedIssues());
     await dispatch(fetchAssignedIssues());
   } catch (error) {
     dispatch({ type: 'RESOLVE_ISSUE_FAILURE', payload: error.message });
   }
 };
 
-// Action to fetch all assigned issues for the lecturer
+// Live update from eventService
+export const applyIssueEvent = (event) => ({ type: 'ISSUE_EVENT', payload: event });
+
+// Action to fetch the lecturer's assigned issues, one page at a time (pass nextCursor to append the next page)
 // In your LecturerActions.js
-export const fetchAssignedIssues = () => async (dispatch) => {
+export const fetchAssignedIssues = (cursor) => async (dispatch) => {
   try {
     console.log('Starting to fetch assigned issues');
-    const issues = await lecturerService.getAssignedIssues();
-    console.log('Fetched assigned issues:', issues);
-    dispatch({ type: 'FETCH_ASSIGNED_ISSUES_SUCCESS', payload: issues });
+    const { results, nextCursor } = await lecturerService.getAssignedIssues({ cursor });
+    console.log('Fetched assigned issues:', results);
+    dispatch({ type: 'FETCH_ASSIGNED_ISSUES_SUCCESS', payload: { issues: results, nextCursor, append: Boolean(cursor) } });
   } catch (error) {
     console.error('Error fetching assigned issues:', error);
     dispatch({ type: 'FETCH_ASSIGNED_ISSUES_FAILURE', payload: error.message });
@@ -65,4 +70,24 @@ export const markNotificationAsRead = (notificationId) => async (dispatch) => {
   } catch (error) {
     dispatch({ type: 'MARK_NOTIFICATION_AS_READ_FAILURE', payload: error.message });
   }
-};
\ No newline at end of file
+};
+
+// Action to mark several (or, without ids, all) notifications as read
+export const markNotificationsAsRead = (notificationIds) => async (dispatch) => {
+  try {
+    const { unread } = await lecturerService.markNotificationsAsRead(notificationIds);
+    dispatch({ type: 'MARK_NOTIFICATIONS_AS_READ_SUCCESS', payload: { ids: notificationIds, unread } });
+  } catch (error) {
+    dispatch({ type: 'MARK_NOTIFICATION_AS_READ_FAILURE', payload: error.message });
+  }
+};
+
+// Action to fetch the unread badge count
+export const fetchUnreadNotificationCount = () => async (dispatch) => {
+  try {
+    const unread = await lecturerService.getUnreadNotificationCount();
+    dispatch({ type: 'FETCH_UNREAD_COUNT_SUCCESS', payload: unread });
+  } catch (error) {
+    dispatch({ type: 'FETCH_NOTIFICATIONS_FAILURE', payload: error.message });
+  }
+};
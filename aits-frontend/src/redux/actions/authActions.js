@@ -134,7 +134,11 @@ export const loginUser = (credentials, loginType) => async (dispatch) => {
     
     return { success: true, userType: loginType };
   } catch (err) {
-    const errorMessage = err.response?.data?.message || 'Login failed. Please check your credentials.';
+    let errorMessage = err.response?.data?.message || 'Login failed. Please check your credentials.';
+    if (err.response?.status === 429) {
+      const wait = err.response.headers?.['retry-after'];
+      errorMessage = `Too many login attempts. Please try again${wait ? ` in ${wait} seconds` : ' shortly'}.`;
+    }
     dispatch(authFailure(errorMessage));
     return { success: false };
   }
@@ -18,6 +18,8 @@ export const FETCH_LECTURERS_REQUEST = 'FETCH_LECTURERS_REQUEST';
 export const FETCH_LECTURERS_SUCCESS = 'FETCH_LECTURERS_SUCCESS';
 export const FETCH_LECTURERS_FAILURE = 'FETCH_LECTURERS_FAILURE';
 
+export const ISSUE_EVENT = 'ISSUE_EVENT';
+
 // Action Creators for fetchAllIssues
 export const fetchIssuesRequest = () => ({
   type: FETCH_ISSUES_REQUEST
@@ -48,6 +50,12 @@ export const assignIssueFailure = (error) => ({
   payload: error
 });
 
+// Live update from eventService, merged into the issue list by the reducer
+export const applyIssueEvent = (event) => ({
+  type: ISSUE_EVENT,
+  payload: event
+});
+
 // Action Creators for fetchRegistrarData
 export const fetchRegistrarDataRequest = () => ({
   type: REGISTRAR_DATA_REQUEST
@@ -80,12 +88,12 @@ export const fetchLecturersFailure = (error) => ({
 
 // Thunk Action Creators
 
-// Fetch all academic issues
-export const fetchAllIssues = () => async (dispatch) => {
-  dispatch(fetchIssuesRequest());
+// Fetch the first page of academic issues, or with a cursor append the next page
+export const fetchAllIssues = (cursor) => async (dispatch) => {
+  if (!cursor) dispatch(fetchIssuesRequest());
   try {
-    const data = await registrarService.getAllIssues();
-    dispatch(fetchIssuesSuccess(data));
+    const data = await registrarService.getAllIssues({ cursor });
+    dispatch(fetchIssuesSuccess({ ...data, append: Boolean(cursor) }));
     return data;
   } catch (error) {
     const errorMessage = error.response?.data?.message || 'Failed to fetch issues';
@@ -79,12 +79,14 @@ export const createIssueFailure = (error) => ({
 
 // Thunk Action Creators
 
-export const fetchIssues = () => async (dispatch) => {
-  dispatch({ type: FETCH_ISSUES_REQUEST });
+// Loads the first page, or with the previous page's nextCursor appends the next one
+export const fetchIssues = (cursor) => async (dispatch) => {
+  if (!cursor) dispatch({ type: FETCH_ISSUES_REQUEST });
   try {
-    const issues = await studentService.getIssues();
-    dispatch({ type: FETCH_ISSUES_SUCCESS, payload: issues });
-    return issues;
+    const { results, nextCursor } = await studentService.getIssues({ cursor });
+    const payload = { issues: results, nextCursor, append: Boolean(cursor) };
+    dispatch({ type: FETCH_ISSUES_SUCCESS, payload });
+    return payload;
   } catch (error) {
     dispatch({ type: FETCH_ISSUES_FAILURE, payload: error.message });
     throw error;
@@ -1,12 +1,18 @@
 const initialState = {
 
     issues: [], // List of issues assigned to the lecturer
+    nextCursor: null, // Next page of assigned issues, null when all are loaded
     issueDetails: null, // Details of a specific issue
     notifications: [], // List of notifications for the lecturer
+    unreadCount: 0, // Unread notification badge
     error: null, // Error messages
     loading: false, // Loading state for API calls
     resolvedIssues: [], // List of resolved issues
+    resolvedNextCursor: null, // Next page of resolved issues
   };
+
+  // A page replaces the list, or with append set adds to the end of it
+  const withPage = (list, { issues, append }) => (append ? [...list, ...issues] : issues);
   
   const LecturerReducer = (state = initialState, action) => {
     switch (action.type) {
@@ -22,6 +28,25 @@ const initialState = {
           error: action.payload,
         };
   
+      // Live issue updates from the event stream
+      case 'ISSUE_EVENT': {
+        const { type, issue } = action.payload;
+        if (!issue) return state;
+        const others = state.issues.filter((item) => item.id !== issue.id);
+        const current = state.issues.find((item) => item.id === issue.id) || {};
+        if (type === 'issue.resolved') {
+          return {
+            ...state,
+            issues: others,
+            resolvedIssues: [{ ...current, ...issue }, ...state.resolvedIssues.filter((item) => item.id !== issue.id)],
+          };
+        }
+        if (type === 'issue.unassigned') {
+          return { ...state, issues: others };
+        }
+        return { ...state, issues: [{ ...current, ...issue }, ...others] };
+      }
+
       // Fetch Assigned Issues
       case 'FETCH_ASSIGNED_ISSUES_REQUEST':
         return {
@@ -32,7 +57,8 @@ const initialState = {
         case 'FETCH_ASSIGNED_ISSUES_SUCCESS':
           return {
             ...state,
-            issues: action.payload,
+            issues: withPage(state.issues, action.payload),
+            nextCursor: action.payload.nextCursor,
             loading: false,
           };
         case 'FETCH_ASSIGNED_ISSUES_FAILURE':
@@ -46,7 +72,8 @@ const initialState = {
           case 'FETCH_RESOLVED_ISSUES_SUCCESS':
             return {
               ...state,
-              resolvedIssues: action.payload,
+              resolvedIssues: withPage(state.resolvedIssues, action.payload),
+              resolvedNextCursor: action.payload.nextCursor,
               loading: false,
             };
           case 'FETCH_RESOLVED_ISSUES_FAILURE':
@@ -105,6 +132,20 @@ const initialState = {
           notifications: state.notifications.filter(
             (notification) => notification.id !== action.payload
           ),
+          unreadCount: Math.max(state.unreadCount - 1, 0),
+        };
+      case 'MARK_NOTIFICATIONS_AS_READ_SUCCESS':
+        return {
+          ...state,
+          notifications: action.payload.ids
+            ? state.notifications.filter((notification) => !action.payload.ids.includes(notification.id))
+            : [],
+          unreadCount: action.payload.unread,
+        };
+      case 'FETCH_UNREAD_COUNT_SUCCESS':
+        return {
+          ...state,
+          unreadCount: action.payload,
         };
       case 'MARK_NOTIFICATION_AS_READ_FAILURE':
         return {
@@ -10,6 +10,7 @@ import {
 
 const initialState = {
   issues: [],
+  nextCursor: null, // Cursor of the next page, null when every issue is loaded
   loading: false,
   error: null,
   submitting: false
@@ -21,7 +22,12 @@ export const issuesReducer = (state = initialState, action) => {
     case FETCH_ISSUES_REQUEST:
       return { ...state, loading: true, error: null };
     case FETCH_ISSUES_SUCCESS:
-      return { ...state, loading: false, issues: action.payload };
+      return {
+        ...state,
+        loading: false,
+        issues: action.payload.append ? [...state.issues, ...action.payload.issues] : action.payload.issues,
+        nextCursor: action.payload.nextCursor
+      };
     case FETCH_ISSUES_FAILURE:
       return { ...state, loading: false, error: action.payload };
       
@@ -10,7 +10,8 @@ import {
   REGISTRAR_DATA_FAILURE,
  FETCH_LECTURERS_REQUEST,
  FETCH_LECTURERS_SUCCESS,
- FETCH_LECTURERS_FAILURE
+ FETCH_LECTURERS_FAILURE,
+ ISSUE_EVENT
 
 } from '../actions/registrarActions';
 
@@ -18,6 +19,7 @@ import {
 const initialState = {
   issues: {
     data: [],
+    nextCursor: null, // Next page of issues, null when all are loaded
     loading: false,
     error: null
   },
@@ -39,6 +41,24 @@ const initialState = {
   }
 };
 
+// Counters from Registrar_issue_counts; they cover every issue, the list only holds the loaded pages
+const issueStats = (stats) => ({
+  totalIssues: stats.total_issues || 0,
+  pendingIssues: stats.pending_issues || 0,
+  resolvedIssues: stats.resolved_issues || 0
+});
+
+// Keep the counters in step with the event stream until the next fetch
+const statsAfterEvent = (stats, type) => {
+  if (type === 'issue.created') {
+    return { ...stats, totalIssues: stats.totalIssues + 1, pendingIssues: stats.pendingIssues + 1 };
+  }
+  if (type === 'issue.resolved') {
+    return { ...stats, pendingIssues: Math.max(stats.pendingIssues - 1, 0), resolvedIssues: stats.resolvedIssues + 1 };
+  }
+  return stats;
+};
+
 // Reducer function to handle all registrar-related actions
 export default function registrarReducer(state = initialState, action) {
   switch (action.type) {
@@ -57,15 +77,12 @@ export default function registrarReducer(state = initialState, action) {
         return {
           ...state,
           issues: {
-            data: issues,
+            data: action.payload.append ? [...state.issues.data, ...issues] : issues,
+            nextCursor: action.payload.nextCursor || null,
             loading: false,
             error: null
           },
-          stats: {
-            totalIssues: issues.length,
-            pendingIssues: issues.filter(issue => issue.status !== 'resolved').length,
-            resolvedIssues: issues.filter(issue => issue.status === 'resolved').length
-          }
+          stats: action.payload.stats ? issueStats(action.payload.stats) : state.stats
         };
     case FETCH_ISSUES_FAILURE:
       return {
@@ -106,6 +123,21 @@ export default function registrarReducer(state = initialState, action) {
         }
       };
       
+    // Live issue updates: merge the delta into the list instead of refetching it
+    case ISSUE_EVENT: {
+      const { type, issue } = action.payload;
+      if (!issue) return state;
+      const exists = state.issues.data.some(item => item.id === issue.id);
+      const data = exists
+        ? state.issues.data.map(item => (item.id === issue.id ? { ...item, ...issue } : item))
+        : [issue, ...state.issues.data];
+      return {
+        ...state,
+        issues: { ...state.issues, data },
+        stats: statsAfterEvent(state.stats, type)
+      };
+    }
+
     // Registrar Data
     case REGISTRAR_DATA_REQUEST:
       return {
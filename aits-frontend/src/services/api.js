@@ -19,6 +19,11 @@ const tokenApi = axios.create({
   },
 });
 
+// Last ETag and body per GET URL. Sending the ETag back as If-None-Match lets the
+// server answer 304 Not Modified without a body, and the cached body is used instead.
+const etagCache = new Map();
+const cacheKey = (config) => api.getUri(config);
+
 // For handling multiple concurrent requests during token refresh
 let isRefreshing = false;
 let failedQueue = [];
@@ -42,6 +47,10 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const cached = config.method === 'get' && etagCache.get(cacheKey(config));
+    if (cached) {
+      config.headers['If-None-Match'] = cached.etag;
+    }
     return config;
   },
   (error) => Promise.reject(error)
@@ -49,9 +58,22 @@ api.interceptors.request.use(
 
 // Handle 401 errors and token refresh
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if (response.config.method === 'get' && response.headers.etag) {
+      etagCache.set(cacheKey(response.config), { etag: response.headers.etag, data: response.data });
+    }
+    return response;
+  },
   async (error) => {
     const originalRequest = error.config;
+
+    // Not modified since we last fetched it, answer with the body we kept
+    if (error.response?.status === 304) {
+      const cached = etagCache.get(cacheKey(originalRequest));
+      if (cached) {
+        return { ...error.response, status: 200, data: cached.data };
+      }
+    }
     
     // If the error is 401 and we haven't tried refreshing yet
     if (error.response?.status === 401 && !originalRequest._retry) {
@@ -96,6 +118,7 @@ api.interceptors.response.use(
       } catch (refreshError) {
         // If refresh fails, clear auth but don't redirect - let app handle it
         processQueue(refreshError, null);
+        etagCache.clear();
         localStorage.removeItem('access');
         localStorage.removeItem('refresh');
         localStorage.removeItem('user');
@@ -111,6 +134,102 @@ api.interceptors.response.use(
   }
 );
 
+// List endpoints are cursor paginated and return { next, previous, results }.
+// Lists load one page at a time: fetchPage resolves with { results, nextCursor },
+// and passing nextCursor back in (from a "Load more" button) gets the next page.
+// nextCursor is null on the last page.
+export const fetchPage = async (url, { cursor, pageSize, params } = {}) => {
+  const response = await api.get(url, {
+    params: { ...params, cursor, page_size: pageSize },
+  });
+  const data = response.data;
+  if (Array.isArray(data)) {
+    return { results: data, nextCursor: null };
+  }
+  // Only keep the opaque cursor, the absolute next URL may use the wrong scheme behind a proxy
+  const nextCursor = data.next ? new URL(data.next).searchParams.get('cursor') : null;
+  return { results: data.results, nextCursor };
+};
+
+// How often dashboards refetch their lists when there is no event stream
+export const ISSUE_POLL_INTERVAL = 30000;
+
+// Live issue updates from /events/ (server-sent events). onEvent gets each
+// {type, issue, previous_assigned_to} delta. The stream is read with fetch rather
+// than EventSource so the access token goes in the Authorization header, not in
+// the URL where access logs would keep it. When the server can't stream (501 when
+// it isn't running under ASGI) or the stream can't be opened, onUnavailable is
+// called once so the caller can poll instead. Returns a function that closes the stream.
+export const eventService = {
+  subscribe: (onEvent, { onUnavailable } = {}) => {
+    const controller = new AbortController();
+    let retry = 5000;
+    let unavailable = false;
+
+    const giveUp = () => {
+      if (!unavailable && !controller.signal.aborted && onUnavailable) onUnavailable();
+      unavailable = true;
+    };
+
+    // One "event: ...\ndata: ..." block; comments (keep-alives) have neither
+    const handleBlock = (block) => {
+      let type = null;
+      const data = [];
+      block.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) type = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+        else if (line.startsWith('retry:')) retry = parseInt(line.slice(6), 10) || retry;
+      });
+      if (type && data.length) onEvent(JSON.parse(data.join('\n')));
+    };
+
+    const connect = async () => {
+      let response;
+      try {
+        await authService.checkTokenExpiration();
+        response = await fetch(`${API_URL}/events/`, {
+          headers: {
+            Accept: 'text/event-stream',
+            Authorization: `Bearer ${localStorage.getItem('access') || ''}`,
+          },
+          signal: controller.signal,
+        });
+      } catch (error) {
+        giveUp();
+        return;
+      }
+      if (!response.ok || !response.body) {
+        giveUp();
+        return;
+      }
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      try {
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          const blocks = buffer.split('\n\n');
+          buffer = blocks.pop();
+          blocks.forEach(handleBlock);
+        }
+      } catch (error) {
+        // Aborted by the caller, or the connection dropped
+      }
+      if (controller.signal.aborted) return;
+      // Reconnect like EventSource would; events sent meanwhile were missed, so resync
+      setTimeout(() => {
+        if (controller.signal.aborted) return;
+        onEvent({ type: 'resync' });
+        connect();
+      }, retry);
+    };
+
+    connect();
+    return () => controller.abort();
+  },
+};
+
 // Auth service
 export const authService = {
   register: async (userData) => {
@@ -150,7 +269,8 @@ export const authService = {
       console.error('Logout API error:', error);
       // Continue with local logout even if API fails
     } finally {
-      // Clear tokens from storage
+      // Clear tokens and cached responses
+      etagCache.clear();
       localStorage.removeItem('access');
       localStorage.removeItem('refresh');
       localStorage.removeItem('user');
@@ -217,10 +337,9 @@ export const authService = {
     }
   },
 
-  fetchUsers: async () => {
+  fetchUsers: async (options) => {
     await authService.checkTokenExpiration();
-    const response = await api.get('/users/');
-    return response.data;
+    return fetchPage('/users/', options);
   }
 };
 export const studentService = {
@@ -230,10 +349,10 @@ export const studentService = {
     return response.data;
   },
   
-  getIssues: async () => {
+  // One page of the student's issues, { results, nextCursor }
+  getIssues: async (options) => {
     await authService.checkTokenExpiration();
-    const response = await api.get('/my-issues/');
-    return response.data;
+    return fetchPage('/my-issues/', options);
   },
   
   // Add the createIssue method
@@ -245,6 +364,40 @@ export const studentService = {
       }
     });
     return response.data;
+  },
+
+  // Uploads a file in chunks and returns the upload id to send with the issue.
+  // A failed chunk is retried from wherever the server says the upload got to.
+  uploadAttachment: async (file, { onProgress, retries = 3 } = {}) => {
+    await authService.checkTokenExpiration();
+    const session = (await api.post('/uploads/', {
+      filename: file.name,
+      size: file.size,
+      content_type: file.type,
+    })).data;
+    let offset = session.received;
+    let failures = 0;
+    while (offset < file.size) {
+      const end = Math.min(offset + session.chunk_size, file.size);
+      try {
+        const response = await api.put(`/uploads/${session.id}/`, file.slice(offset, end), {
+          headers: {
+            'Content-Type': 'application/octet-stream',
+            'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`,
+          },
+        });
+        offset = response.data.received;
+        failures = 0;
+        if (onProgress) onProgress(offset / file.size);
+      } catch (error) {
+        if (error.response && error.response.status !== 409) throw error;
+        failures += 1;
+        if (failures > retries) throw error;
+        offset = (await api.get(`/uploads/${session.id}/`)).data.received;
+      }
+    }
+    await api.post(`/uploads/${session.id}/complete/`);
+    return session.id;
   }};
 
 // Issue services
@@ -258,19 +411,22 @@ export const registrarService = {
     return response.data;
   },
   
-  // Get all academic issues
-  getAllIssues: async () => {
+  // Get a page of academic issues; the first page also brings the counts
+  getAllIssues: async (options = {}) => {
     await authService.checkTokenExpiration();
     
-    // Get issues
-    const issuesResponse = await api.get('registrar/issues/');
+    const page = await fetchPage('registrar/issues/', options);
+    if (options.cursor) {
+      return { issues: page.results, nextCursor: page.nextCursor };
+    }
     
-    // Get statistics separately
+    // Get statistics separately, they cover every issue and not just the loaded page
     const statsResponse = await api.get('Registrar_issue_counts/');
     
     return { 
-      issues: issuesResponse.data,
-      stats: statsResponse.data  // This should include totalIssues, pendingIssues, resolvedIssues
+      issues: page.results,
+      nextCursor: page.nextCursor,
+      stats: statsResponse.data  // { total_issues, pending_issues, resolved_issues }
     };
   },
   
@@ -294,6 +450,44 @@ assignIssue: async (issueId, lecturerId) => {
     throw error;
   }
 },
+  // Assign many issues to one lecturer in a single request
+  assignIssues: async (issueIds, lecturerId) => {
+    await authService.checkTokenExpiration();
+    const response = await api.post('/assign-issues/', {
+      issue_ids: issueIds.map(id => parseInt(id, 10)),
+      user_id: parseInt(lecturerId, 10)
+    });
+    return response.data; // { assigned, results: [{ issue_id, result }], assigned_to }
+  },
+
+  // Let the server pick the least loaded lecturer of each issue's department (or of `department`)
+  autoAssignIssues: async (issueIds, department) => {
+    await authService.checkTokenExpiration();
+    const response = await api.post('/auto-assign-issues/', {
+      issue_ids: issueIds.map(id => parseInt(id, 10)),
+      ...(department ? { department } : {})
+    });
+    return response.data; // { assigned, results: [{ issue_id, result, assigned_to, department }] }
+  },
+
+  // Open, in-progress and resolved-this-week counts per lecturer and per department
+  getLecturerWorkload: async (department) => {
+    await authService.checkTokenExpiration();
+    const response = await api.get('/registrar/lecturer-workload/', { params: department ? { department } : {} });
+    return response.data; // { lecturers: [...], departments: [...] }
+  },
+
+  // Download every issue as 'csv' or 'xlsx', optionally filtered by { status, category, search }
+  exportIssues: async (fileFormat = 'csv', params = {}) => {
+    await authService.checkTokenExpiration();
+    const response = await api.get(`/registrar/issues/export/${fileFormat}/`, { params, responseType: 'blob' });
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(response.data);
+    link.download = `issues.${fileFormat}`;
+    link.click();
+    URL.revokeObjectURL(link.href);
+  },
+
   // Get dashboard data
   getDashboardData: async () => {
     await authService.checkTokenExpiration();
@@ -325,18 +519,18 @@ assignIssue: async (issueId, lecturerId) => {
   },
   
   // Get resolved issues
-  getResolvedIssues: async () => {
+  getResolvedIssues: async (options) => {
     await authService.checkTokenExpiration();
-    const response = await api.get('/resolved-issues/');
-    return response.data;
+    return fetchPage('/resolved-issues/', options);
   },
   
   getLecturers: async () => {
     await authService.checkTokenExpiration();
     try {
-      const response = await api.get('/search-lecturers/');
-      console.log("Lecturers API response:", response.data);
-      return response.data;
+      // Not paginated, the whole directory comes back at once
+      const { results: lecturers } = await fetchPage('/search-lecturers/');
+      console.log("Lecturers API response:", lecturers);
+      return lecturers;
     } catch (error) {
       console.error("Error fetching lecturers:", error);
       throw error;
@@ -347,17 +541,12 @@ assignIssue: async (issueId, lecturerId) => {
 
 export const lecturerService = {
   
-  getAssignedIssues: async () => {
-    const response = await api.get('/assigned-issues/', {
-      headers: {
-        Authorization: `Bearer ${localStorage.getItem('access')}`,
-      },
-    });
-    return response.data;
+  // One page each, { results, nextCursor }
+  getAssignedIssues: async (options) => {
+    return fetchPage('/assigned-issues/', options);
   },
-  getResolvedIssues: async () => {
-    const response = await api.get('/resolved-issues/');
-    return response.data;
+  getResolvedIssues: async (options) => {
+    return fetchPage('/resolved-issues/', options);
   },
 
   getIssueDetails: async (issueId) => {
@@ -374,22 +563,32 @@ export const lecturerService = {
     return response.data;
   },
 
-  getNotifications: async () => {
-    const response = await api.get('/api/lecturer/notifications/', {
-      headers: {
-        Authorization: `Bearer ${localStorage.getItem('access')}`,
-      },
-    });
-    return response.data;
+  resolveIssues: async (issueIds) => {
+    const response = await api.post("/resolve-issues/", { issue_ids: issueIds });
+    return response.data; // { resolved, results: [{ issue_id, result }] }
+  },
+
+  // Inbox is cursor paginated; this returns the newest page
+  getNotifications: async ({ unreadOnly = false, cursor } = {}) => {
+    const page = await fetchPage('/notifications/', { cursor, params: unreadOnly ? { unread: 'true' } : {} });
+    return page.results;
+  },
+
+  getUnreadNotificationCount: async () => {
+    const response = await api.get('/notifications/unread-count/');
+    return response.data.unread;
   },
 
   markNotificationAsRead: async (notificationId) => {
-    const response = await api.patch(`/api/lecturer/notifications/${notificationId}/read/`, {}, {
-      headers: {
-        Authorization: `Bearer ${localStorage.getItem('access')}`,
-      },
-    });
+    const response = await api.patch(`/notifications/${notificationId}/read/`);
     return response.data;
+  },
+
+  // Pass a list of ids, or nothing to mark the whole inbox read
+  markNotificationsAsRead: async (notificationIds) => {
+    const body = notificationIds ? { ids: notificationIds } : { all: true };
+    const response = await api.post('/notifications/read/', body);
+    return response.data; // { marked, unread }
   }
 };
 
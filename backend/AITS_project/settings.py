@@ -11,7 +11,12 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 
+import os
 from pathlib import Path
+
+from corsheaders.defaults import default_headers
+
+from .database import database_config, replica_configs
 from unittest.mock import DEFAULT
 
 
@@ -54,6 +59,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'users.instrumentation.InstrumentationMiddleware',  # first, so it times everything below it
+    'users.profiling.ProfilingMiddleware',  # only loaded when PROFILING_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -62,6 +69,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'users.replicas.ReplicaStickinessMiddleware',  # only loaded with DATABASE_REPLICA_URLS
     
     
 ]
@@ -85,20 +93,26 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'AITS_project.wsgi.application'
+ASGI_APPLICATION = 'AITS_project.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# DATABASE_URL overrides this; connection reuse and pooling come from the
+# environment as well, see AITS_project/database.py
 DATABASES = {
-    'default': {
+    'default': database_config({
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': 'railway',
         'USER': 'postgres',
         'PASSWORD': 'wPSswYHgVVdqERgcpLDaWhKSODPYrvxc',
         'HOST': 'shinkansen.proxy.rlwy.net',
         'PORT': '56092'
-    }
+    }, BASE_DIR),
+    **replica_configs(BASE_DIR),
 }
+# Reads of list and detail views go to the replicas, see users/replicas.py
+DATABASE_ROUTERS = ['users.replicas.ReplicaRouter']
 
 
 """DATABASES = {
@@ -138,6 +152,21 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
+# New and upgraded passwords use scrypt (users/hashers.py); existing PBKDF2
+# hashes still verify and are rewritten on the next successful login.
+# Argon2PasswordHasher can go first instead once argon2-cffi is installed.
+PASSWORD_HASHERS = [
+    'users.hashers.TunedScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# Chosen with the bench_password_hashers command: ~60 ms and 16 MB per check,
+# against ~360 ms for PBKDF2 at Django's default 720000 iterations
+PASSWORD_SCRYPT_PARAMS = {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -179,14 +208,28 @@ CORS_ALLOWED_ORIGINS = [
     #"http://localhost:3000",
     "https://aits-frontend-six.vercel.app" # React frontend
 ]
+# Request headers the frontend sends beyond the defaults (conditional GETs, chunked
+# uploads), and response headers it reads
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match', 'content-range')
+CORS_EXPOSE_HEADERS = ['ETag', 'Retry-After']
 
 AUTH_USER_MODEL= 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication with the user and profile cached, see users/authentication.py
+        'users.authentication.CachedJWTAuthentication',
     ),
+    # Every list endpoint is cursor paginated, clients can ask for ?page_size=
+    'DEFAULT_PAGINATION_CLASS': 'users.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # Proxies in front of the app whose X-Forwarded-For entries are trusted for
+    # the client address the login buckets key on (users/ratelimit.py). With 0
+    # it is REMOTE_ADDR, otherwise a client could pick its address by sending
+    # the header itself. Railway's edge is one proxy: NUM_PROXIES=1 there.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
+PAGINATION_MAX_PAGE_SIZE = 200
 
 from datetime import timedelta
 # settings.py
@@ -205,3 +248,154 @@ EMAIL_HOST_USER = 'raymondsuuna05@gmail.com'
 EMAIL_HOST_PASSWORD = 'zchs eeho jehk cbkg'
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+
+# Issue ids (ISSxxxx) are handed out in blocks of this size per worker, see users/allocators.py
+ISSUE_ID_BLOCK_SIZE = 50
+
+# Outgoing mail is queued in the OutboundEmail table and delivered by
+# `python manage.py send_queued_mail --loop` (see users/mail.py)
+MAIL_QUEUE_BATCH_SIZE = 100      # messages sent per SMTP connection
+MAIL_QUEUE_MAX_ATTEMPTS = 5      # give up and mark as failed after this many tries
+MAIL_QUEUE_RETRY_DELAY = 60      # seconds before the first retry, doubled on each failure
+MAIL_QUEUE_LEASE_SECONDS = 300   # how long a worker owns a claimed batch
+
+# Cache used for dashboard statistics. Set REDIS_URL so every worker shares it,
+# otherwise each process keeps its own local copy.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        },
+        'ratelimit': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ratelimit',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'ratelimit': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ratelimit',
+        },
+    }
+
+# Upper bound on how stale the cached issue statistics can get; saves and
+# deletes of an Issue clear them straight away (see users/signals.py)
+ISSUE_STATS_CACHE_TIMEOUT = 300
+
+# Most issues a registrar or lecturer can assign/resolve in one bulk request
+BULK_ISSUE_LIMIT = 500
+
+# Live issue updates on /api/events/ (users/events.py). The in-process broker
+# only reaches streams served by the same ASGI process.
+ISSUE_EVENT_BROKER = 'users.events.InProcessBroker'
+ISSUE_EVENT_QUEUE_SIZE = 100   # events buffered per client before it is told to resync
+ISSUE_EVENT_HEARTBEAT = 20     # seconds between keep-alive comments
+
+# Notification inbox pruning, see the prune_notifications command
+NOTIFICATION_READ_RETENTION_DAYS = 30     # read notifications are kept this long
+NOTIFICATION_UNREAD_RETENTION_DAYS = 180  # unread ones are dropped after this
+
+# Rows fetched per round trip by the streaming issue export
+ISSUE_EXPORT_CHUNK_SIZE = 2000
+
+# Attachments (users/uploads.py). Chunked uploads land in UPLOAD_TEMP_DIR and are
+# stored once per SHA-256 under attachments/sha256/ when completed.
+ATTACHMENT_MAX_SIZE = 10 * 1024 * 1024
+ATTACHMENT_ALLOWED_TYPES = [
+    'application/pdf',
+    'image/png',
+    'image/jpeg',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+]
+UPLOAD_CHUNK_SIZE = 1024 * 1024        # suggested to clients
+UPLOAD_CHUNK_MAX_SIZE = 5 * 1024 * 1024
+UPLOAD_SESSION_EXPIRY_HOURS = 24       # unfinished uploads are removed by clear_stale_uploads
+UPLOAD_TEMP_DIR = os.environ.get('UPLOAD_TEMP_DIR', os.path.join(BASE_DIR, 'upload_tmp'))
+
+# Attachment previews made by the process_attachments worker (users/previews.py)
+PREVIEW_WORKERS = None              # processes in the pool, None = one per CPU
+PREVIEW_BATCH_SIZE = 20
+PREVIEW_THUMBNAIL_SIZE = (320, 320)
+PREVIEW_TEXT_LIMIT = 20000          # characters of extracted text kept per attachment
+PREVIEW_MAX_ATTEMPTS = 3
+
+# Seconds CachedJWTAuthentication keeps a user (and profile) cached between requests
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Addresses allowed to scrape /metrics (an empty list allows everyone)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Metrics are kept per server process (users/metrics.py) and /metrics answers
+# from the process that gets the scrape. That is fine with one process. With
+# several gunicorn or uvicorn workers, point METRICS_MULTIPROCESS_DIR at a
+# directory they share and empty it before the server starts. Each process
+# then writes its numbers there at most every METRICS_FLUSH_SECONDS, and
+# /metrics adds them all up.
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR') or None
+METRICS_FLUSH_SECONDS = 1
+
+# Login token buckets (users/ratelimit.py) as (burst, tokens refilled per
+# second), kept per server process in the 'ratelimit' cache
+LOGIN_RATE_LIMITS = {
+    'ip': (60, 1),          # generous, a lab or hostel shares one address
+    'username': (10, 0.1),  # 10 tries, then one every 10 seconds
+}
+
+# Per-view latency, query count, SQL and serializer time on /metrics
+# (users/instrumentation.py). Serializer time covers the app's serializers
+# with TimedSerializerMixin; DRF itself is not patched. Queries slower than
+# the threshold are logged as JSON lines on the aits.slow_queries logger.
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', '1') == '1'
+SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'users.instrumentation.JsonFormatter'},
+    },
+    'handlers': {
+        'slow_queries': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'loggers': {
+        'aits.slow_queries': {'handlers': ['slow_queries'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# Sampling profiler (users/profiling.py). When enabled, registrars and staff
+# can profile any request by sending "X-Profile: 1"; PROFILING_SAMPLE_RATE
+# also profiles that fraction of requests, only for the url names in
+# PROFILING_VIEWS when it is not empty. Under ASGI, enabling it costs every
+# request an extra thread switch, because the middleware is sync only.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_VIEWS = [name for name in os.environ.get('PROFILING_VIEWS', '').split(',') if name]
+PROFILING_INTERVAL_MS = 5      # how often the request's stack is sampled
+PROFILING_MAX_SECONDS = 30     # sampling stops after this, for streams and stuck requests
+PROFILING_RETENTION_DAYS = 7   # see the request_profiles command
+
+# Seconds a worker answers lecturer typeahead from its in-memory directory
+# (users/directory.py) before checking the database for changes made elsewhere
+LECTURER_DIRECTORY_CHECK_SECONDS = 5
+
+# Lecturer department that auto-assignment (/api/auto-assign-issues/) sends
+# each student programme's issues to, least loaded lecturer first
+AUTO_ASSIGN_DEPARTMENTS = {
+    'BSCS': 'CS',
+    'BSSE': 'CS',
+    'BIT': 'DIT',
+    'BLIS': 'LIS',
+}
+
+# Issues resolved longer ago than this are moved to the archive table by the
+# archive_issues command (users/archive.py)
+ISSUE_ARCHIVE_AFTER_DAYS = 365
+
+# After any write a user reads from the primary database for this long, so
+# their own changes show up before the replicas have caught up
+REPLICA_STICKY_SECONDS = 10
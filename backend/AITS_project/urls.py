@@ -18,11 +18,14 @@ from django.contrib import admin
 from django.urls import path,include
 from django.http import HttpResponse
 
+from users.metrics import metrics_view
+
 def home(request):
     return HttpResponse("Welcome to the Academic Issue Tracking System!")
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/',include('users.urls')),
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape endpoint
     path('', home, name='home')
 ]
@@ -1,8 +1,14 @@
 from django.contrib import admin
-from .models import User, Issue
+from .models import User, Issue, OutboundEmail, Notification, StoredFile, UploadSession, IssuePreview, RequestProfile, LecturerWorkload, ArchivedIssue
 
 
 admin.site.register(User)
 admin.site.register(Issue)
-
-
+admin.site.register(OutboundEmail)
+admin.site.register(Notification)
+admin.site.register(StoredFile)
+admin.site.register(UploadSession)
+admin.site.register(IssuePreview)
+admin.site.register(RequestProfile)
+admin.site.register(LecturerWorkload)
+admin.site.register(ArchivedIssue)
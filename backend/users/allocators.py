@@ -0,0 +1,121 @@
+# users/allocators.py
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+ISSUE_ID_PREFIX = 'ISS'
+ISSUE_SEQUENCE_NAME = 'issue_id'
+
+
+def format_issue_id(number):
+    return f'{ISSUE_ID_PREFIX}{number:04d}'
+
+
+def parse_issue_id(issue_id):
+    # Returns the numeric part of an "ISSxxxx" id, or None if it is not one of ours
+    if not issue_id or not issue_id.startswith(ISSUE_ID_PREFIX):
+        return None
+    try:
+        return int(issue_id[len(ISSUE_ID_PREFIX):])
+    except ValueError:
+        return None
+
+
+def highest_issue_number():
+    # Only used to seed the sequence row the first time it is needed
+    from .models import Issue
+
+    highest = 0
+    for issue_id in Issue.objects.filter(issue_id__startswith=ISSUE_ID_PREFIX).values_list('issue_id', flat=True).iterator():
+        number = parse_issue_id(issue_id)
+        if number and number > highest:
+            highest = number
+    return highest
+
+
+def reserve_block(name, count):
+    """
+    Atomically moves the named sequence forward by `count` and returns the
+    half-open range [start, end) that now belongs to the caller.
+    """
+    from .models import IssueSequence
+
+    with transaction.atomic():
+        updated = IssueSequence.objects.filter(name=name).update(next_value=F('next_value') + count)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    IssueSequence.objects.create(name=name, next_value=highest_issue_number() + 1 + count)
+            except IntegrityError:
+                # Another worker created the row first, take a block from it instead
+                IssueSequence.objects.filter(name=name).update(next_value=F('next_value') + count)
+        # The row is locked by our UPDATE until commit, so this read sees our own increment
+        end = IssueSequence.objects.filter(name=name).values_list('next_value', flat=True).get()
+    return end - count, end
+
+
+class BlockAllocator:
+    """
+    Hands out numbers from a block reserved in the database, so only one insert
+    in every `block_size` has to touch the sequence row. Blocks never overlap,
+    which keeps ids unique across threads, processes and servers. Numbers left
+    in a block when the process exits are simply skipped.
+    """
+
+    def __init__(self, name, block_size=None):
+        self.name = name
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+
+    @property
+    def block_size(self):
+        if self._block_size:
+            return self._block_size
+        return getattr(settings, 'ISSUE_ID_BLOCK_SIZE', 50)
+
+    def next_value(self):
+        with self._lock:
+            if self._next < self._end:
+                value = self._next
+                self._next += 1
+                return value
+
+        start, end = reserve_block(self.name, self.block_size)
+        if transaction.get_connection().in_atomic_block:
+            # The reservation only becomes durable when the caller's transaction
+            # commits. Keep the rest of the block for later inserts only once it
+            # has, otherwise a rollback would let another worker reserve it too.
+            transaction.on_commit(lambda: self._install(start + 1, end))
+        else:
+            self._install(start + 1, end)
+        return start
+
+    def take(self, count):
+        # Reserves `count` fresh numbers for bulk inserts, bypassing the cached block
+        start, end = reserve_block(self.name, count)
+        return range(start, end)
+
+    def reset(self):
+        with self._lock:
+            self._next = self._end = 0
+
+    def _install(self, start, end):
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = start, end
+
+
+issue_id_allocator = BlockAllocator(ISSUE_SEQUENCE_NAME)
+
+
+def allocate_issue_id():
+    return format_issue_id(issue_id_allocator.next_value())
+
+
+def allocate_issue_ids(count):
+    return [format_issue_id(number) for number in issue_id_allocator.take(count)]
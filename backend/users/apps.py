@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class UsersConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'users'
+
+    def ready(self):
+        # Connect the model signal handlers
+        from . import signals  # noqa: F401
+
+        from django.conf import settings
+        if getattr(settings, 'INSTRUMENTATION_ENABLED', True):
+            from . import instrumentation
+            instrumentation.install()
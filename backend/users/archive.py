@@ -0,0 +1,129 @@
+# users/archive.py
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import ArchivedIssue, Issue, IssuePreview, Notification
+from .search import get_search_backend
+from .stats import invalidate_archived_statistics
+
+
+# Issue archival. Issues resolved more than ISSUE_ARCHIVE_AFTER_DAYS ago are
+# moved to ArchivedIssue, ids and issue_ids kept, one batch per transaction:
+# a run that stops halfway leaves every issue either live or archived, and
+# the next run picks up where it stopped. Lists, counters and search work on
+# the live table only; IssueDetailView and the dashboard statistics also
+# read the archive.
+
+COPIED_FIELDS = [field.attname for field in Issue._meta.concrete_fields]
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, 'ISSUE_ARCHIVE_AFTER_DAYS', 365)
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable(cutoff):
+    # Served by issue_resolved_idx, in the order batches take them
+    return Issue.objects.filter(status='resolved', resolved_at__lt=cutoff).order_by('resolved_at', 'id')
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Moves the oldest `batch_size` archivable issues to the archive in one
+    transaction. Returns how many were moved, 0 once there are none left.
+    """
+    with transaction.atomic():
+        rows = list(archivable(cutoff).select_for_update().values(*COPIED_FIELDS)[:batch_size])
+        if not rows:
+            return 0
+        ids = [row['id'] for row in rows]
+        # A copy left by an earlier run is replaced by the current row
+        ArchivedIssue.objects.filter(id__in=ids).delete()
+        ArchivedIssue.objects.bulk_create([ArchivedIssue(**row) for row in rows])
+        # Notifications outlive the issue rather than cascading (and moving
+        # unread counters); the preview is only shown for live issues
+        Notification.objects.filter(issue_id__in=ids).update(issue=None)
+        IssuePreview.objects.filter(issue_id__in=ids).delete()
+        # Raw delete: nothing above still points at these issues, and the
+        # post_delete receivers (statistics, search index, workloads) would
+        # run per issue for what is done here once per batch. Resolved
+        # issues don't count towards workloads.
+        Issue.objects.filter(id__in=ids)._raw_delete(using=Issue.objects.db)
+        get_search_backend().remove(ids)
+        transaction.on_commit(invalidate_archived_statistics)
+    return len(rows)
+
+
+def archive_issues(cutoff, batch_size=1000, limit=None, pause=0, progress=None):
+    """
+    Archives issues resolved before `cutoff`, batch by batch, until none are
+    left or `limit` have been moved. Returns the number moved.
+    """
+    moved = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        archived = archive_batch(cutoff, size)
+        if not archived:
+            break
+        moved += archived
+        if progress:
+            progress(moved)
+        if pause:
+            time.sleep(pause)
+    return moved
+
+
+def table_sizes():
+    """
+    Bytes taken by the live issue table, its search index and the archive,
+    indexes included: {table: bytes}, empty where the database can't tell.
+    PostgreSQL keeps the pages of deleted rows until VACUUM, so its sizes
+    only drop then; SQLite's are the bytes in use within the pages.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT relname, pg_total_relation_size(oid) FROM pg_class "
+                "WHERE relname IN ('users_issue', 'users_issuesearch', 'users_archivedissue') AND relkind = 'r'"
+            )
+        elif connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    "SELECT m.tbl_name, SUM(s.pgsize - s.unused) FROM dbstat s JOIN sqlite_master m ON m.name = s.name "
+                    "WHERE m.tbl_name IN ('users_issue', 'users_archivedissue') OR m.tbl_name LIKE 'users_issue_fts%' "
+                    "GROUP BY m.tbl_name"
+                )
+            except DatabaseError:
+                # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+                return {}
+        else:
+            return {}
+        return dict(cursor.fetchall())
+
+
+# Queries that read the whole live table, so they shrink with it
+PROBES = {
+    'count': lambda: Issue.objects.count(),
+    'status breakdown': lambda: list(Issue.objects.order_by().values('status', 'category').annotate(n=Count('id'))),
+    'search': lambda: get_search_backend().search(Issue.objects.all(), ['exam']).count(),
+}
+
+
+def probe_latency(repeat=5):
+    # Median milliseconds of each probe
+    timings = {}
+    for name, probe in PROBES.items():
+        runs = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            probe()
+            runs.append((time.perf_counter() - started) * 1000)
+        timings[name] = statistics.median(runs)
+    return timings
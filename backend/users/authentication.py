@@ -0,0 +1,84 @@
+# users/authentication.py
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .metrics import counter
+
+
+auth_cache_lookups = counter(
+    'aits_auth_user_cache_total', 'Authenticated requests by whether the user came from the cache', ['result']
+)
+
+
+def auth_version_key(user_id):
+    return f'auth_user_version:{user_id}'
+
+
+def invalidate_auth_user(user_id):
+    # A new version means the next request misses the cache and reloads the user
+    cache.set(auth_version_key(user_id), uuid.uuid4().hex, None)
+
+
+def auth_users():
+    # Users together with whichever role profile they have, in one query
+    return get_user_model().objects.select_related('student_profile', 'lecturer_profile', 'registrar_profile')
+
+
+def load_auth_user(user_id):
+    return auth_users().get(**{api_settings.USER_ID_FIELD: user_id})
+
+
+def auth_user_version(user_id):
+    # Changes whenever the user or their profile does
+    return cache.get_or_set(auth_version_key(user_id), lambda: uuid.uuid4().hex, None)
+
+
+def auth_user_key(user_id):
+    return f'auth_user:{user_id}:{auth_user_version(user_id)}'
+
+
+def cache_auth_user(user):
+    # LoginView has just loaded the user, so the first requests with the new token skip the database
+    cache.set(auth_user_key(getattr(user, api_settings.USER_ID_FIELD)), user, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that keeps the user and their profile in the cache for
+    AUTH_USER_CACHE_TIMEOUT seconds, so most requests authenticate without
+    touching the database. Entries are keyed by user id and a per-user
+    version that is replaced whenever the user or a profile is saved
+    (users/signals.py) or they log out.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        key = auth_user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            auth_cache_lookups.inc(result='miss')
+            try:
+                user = load_auth_user(user_id)
+            except get_user_model().DoesNotExist:
+                raise AuthenticationFailed('User not found', code='user_not_found')
+            cache.set(key, user, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60))
+        else:
+            auth_cache_lookups.inc(result='hit')
+
+        # Same checks as JWTAuthentication.get_user
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+        return user
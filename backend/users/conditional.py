@@ -0,0 +1,92 @@
+# users/conditional.py
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .instrumentation import view_name
+from .metrics import counter
+
+
+# Conditional GET for the dashboard endpoints. A view states a cheap version
+# of what it would return (get_version); the ETag is a hash of that version,
+# the user, the full path and the response format. A client sending the
+# ETag back in If-None-Match gets 304 Not Modified with no body, and nothing
+# is loaded or serialized. The version is read before the body is built, so
+# a write racing a request can only cost an extra 200, never a stale 304.
+
+conditional_gets = counter('aits_conditional_get_total', 'GETs answered by conditional views', ['view', 'result'])
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag handling to a view's GET. Subclasses implement get_version(),
+    returning (version, last_modified or None).
+    """
+
+    def get_version(self):
+        raise NotImplementedError
+
+    def get_etag(self, version):
+        request = self.request
+        key = repr((request.user.pk, request.get_full_path(), request.accepted_renderer.format, version))
+        return quote_etag(hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        version, last_modified = self.get_version()
+        etag = self.get_etag(version)
+        # Compared weakly, GZipMiddleware turns the ETag into W/"..."
+        if etag in {tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))}:
+            conditional_gets.inc(view=view_name(request), result='not_modified')
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            conditional_gets.inc(view=view_name(request), result='full')
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # Per user, so never kept by shared caches; browsers must revalidate
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class ConditionalIssueListMixin(ConditionalGetMixin):
+    """
+    For issue lists: the newest updated_at and the number of issues the
+    filtered queryset holds. An edit moves the first, a deletion the second,
+    and every page of the list shares the version.
+    """
+
+    def get_version(self):
+        stamp = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            updated=Max('updated_at'), count=Count('pk'),
+        )
+        return (stamp['updated'], stamp['count']), stamp['updated']
+
+
+class ConditionalProfileMixin(ConditionalGetMixin):
+    """
+    For the user's own profile: the updated_at of the profile and of its
+    user, read from the database so every worker gives the same ETag. The
+    profile loaded for it is the one served (see get_profile()), since the
+    user CachedJWTAuthentication cached can lag behind a change another
+    worker made.
+    """
+
+    def get_profile_queryset(self):
+        return self.get_serializer_class().Meta.model.objects.select_related('user')
+
+    def get_version(self):
+        self.fresh_profile = self.get_profile_queryset().filter(user_id=self.request.user.pk).first()
+        if self.fresh_profile is None:
+            return None, None
+        stamps = (self.fresh_profile.updated_at, self.fresh_profile.user.updated_at)
+        return stamps, max(stamps)
+
+    def get_profile(self, cached):
+        # The profile get_version() loaded on GET, the cached one otherwise
+        return getattr(self, 'fresh_profile', None) or cached
@@ -0,0 +1,111 @@
+# users/directory.py
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import LecturerProfile
+from .replicas import use_primary
+
+
+def invalidate_lecturer_directory():
+    # This process reloads on its next lookup; the others see the newer
+    # updated_at within LECTURER_DIRECTORY_CHECK_SECONDS
+    lecturer_directory.invalidate()
+
+
+def directory_version():
+    # Moves whenever a lecturer profile or its user is saved, created or deleted
+    stamp = LecturerProfile.objects.aggregate(
+        profile=Max('updated_at'), user=Max('user__updated_at'), count=Count('id'),
+    )
+    return stamp['profile'], stamp['user'], stamp['count']
+
+
+class LecturerDirectory:
+    """
+    In-memory list of lecturers for the assignment typeahead. Names are kept
+    in a sorted prefix index, so a keystroke is a bisect instead of a
+    database scan. The data is reloaded when directory_version() has moved,
+    which is checked at most every LECTURER_DIRECTORY_CHECK_SECONDS, so a
+    change made through another process shows up within that time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked = 0
+        # (entries by id, ids in load order, sorted (word, id) prefix index), swapped as one unit
+        self._data = ({}, [], [])
+
+    def _load(self):
+        entries = {}
+        prefixes = []
+        profiles = LecturerProfile.objects.select_related('user').filter(user__role='lecturer').order_by('id')
+        for profile in profiles:
+            user = profile.user
+            entries[user.id] = {
+                'id': user.id,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'department': profile.department,
+            }
+            for word in f"{user.first_name} {user.last_name}".lower().split():
+                prefixes.append((word, user.id))
+        prefixes.sort()
+        return entries, list(entries), prefixes
+
+    def _stale(self):
+        interval = getattr(settings, 'LECTURER_DIRECTORY_CHECK_SECONDS', 5)
+        return self._version is None or time.monotonic() - self._checked >= interval
+
+    def _current(self):
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    # Kept until the version moves, so not from a lagging replica. A
+                    # write between the two reads only costs another reload.
+                    with use_primary():
+                        version = directory_version()
+                        if version != self._version:
+                            self._data = self._load()
+                            self._version = version
+                    self._checked = time.monotonic()
+        return self._data
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    def _matching(self, prefixes, word):
+        ids = set()
+        index = bisect_left(prefixes, (word,))
+        while index < len(prefixes) and prefixes[index][0].startswith(word):
+            ids.add(prefixes[index][1])
+            index += 1
+        return ids
+
+    def search(self, query='', department=None, limit=None):
+        entries, order, prefixes = self._current()
+        words = query.lower().split()
+        if words:
+            # Every typed word has to start one of the lecturer's names
+            ids = self._matching(prefixes, words[0])
+            for word in words[1:]:
+                ids &= self._matching(prefixes, word)
+            order = sorted(ids, key=lambda lecturer_id: (entries[lecturer_id]['last_name'].lower(),
+                                                        entries[lecturer_id]['first_name'].lower(), lecturer_id))
+        results = []
+        for lecturer_id in order:
+            entry = entries[lecturer_id]
+            if department and entry['department'] != department:
+                continue
+            results.append(dict(entry))
+            if limit and len(results) >= limit:
+                break
+        return results
+
+
+lecturer_directory = LecturerDirectory()
@@ -0,0 +1,123 @@
+# users/events.py
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+# Issue events pushed to dashboards over the /api/events/ stream (users/streams.py).
+# Each event is a small delta:
+#   {"type": "issue.created" | "issue.assigned" | "issue.started" | "issue.resolved",
+#    "issue": {...}, "previous_assigned_to": <user id or null>}
+
+
+class Subscription:
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client fell behind; drop what it has queued and tell it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """
+    Fans events out to the streams open in this process. Good for a single
+    ASGI process; point ISSUE_EVENT_BROKER at another class with the same
+    subscribe/unsubscribe/publish methods (e.g. one backed by Redis pub/sub)
+    when running several.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop(), getattr(settings, 'ISSUE_EVENT_QUEUE_SIZE', 100))
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        # Safe to call from any thread, the event is handed to each subscriber's loop
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Loop already closed
+                self.unsubscribe(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'ISSUE_EVENT_BROKER', 'users.events.InProcessBroker'))()
+    return _broker
+
+
+def issue_event(kind, issue, previous_assigned_to=None):
+    if kind == 'created':
+        # New rows need everything the dashboards display
+        from .serializers import IssueSerializer
+        payload = dict(IssueSerializer(issue).data)
+    else:
+        payload = {
+            'id': issue.id,
+            'issue_id': issue.issue_id,
+            'title': issue.title,
+            'status': issue.status,
+            'resolved_at': issue.resolved_at.isoformat() if issue.resolved_at else None,
+        }
+    # Ids used to route the event, see event_for_user
+    payload['submitted_by'] = issue.submitted_by_id
+    payload['assigned_to'] = issue.assigned_to_id
+    return {'type': f'issue.{kind}', 'issue': payload, 'previous_assigned_to': previous_assigned_to}
+
+
+def publish_issue_event(kind, issue, previous_assigned_to=None):
+    # Built now, sent only if the surrounding transaction commits
+    event = issue_event(kind, issue, previous_assigned_to)
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def event_for_user(event, user):
+    """
+    What `user` should receive for `event`, or None. Registrars see every
+    event, students their own issues and lecturers the issues assigned to
+    them; a lecturer who loses an issue to reassignment gets issue.unassigned.
+    """
+    if event['type'] == 'resync' or user.role == 'registrar':
+        return event
+    issue = event['issue']
+    if user.role == 'student' and issue['submitted_by'] == user.id:
+        return event
+    if user.role == 'lecturer':
+        if issue['assigned_to'] == user.id:
+            return event
+        if event['previous_assigned_to'] == user.id:
+            return {**event, 'type': 'issue.unassigned'}
+    return None
@@ -0,0 +1,180 @@
+# users/exports.py
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+
+# Registrar report of issues with student and lecturer details, streamed
+# row by row. Rows are read with values_list() over queryset.iterator(), so
+# no model instances are built and memory stays flat however many issues
+# there are (PostgreSQL uses a server-side cursor for iterator()).
+
+# (column header, field read for it)
+EXPORT_COLUMNS = [
+    ('Issue ID', 'issue_id'),
+    ('Title', 'title'),
+    ('Category', 'category'),
+    ('Status', 'status'),
+    ('Course Unit', 'course_unit'),
+    ('Year of Study', 'year_of_study'),
+    ('Semester', 'semester'),
+    ('Created At', 'created_at'),
+    ('Resolved At', 'resolved_at'),
+    ('Student First Name', 'submitted_by__first_name'),
+    ('Student Last Name', 'submitted_by__last_name'),
+    ('Student Email', 'submitted_by__email'),
+    ('Registration No', 'submitted_by__student_profile__registration_no'),
+    ('Student No', 'submitted_by__student_profile__student_no'),
+    ('Programme', 'submitted_by__student_profile__programme'),
+    ('Lecturer First Name', 'assigned_to__first_name'),
+    ('Lecturer Last Name', 'assigned_to__last_name'),
+    ('Lecturer Email', 'assigned_to__email'),
+    ('Department', 'assigned_to__lecturer_profile__department'),
+]
+
+EXPORT_HEADERS = [header for header, field in EXPORT_COLUMNS]
+
+
+def export_rows(queryset, chunk_size=None):
+    chunk_size = chunk_size or getattr(settings, 'ISSUE_EXPORT_CHUNK_SIZE', 2000)
+    fields = [field for header, field in EXPORT_COLUMNS]
+    for row in queryset.order_by('created_at', 'id').values_list(*fields).iterator(chunk_size=chunk_size):
+        yield ['' if value is None else value for value in row]
+
+
+class Echo:
+    # File-like object that hands back whatever is written to it
+    def write(self, value):
+        return value
+
+
+# Leading characters that make a spreadsheet read a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    # Titles and descriptions are typed by students; a quote keeps them text
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_stream(rows, rows_per_chunk=500):
+    # Rows are grouped so each chunk sent to the client is a few KB, not one line
+    writer = csv.writer(Echo())
+    chunk = [writer.writerow(EXPORT_HEADERS)]
+    for row in rows:
+        chunk.append(writer.writerow([csv_value(value) for value in row]))
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk).encode('utf-8')
+            chunk = []
+    if chunk:
+        yield ''.join(chunk).encode('utf-8')
+
+
+# The smallest workbook Excel/LibreOffice open: one sheet of inline strings and
+# numbers, so no shared string table has to be held in memory.
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Issues" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def xlsx_cell(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        if hasattr(value, 'isoformat'):
+            value = value.strftime('%Y-%m-%d %H:%M:%S')
+        # Control characters are not allowed in XML 1.0, one would break the whole workbook
+        return f'<c t="inlineStr"><is><t>{escape(XML_ILLEGAL.sub("", str(value)))}</t></is></c>'
+    return f'<c><v>{value}</v></c>'
+
+
+def xlsx_row(values):
+    return '<row>' + ''.join(xlsx_cell(value) for value in values) + '</row>'
+
+
+class ZipStream:
+    # Write-only target for ZipFile that lets the generator drain what was written.
+    # No seek()/tell(), so zipfile writes data descriptors instead of going back.
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def xlsx_stream(rows, rows_per_chunk=500):
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        workbook.writestr('xl/workbook.xml', XLSX_WORKBOOK)
+        workbook.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        yield stream.drain()
+        # force_zip64 because the sheet size isn't known up front
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            chunk = [XLSX_SHEET_START, xlsx_row(EXPORT_HEADERS)]
+            for row in rows:
+                chunk.append(xlsx_row(row))
+                if len(chunk) >= rows_per_chunk:
+                    sheet.write(''.join(chunk).encode('utf-8'))
+                    chunk = []
+                    data = stream.drain()
+                    if data:
+                        yield data
+            chunk.append(XLSX_SHEET_END)
+            sheet.write(''.join(chunk).encode('utf-8'))
+    yield stream.drain()
+
+
+# format -> (stream function, content type, file extension)
+EXPORT_FORMATS = {
+    'csv': (csv_stream, 'text/csv; charset=utf-8', 'csv'),
+    'xlsx': (xlsx_stream, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
@@ -0,0 +1,119 @@
+# users/extract.py
+import io
+import re
+import zipfile
+
+# Runs inside the process_attachments worker processes, so nothing here may
+# import Django: it takes bytes and returns bytes and text.
+# Pillow makes thumbnails, pypdf reads PDFs and pytesseract (with the
+# tesseract binary) reads text out of scans; whatever isn't installed is skipped.
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+
+def clean_text(text, limit):
+    return SPACE_RE.sub(' ', text or '').strip()[:limit]
+
+
+def thumbnail_bytes(image, size):
+    # Small JPEG for the detail pages, a few KB whatever the original was
+    image = image.copy()
+    image.thumbnail(size)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    out = io.BytesIO()
+    image.save(out, format='JPEG', quality=70, optimize=True)
+    return out.getvalue()
+
+
+def ocr(image, limit):
+    if pytesseract is None:
+        return ''
+    try:
+        return clean_text(pytesseract.image_to_string(image), limit)
+    except pytesseract.TesseractNotFoundError:
+        return ''
+
+
+def preview_image(data, size, limit):
+    if Image is None:
+        return {}
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        return {'thumbnail': thumbnail_bytes(image, size), 'text': ocr(image, limit), 'page_count': 1}
+
+
+def preview_pdf(data, size, limit):
+    if pypdf is None:
+        return {}
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    parts = []
+    length = 0
+    for page in reader.pages:
+        text = page.extract_text() or ''
+        parts.append(text)
+        length += len(text)
+        if length >= limit:
+            break
+    result = {'text': clean_text(' '.join(parts), limit), 'page_count': len(reader.pages)}
+
+    # Result slips are mostly scans, so the first picture on page one makes a fair thumbnail.
+    # Rendering the page itself would need poppler or similar.
+    if Image is not None and reader.pages:
+        try:
+            images = reader.pages[0].images
+            first = images[0].image if len(images) else None
+        except Exception:
+            first = None
+        if first is not None:
+            result['thumbnail'] = thumbnail_bytes(first, size)
+            if not result['text']:
+                result['text'] = ocr(first, limit)
+    return result
+
+
+def preview_docx(data, size, limit):
+    # A .docx is a zip of XML; the body text is in word/document.xml
+    with zipfile.ZipFile(io.BytesIO(data)) as document:
+        xml = document.read('word/document.xml').decode('utf-8', 'replace')
+    xml = xml.replace('</w:p>', '\n')
+    return {'text': clean_text(TAG_RE.sub(' ', xml), limit)}
+
+
+PREVIEWERS = {
+    'image/png': preview_image,
+    'image/jpeg': preview_image,
+    'image/gif': preview_image,
+    'application/pdf': preview_pdf,
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': preview_docx,
+}
+
+
+def render_preview(data, content_type, size=(320, 320), limit=20000):
+    """
+    Thumbnail (JPEG bytes or None), extracted text and page count for an
+    attachment. Unknown types give an empty result rather than an error.
+    """
+    previewer = PREVIEWERS.get(content_type)
+    result = previewer(data, size, limit) if previewer else {}
+    return {
+        'thumbnail': result.get('thumbnail'),
+        'text': result.get('text', ''),
+        'page_count': result.get('page_count'),
+    }
@@ -0,0 +1,142 @@
+# users/fieldsets.py
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.functional import cached_property
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+from .serializers import IssueSummarySerializer
+
+
+# Sparse fieldsets for the issue lists. ?fields=title,status,created_at
+# returns only those fields and ?omit=description,attachments all but those;
+# ?summary=1 switches to IssueSummarySerializer, which the other two can
+# narrow further. The queryset then loads only the columns the chosen fields
+# read (.only()) and joins only the relations they go through, so a field
+# left out costs neither a column read nor its serialization.
+
+
+def split_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def model_field(model, source):
+    """
+    The ORM path of a dotted serializer source ('submitted_by.first_name'
+    -> 'submitted_by__first_name') and the model field it ends in, or
+    (None, None) when it isn't made of model fields.
+    """
+    parts = source.split('.')
+    field = None
+    for part in parts:
+        if field is not None:
+            if not field.is_relation:
+                return None, None
+            model = field.related_model
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None, None
+    return '__'.join(parts), field
+
+
+def serializer_columns(serializer, model):
+    """
+    The ORM paths of every column `serializer` reads from `model`, or None
+    when a field reads something other than a column (a method, a property).
+    """
+    paths = set()
+    for field in serializer.fields.values():
+        if field.source == '*':
+            return None
+        path, target = model_field(model, field.source)
+        if path is None:
+            return None
+        if isinstance(field, BaseSerializer):
+            # A nested serializer reads from the related row, all of it when it can't tell which columns
+            related = target.related_model
+            nested = serializer_columns(field, related)
+            if nested is None:
+                nested = {column.name for column in related._meta.concrete_fields}
+            paths |= {f'{path}__{column}' for column in nested}
+        else:
+            paths.add(path)
+    return paths
+
+
+def joined_relations(model, paths):
+    # Every relation the paths go through, for select_related()
+    relations = set()
+    for path in paths:
+        parts = path.split('__')
+        current = model
+        for n, part in enumerate(parts[:-1]):
+            field = current._meta.get_field(part)
+            relations.add('__'.join(parts[:n + 1]))
+            current = field.related_model
+    return relations
+
+
+class SparseFieldsMixin:
+    """
+    For issue list views. Reads ?fields=, ?omit= and ?summary=1, passes the
+    chosen fields to the serializer and loads only what they need; an
+    unknown field name gets a 400.
+    """
+
+    summary_serializer_class = IssueSummarySerializer
+
+    def get_serializer_class(self):
+        if self.request.query_params.get('summary') in ('1', 'true'):
+            return self.summary_serializer_class
+        return super().get_serializer_class()
+
+    @cached_property
+    def sparse_fields(self):
+        """(names of the fields to output or None for all, error)"""
+        params = self.request.query_params
+        if not params.get('fields') and not params.get('omit'):
+            return None, None
+        available = list(self.get_serializer_class()().fields)
+        wanted = split_names(params.get('fields', '')) or available
+        omitted = split_names(params.get('omit', ''))
+        unknown = [name for name in wanted + omitted if name not in available]
+        if unknown:
+            return None, f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}"
+        return [name for name in wanted if name not in omitted], None
+
+    def get_serializer(self, *args, **kwargs):
+        fields, error = self.sparse_fields
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        # Here rather than in get_queryset(), which the views define themselves
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if serializer_class is not self.summary_serializer_class and self.sparse_fields[0] is None:
+            # Everything IssueSerializer reads, which with_related() already joins
+            return queryset
+        serializer = serializer_class(fields=self.sparse_fields[0], context=self.get_serializer_context())
+        columns = serializer_columns(serializer, queryset.model)
+        if columns is None:
+            return queryset
+        # The page cursor is read from the last row
+        if self.paginator is not None:
+            for name in self.paginator.get_ordering(self.request, queryset, self):
+                path, _ = model_field(queryset.model, name.lstrip('-'))
+                if path:
+                    columns.add(path)
+        queryset = queryset.select_related(None)
+        relations = joined_relations(queryset.model, columns)
+        if relations:
+            # Without arguments select_related() would join every foreign key
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns)
+
+    def list(self, request, *args, **kwargs):
+        fields, error = self.sparse_fields
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
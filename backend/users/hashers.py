@@ -0,0 +1,22 @@
+# users/hashers.py
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt with its cost parameters taken from PASSWORD_SCRYPT_PARAMS, so they
+    can be tuned per deployment from the numbers bench_password_hashers gives.
+
+    Listed first in PASSWORD_HASHERS: a PBKDF2 hash (or a scrypt hash with
+    old parameters) still verifies, and check_password rewrites it with these
+    parameters on the user's next successful login.
+    """
+
+    def __init__(self):
+        params = getattr(settings, 'PASSWORD_SCRYPT_PARAMS', {})
+        self.work_factor = params.get('work_factor', self.work_factor)
+        self.block_size = params.get('block_size', self.block_size)
+        self.parallelism = params.get('parallelism', self.parallelism)
+        # hashlib.scrypt refuses to run past maxmem, which must cover 128 * n * r * p bytes
+        self.maxmem = max(self.maxmem, 128 * self.work_factor * self.block_size * self.parallelism * 2)
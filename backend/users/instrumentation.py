@@ -0,0 +1,188 @@
+# users/instrumentation.py
+import contextvars
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+from .metrics import counter, histogram
+
+
+# Per-view request metrics for /metrics, and a JSON log of slow queries.
+# InstrumentationMiddleware keeps the current request's RequestStats in a
+# context variable. install() (called from UsersConfig.ready) wraps every
+# database connection as it opens, and the app's serializers time their
+# output through TimedSerializerMixin; both add to whatever RequestStats is
+# current. Context variables follow sync views into the thread ASGI runs
+# them in, so this works under WSGI and ASGI alike.
+
+request_duration = histogram('aits_request_duration_seconds', 'Time spent handling requests', ['view', 'method'])
+request_queries = histogram('aits_request_db_queries', 'Database queries per request', ['view'],
+                            buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200))
+query_seconds = counter('aits_request_db_seconds_total', 'Time spent in database queries', ['view'])
+serializer_seconds = counter('aits_request_serializer_seconds_total', 'Time spent producing serializer output', ['view'])
+response_bytes = counter('aits_response_bytes_total', 'Bytes of non-streaming response bodies', ['view'])
+slow_queries = counter('aits_slow_queries_total', 'Queries slower than SLOW_QUERY_THRESHOLD_MS', ['view'])
+
+slow_query_log = logging.getLogger('aits.slow_queries')
+
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+class RequestStats:
+    __slots__ = ('request', 'queries', 'query_time', 'serializer_time', 'serializing', 'slow_threshold')
+
+    def __init__(self, request, slow_threshold):
+        self.request = request
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.slow_threshold = slow_threshold
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.query_time += elapsed
+            if elapsed >= self.slow_threshold:
+                self.log_slow(sql, elapsed, context)
+
+    def log_slow(self, sql, elapsed, context):
+        view = view_name(self.request)
+        slow_queries.inc(view=view)
+        # The statement with its placeholders, parameters can hold personal data
+        slow_query_log.warning('slow query', extra={
+            'view': view,
+            'role': getattr(getattr(self.request, 'user', None), 'role', None),
+            'method': self.request.method,
+            'path': self.request.path,
+            'duration_ms': round(elapsed * 1000, 2),
+            'database': context['connection'].alias,
+            'sql': sql[:2000],
+        })
+
+
+def query_wrapper(execute, sql, params, many, context):
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.execute(execute, sql, params, many, context)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    # Once per database connection instead of a context manager on every request
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unmatched'
+
+
+class InstrumentationMiddleware:
+    """
+    Records, per url name: request latency, number of queries and time in
+    SQL, time producing serializer output and response size. Off when
+    INSTRUMENTATION_ENABLED is False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200) / 1000
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = RequestStats(request, self.slow_threshold)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(request, self.slow_threshold)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, stats, elapsed):
+        view = view_name(request)
+        request_duration.observe(elapsed, view=view, method=request.method)
+        request_queries.observe(stats.queries, view=view)
+        if stats.queries:
+            query_seconds.inc(stats.query_time, view=view)
+        if stats.serializer_time:
+            serializer_seconds.inc(stats.serializer_time, view=view)
+        if not response.streaming:
+            response_bytes.inc(len(response.content), view=view)
+
+
+def install():
+    # Wraps database connections as they open
+    connection_created.connect(instrument_connection, dispatch_uid='aits_instrument_connection')
+
+
+class TimedSerializerMixin:
+    """
+    For the app's output serializers: adds the time spent in
+    to_representation, queries it triggers included, to the current
+    request's serializer time. Only the outermost call counts, so nested
+    serializers aren't counted twice; the rows of a many=True list are timed
+    one by one. Serializers without it (DRF's, other apps') aren't timed.
+    """
+
+    def to_representation(self, instance):
+        stats = current_request.get()
+        if stats is None or stats.serializing:
+            return super().to_representation(instance)
+        stats.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializer_time += time.perf_counter() - started
+            stats.serializing = False
+
+
+# Attributes every LogRecord has, the rest came in through `extra`
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with whatever was passed as `extra`."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES})
+        return json.dumps(entry, default=str)
@@ -0,0 +1,103 @@
+# users/mail.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def queue_mail(subject, message, recipient_list, from_email=None):
+    """
+    Stores an email in the outbox once the current transaction commits, so a
+    request never waits on SMTP and a rolled back write never sends mail.
+    The send_queued_mail command delivers it.
+    """
+    recipients = [address for address in recipient_list if address]
+    if not recipients:
+        return
+
+    def enqueue():
+        OutboundEmail.objects.create(
+            subject=subject,
+            body=message,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipients=recipients,
+        )
+
+    transaction.on_commit(enqueue)
+
+
+def retry_delay(attempts):
+    # Exponential backoff: 1x, 2x, 4x ... the base delay
+    base = getattr(settings, 'MAIL_QUEUE_RETRY_DELAY', 60)
+    return timedelta(seconds=base * 2 ** max(attempts - 1, 0))
+
+
+def claim_batch(batch_size):
+    # Lease due messages so that parallel workers don't pick the same rows
+    lease = timedelta(seconds=getattr(settings, 'MAIL_QUEUE_LEASE_SECONDS', 300))
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        OutboundEmail.objects.filter(id__in=[email.id for email in batch]).update(next_attempt_at=now + lease)
+    return batch
+
+
+def record_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= getattr(settings, 'MAIL_QUEUE_MAX_ATTEMPTS', 5):
+        email.status = 'failed'
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_queued_mail(batch_size=None):
+    """
+    Delivers one batch from the outbox over a single SMTP connection and
+    returns (sent, failed) counts for that batch.
+    """
+    batch = claim_batch(batch_size or getattr(settings, 'MAIL_QUEUE_BATCH_SIZE', 100))
+    if not batch:
+        return 0, 0
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in batch:
+            record_failure(email, error)
+        return 0, len(batch)
+
+    sent = failed = 0
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipients,
+                connection=connection,
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                record_failure(email, error)
+                failed += 1
+                continue
+            email.status = 'sent'
+            email.sent_at = timezone.now()
+            email.attempts += 1
+            email.save(update_fields=['status', 'sent_at', 'attempts'])
+            sent += 1
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from users.archive import archivable, archive_cutoff, archive_issues, probe_latency, table_sizes
+
+
+class Command(BaseCommand):
+    help = ("Moves issues resolved more than ISSUE_ARCHIVE_AFTER_DAYS ago to the archive table, one batch per "
+            "transaction; safe to stop and run again")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Default ISSUE_ARCHIVE_AFTER_DAYS")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--limit', type=int, default=None, help="Stop after archiving this many issues")
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to wait between batches")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the issues that would be archived")
+        parser.add_argument('--no-report', action='store_true', help="Skip measuring sizes and query times")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        cutoff = archive_cutoff(options['days'])
+        due = archivable(cutoff).count()
+        self.stdout.write(f"{due} issue(s) resolved before {cutoff:%Y-%m-%d %H:%M} to archive")
+        if options['dry_run'] or not due:
+            return
+
+        report = not options['no_report']
+        if report:
+            sizes_before, latency_before = table_sizes(), probe_latency()
+
+        moved = 0
+
+        def progress(total):
+            nonlocal moved
+            moved = total
+            self.stdout.write(f"  archived {total}/{due}")
+
+        try:
+            archive_issues(cutoff, options['batch_size'], options['limit'], options['pause'], progress)
+        except KeyboardInterrupt:
+            self.stdout.write(f"Interrupted after {moved} issue(s); run again to archive the rest")
+            return
+        self.stdout.write(f"Archived {moved} issue(s)")
+        if not report:
+            return
+
+        sizes_after, latency_after = table_sizes(), probe_latency()
+        for table in sorted(sizes_before.keys() | sizes_after.keys()):
+            before, after = sizes_before.get(table, 0), sizes_after.get(table, 0)
+            self.stdout.write(f"  {table:<28} {before / 1024:>10.0f} KiB -> {after / 1024:>10.0f} KiB")
+        if not sizes_after:
+            self.stdout.write("  (table sizes are not available on this database)")
+        elif connection.vendor == 'postgresql':
+            self.stdout.write("  Deleted rows are reused once autovacuum has run; VACUUM FULL users_issue returns the space")
+        for name, before in latency_before.items():
+            after = latency_after[name]
+            self.stdout.write(f"  {name:<28} {before:>8.2f} ms -> {after:>8.2f} ms  ({before / after if after else 0:.1f}x)")
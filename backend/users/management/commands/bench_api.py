@@ -0,0 +1,415 @@
+import base64
+import io
+import json
+import statistics
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users import urls
+from users.models import Issue, Notification, RequestProfile, StudentProfile, UploadSession, User
+from users.notifications import recount_unread
+from users.seeding import SEED_PASSWORD
+from users.uploads import store_file
+
+
+# A 1x1 PNG, the attachment used by the upload and attachment routes
+PNG = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==')
+
+
+class Route:
+    """
+    How to call one url name from users/urls.py: the method, whose token to
+    send, and build(fixtures, n) returning the n-th request as a dict with
+    any of kwargs (for reverse), params, data (sent as JSON), body,
+    content_type and headers. prepare(fixtures, count) makes whatever the
+    requests use up (pending issues, refresh tokens...) before timing starts.
+    """
+
+    def __init__(self, name, method, role, build=None, prepare=None, expect=(200,)):
+        self.name = name
+        self.method = method
+        self.role = role
+        self.build = build or (lambda fixtures, n: {})
+        self.prepare = prepare
+        self.expect = expect
+
+    @property
+    def writes(self):
+        return self.method != 'GET'
+
+
+def pool(name):
+    # The n-th item made by prepare, every request gets its own
+    return lambda fixtures, n: fixtures.pools[name][n]
+
+
+def register_body(fixtures, n):
+    username = f'bench_{fixtures.run}_{n}'
+    return {'data': {
+        'username': username, 'email': f'{username}@example.com', 'password': 'Bench-pass-2024', 'password2': 'Bench-pass-2024',
+        'first_name': 'Bench', 'last_name': 'Student', 'role': 'student',
+        'student_profile': {'registration_no': f'B/{fixtures.run}/{n}', 'student_no': f'B{fixtures.run}{n}',
+                            'programme': StudentProfile.PROGRAMME_CHOICES[0][0]},
+    }}
+
+
+def issue_body(fixtures, n):
+    return {'data': {
+        'title': f'Missing marks {n}', 'description': 'My coursework mark is missing from the results.',
+        'category': Issue.CATEGORY_CHOICES[0][0], 'course_unit': 'CSC1100', 'year_of_study': 1,
+        'semester': Issue.SEMESTER_OF_STUDY[0][0], 'lecturer_name': 'Unknown',
+    }}
+
+
+def prepare_pending(name, per_request):
+    def prepare(fixtures, count):
+        ids = list(Issue.objects.filter(status='pending').order_by('-id').exclude(id__in=fixtures.taken)
+                   .values_list('id', flat=True)[:count * per_request])
+        fixtures.taken.update(ids)
+        if per_request == 1:
+            fixtures.pools[name] = [{'kwargs': {'issue_id': issue_id}, 'data': {'user_id': fixtures.users['lecturer'].id}} for issue_id in ids]
+        else:
+            fixtures.pools[name] = [{'data': {'issue_ids': ids[i:i + per_request], 'user_id': fixtures.users['lecturer'].id}}
+                                    for i in range(0, len(ids), per_request)]
+    return prepare
+
+
+def prepare_assigned(name, per_request):
+    def prepare(fixtures, count):
+        lecturer = fixtures.users['lecturer']
+        ids = list(Issue.objects.filter(assigned_to=lecturer, status='assigned').exclude(id__in=fixtures.taken)
+                   .values_list('id', flat=True)[:count * per_request])
+        if len(ids) < count * per_request:
+            # Give the lecturer enough work to resolve
+            extra = list(Issue.objects.filter(status='pending').exclude(id__in=fixtures.taken)
+                         .values_list('id', flat=True)[:count * per_request - len(ids)])
+            Issue.objects.filter(id__in=extra).update(assigned_to=lecturer, status='assigned', updated_at=timezone.now())
+            ids += extra
+        fixtures.taken.update(ids)
+        if per_request == 1:
+            fixtures.pools[name] = [{'data': {'issueId': issue_id}} for issue_id in ids]
+        else:
+            fixtures.pools[name] = [{'data': {'issue_ids': ids[i:i + per_request]}} for i in range(0, len(ids), per_request)]
+    return prepare
+
+
+def prepare_refresh(name):
+    def prepare(fixtures, count):
+        student = fixtures.users['student']
+        fixtures.pools[name] = [{'data': {'refresh': str(RefreshToken.for_user(student))}} for _ in range(count)]
+    return prepare
+
+
+def prepare_upload_sessions(fixtures, count):
+    student = fixtures.users['student']
+    sessions = [UploadSession.objects.create(owner=student, filename='slip.png', size=len(PNG), content_type='image/png')
+                for _ in range(count)]
+    fixtures.pools['upload_chunk'] = [{
+        'kwargs': {'pk': session.pk}, 'body': PNG, 'content_type': 'application/octet-stream',
+        'headers': {'Content-Range': f'bytes 0-{len(PNG) - 1}/{len(PNG)}'},
+    } for session in sessions]
+
+
+def prepare_complete_uploads(fixtures, count):
+    prepare_upload_sessions(fixtures, count)
+    for call in fixtures.pools['upload_chunk']:
+        fixtures.send('PUT', 'student', reverse('upload_chunk', kwargs=call['kwargs']), call)
+    fixtures.pools['upload_complete'] = [{'kwargs': call['kwargs']} for call in fixtures.pools['upload_chunk']]
+
+
+def prepare_notifications(fixtures, count):
+    student = fixtures.users['student']
+    notifications = Notification.objects.bulk_create([
+        Notification(recipient=student, issue_id=fixtures.student_issue, kind='resolved', message='Your issue was resolved')
+        for _ in range(count)
+    ])
+    recount_unread([student.id])
+    fixtures.pools['notification_read'] = [{'kwargs': {'pk': notification.pk}} for notification in notifications]
+
+
+ROUTES = [
+    Route('register', 'POST', None, register_body, expect=(201,)),
+    Route('login', 'POST', None, lambda f, n: {'data': {'username': f.logins[n % len(f.logins)], 'password': SEED_PASSWORD}}),
+    Route('token_obtain_pair', 'POST', None, lambda f, n: {'data': {'username': f.logins[n % len(f.logins)], 'password': SEED_PASSWORD}}),
+    Route('token_refresh', 'POST', None, pool('token_refresh'), prepare_refresh('token_refresh')),
+    Route('logout', 'POST', 'student', pool('logout'), prepare_refresh('logout'), expect=(205,)),
+    Route('student_profile', 'GET', 'student'),
+    Route('lecturer_profile', 'GET', 'lecturer'),
+    Route('registrar_profile', 'GET', 'registrar'),
+    Route('submit_issue', 'POST', 'student', issue_body, expect=(201,)),
+    Route('upload_session', 'POST', 'student',
+          lambda f, n: {'data': {'filename': 'slip.png', 'size': len(PNG), 'content_type': 'image/png'}}, expect=(201,)),
+    Route('upload_chunk', 'PUT', 'student', pool('upload_chunk'), prepare_upload_sessions),
+    Route('upload_complete', 'POST', 'student', pool('upload_complete'), prepare_complete_uploads),
+    Route('issue_attachment', 'GET', 'student', lambda f, n: {'kwargs': {'pk': f.attachment_issue}}),
+    # 404 until process_attachments has made the thumbnail
+    Route('issue_thumbnail', 'GET', 'student', lambda f, n: {'kwargs': {'pk': f.attachment_issue}}, expect=(200, 404)),
+    Route('my-issues', 'GET', 'student'),
+    Route('resolved-issues', 'GET', 'lecturer'),
+    Route('issue-detail', 'GET', 'student', lambda f, n: {'kwargs': {'pk': f.student_issue}}),
+    Route('issue-count', 'GET', 'student'),
+    Route('registrar_issues', 'GET', 'registrar'),
+    Route('Registrar_issue_counts', 'GET', 'registrar'),
+    Route('registrar_issues_export', 'GET', 'registrar',
+          lambda f, n: {'kwargs': {'file_format': 'csv'}, 'params': {'status': 'pending', 'category': Issue.CATEGORY_CHOICES[0][0]}}),
+    Route('issue_statistics', 'GET', 'registrar'),
+    Route('search-lecturers', 'GET', 'registrar', lambda f, n: {'params': {'q': 'lec', 'limit': 10}}),
+    Route('assign_issue', 'POST', 'registrar', pool('assign_issue'), prepare_pending('assign_issue', 1)),
+    Route('bulk_assign_issues', 'POST', 'registrar', pool('bulk_assign_issues'), prepare_pending('bulk_assign_issues', 20)),
+    Route('auto_assign_issues', 'POST', 'registrar', pool('auto_assign_issues'), prepare_pending('auto_assign_issues', 20)),
+    Route('lecturer_workload', 'GET', 'registrar'),
+    Route('lecturer_assigned_issues', 'GET', 'lecturer'),
+    Route('lecturer_issue_detail', 'GET', 'lecturer', lambda f, n: {'kwargs': {'pk': f.lecturer_issue}}),
+    Route('lecturer_pending_issues', 'GET', 'lecturer'),
+    Route('resolve_issue', 'POST', 'lecturer', pool('resolve_issue'), prepare_assigned('resolve_issue', 1)),
+    Route('bulk_resolve_issues', 'POST', 'lecturer', pool('bulk_resolve_issues'), prepare_assigned('bulk_resolve_issues', 20)),
+    Route('notifications', 'GET', 'student'),
+    Route('notifications_unread_count', 'GET', 'student'),
+    Route('notification_read', 'PATCH', 'student', pool('notification_read'), prepare_notifications),
+    Route('notifications_bulk_read', 'POST', 'student', lambda f, n: {'data': {'all': True}}),
+    Route('request_profiles', 'GET', 'registrar'),
+    Route('request_profile', 'GET', 'registrar', lambda f, n: {'kwargs': {'pk': f.profile}}),
+    Route('users', 'GET', 'registrar'),
+]
+
+# Not driven, with the reason
+SKIPPED = {
+    'issue_events': "server-sent event stream, needs ASGI and never finishes",
+}
+
+
+class Fixtures:
+    """The users, tokens and rows the routes refer to, made before anything is timed."""
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+        self.run = timezone.now().strftime('%H%M%S')
+        self.pools = {}
+        self.taken = set()
+        self.local = threading.local()
+
+        self.users = {'student': self.busiest('submitted_by', 'student'), 'lecturer': self.busiest('assigned_to', 'lecturer'),
+                      'registrar': User.objects.filter(role='registrar').order_by('id').first()}
+        missing = [role for role, user in self.users.items() if user is None]
+        if missing:
+            raise CommandError(f"No {', '.join(missing)} users, run seed_data first")
+        self.tokens = {role: str(RefreshToken.for_user(user).access_token) for role, user in self.users.items()}
+        self.logins = list(User.objects.filter(username__startswith='seed_student_').order_by('id')
+                           .values_list('username', flat=True)[:200]) or [self.users['student'].username]
+
+        student_issues = Issue.objects.filter(submitted_by=self.users['student'])
+        self.student_issue = student_issues.order_by('id').values_list('id', flat=True).first()
+        if self.student_issue is None:
+            raise CommandError("The student has no issues, run seed_data first")
+        self.lecturer_issue = Issue.objects.filter(assigned_to=self.users['lecturer']).values_list('id', flat=True).first() or self.student_issue
+
+        stored = store_file(io.BytesIO(PNG), len(PNG), 'image/png')
+        self.attachment_issue = student_issues.order_by('-id').values_list('id', flat=True).first()
+        Issue.objects.filter(id=self.attachment_issue).update(attachments=stored.file.name, updated_at=timezone.now())
+        self.taken.update([self.student_issue, self.lecturer_issue, self.attachment_issue])
+
+        self.profile = RequestProfile.objects.create(
+            view='bench', method='GET', path='/bench/', trigger='header', status_code=200, duration_ms=1, samples=1,
+            stacks='bench:handle 1',
+        ).id
+
+    def busiest(self, field, role):
+        top = (Issue.objects.order_by().exclude(**{field: None}).values(field).annotate(n=Count('id')).order_by('-n').first())
+        if top:
+            return User.objects.get(id=top[field])
+        return User.objects.filter(role=role).order_by('id').first()
+
+    def send(self, method, role, path, call):
+        """Makes one request, returns (status, response bytes, queries or None)."""
+        params = call.get('params')
+        if 'body' in call:
+            body, content_type = call['body'], call.get('content_type', 'application/octet-stream')
+        elif 'data' in call:
+            body, content_type = json.dumps(call['data']).encode(), 'application/json'
+        else:
+            body, content_type = b'', None
+        headers = dict(call.get('headers', {}))
+        if role:
+            headers['Authorization'] = f'Bearer {self.tokens[role]}'
+        if self.base_url:
+            return self.send_http(method, path, params, body, content_type, headers)
+
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            # A 500 is counted as an error rather than stopping the run
+            client = self.local.client = Client(raise_request_exception=False)
+        extra = {'HTTP_' + name.upper().replace('-', '_'): value for name, value in headers.items()}
+        if params:
+            extra['QUERY_STRING'] = urlencode(params)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.generic(method, path, body, content_type or 'application/octet-stream', **extra)
+            size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+        return response.status_code, size, len(queries)
+
+    def send_http(self, method, path, params, body, content_type, headers):
+        url = self.base_url.rstrip('/') + path + (f'?{urlencode(params)}' if params else '')
+        if content_type:
+            headers['Content-Type'] = content_type
+        request = urllib.request.Request(url, data=body or None, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, len(response.read()), None
+        except urllib.error.HTTPError as error:
+            return error.code, len(error.read()), None
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = ("Drives every route in users/urls.py with concurrent clients and reports p50/p95/p99 latency, "
+            "queries per request and throughput, optionally as JSON to compare between commits")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Requests per route")
+        parser.add_argument('--concurrency', type=int, default=4, help="Clients sending at the same time")
+        parser.add_argument('--routes', default='', help="Comma separated url names, default all")
+        parser.add_argument('--read-only', action='store_true', help="Only GET routes, nothing is written")
+        parser.add_argument('--base-url', default='',
+                            help="Send real HTTP to a running server (e.g. http://127.0.0.1:8000) instead of the "
+                                 "in-process test client; queries per request are not available then")
+        parser.add_argument('--output', default='', help="Write the results to this JSON file")
+        parser.add_argument('--compare', default='', help="Earlier JSON results to compare against")
+        parser.add_argument('--threshold', type=float, default=1.25,
+                            help="With --compare, flag routes whose p95 or queries grew by more than this factor")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        covered = {route.name for route in ROUTES}
+        for pattern in urls.urlpatterns:
+            if pattern.name not in covered and pattern.name not in SKIPPED:
+                self.stderr.write(f"Route {pattern.name} ({pattern.pattern}) has no bench_api entry")
+
+        routes = ROUTES
+        if options['routes']:
+            wanted = set(options['routes'].split(','))
+            routes = [route for route in routes if route.name in wanted]
+        if options['read_only']:
+            routes = [route for route in routes if not route.writes]
+
+        fixtures = Fixtures(options['base_url'] or None)
+        results = {
+            'meta': {
+                'commit': self.commit(),
+                'database': connection.vendor,
+                'issues': Issue.objects.count(),
+                'users': User.objects.count(),
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'transport': 'http' if options['base_url'] else 'test-client',
+                'started_at': timezone.now().isoformat(),
+            },
+            'routes': {},
+        }
+        self.stdout.write(f"{results['meta']['issues']} issues, {options['requests']} requests per route, "
+                          f"{options['concurrency']} clients, skipping {', '.join(SKIPPED)}")
+        self.stdout.write(f"  {'route':<28} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'queries':>8}  errors")
+
+        # The login rate limits would turn most of the login traffic into 429s
+        with override_settings(LOGIN_RATE_LIMITS={'ip': (10 ** 9, 10 ** 9), 'username': (10 ** 9, 10 ** 9)}):
+            for route in routes:
+                # SQLite takes one writer at a time and fails the rest with "database is locked"
+                concurrency = 1 if route.writes and connection.vendor == 'sqlite' else options['concurrency']
+                result = self.run_route(route, fixtures, options['requests'], concurrency)
+                results['routes'][route.name] = result
+                queries = '-' if result['queries_mean'] is None else f"{result['queries_mean']:.1f}"
+                self.stdout.write(f"  {route.name:<28} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                                  f"{result['throughput_rps']:>8.1f} {queries:>8}  {result['errors'] or ''}")
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(f"Wrote {options['output']}")
+        if options['compare']:
+            regressions = self.compare(options['compare'], results, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} route(s) regressed: {', '.join(regressions)}")
+
+    def run_route(self, route, fixtures, count, concurrency):
+        if route.prepare:
+            route.prepare(fixtures, count)
+        calls = [route.build(fixtures, n) for n in range(count)]
+
+        def one(call):
+            path = reverse(route.name, kwargs=call.get('kwargs'))
+            started = time.perf_counter()
+            status, size, queries = fixtures.send(route.method, route.role, path, call)
+            return time.perf_counter() - started, status, size, queries
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(one, calls))
+        elapsed = time.perf_counter() - started
+        # Each worker thread opened its own connection
+        connection.close()
+
+        latencies = sorted(sample[0] * 1000 for sample in samples)
+        statuses = {}
+        for sample in samples:
+            statuses[str(sample[1])] = statuses.get(str(sample[1]), 0) + 1
+        queries = [sample[3] for sample in samples if sample[3] is not None]
+        return {
+            'method': route.method,
+            'role': route.role,
+            'concurrency': concurrency,
+            'requests': len(samples),
+            'statuses': statuses,
+            'errors': sum(1 for sample in samples if sample[1] not in route.expect),
+            'p50_ms': percentile(latencies, 0.50),
+            'p95_ms': percentile(latencies, 0.95),
+            'p99_ms': percentile(latencies, 0.99),
+            'mean_ms': statistics.fmean(latencies),
+            'max_ms': latencies[-1],
+            'throughput_rps': len(samples) / elapsed,
+            'queries_mean': statistics.fmean(queries) if queries else None,
+            'queries_max': max(queries) if queries else None,
+            'bytes_mean': statistics.fmean(sample[2] for sample in samples),
+        }
+
+    def compare(self, path, results, threshold):
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.stdout.write(f"\nAgainst {path} ({baseline['meta'].get('commit') or 'unknown commit'})")
+        self.stdout.write(f"  {'route':<28} {'p95 before':>11} {'after':>8} {'queries before':>15} {'after':>6}")
+        regressions = []
+        for name, after in results['routes'].items():
+            before = baseline['routes'].get(name)
+            if before is None:
+                continue
+            slower = after['p95_ms'] > before['p95_ms'] * threshold
+            more_queries = (after['queries_mean'] is not None and before['queries_mean'] is not None
+                            and after['queries_mean'] > before['queries_mean'] * threshold + 0.5)
+            flag = '  <-- regression' if slower or more_queries else ''
+            if flag:
+                regressions.append(name)
+            self.stdout.write(f"  {name:<28} {before['p95_ms']:>11.1f} {after['p95_ms']:>8.1f} "
+                              f"{before['queries_mean'] if before['queries_mean'] is not None else '-':>15} "
+                              f"{after['queries_mean'] if after['queries_mean'] is not None else '-':>6}{flag}")
+        return regressions
+
+    def commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
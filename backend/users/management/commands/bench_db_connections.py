@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from users.models import Issue
+
+
+MODES = [
+    # label, CONN_MAX_AGE, CONN_HEALTH_CHECKS
+    ('new connection per request', 0, False),
+    ('persistent', 60, False),
+    ('persistent + health checks', 60, True),
+]
+
+
+class Command(BaseCommand):
+    help = ("Times simulated requests (request_started, one query, request_finished) with a new "
+            "connection per request and with persistent connections, to size DB_CONN_MAX_AGE")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per mode")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        configured = (settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'])
+        self.stdout.write(f"{connection.vendor} {settings_dict.get('HOST') or settings_dict['NAME']}, "
+                          f"configured CONN_MAX_AGE={configured[0]} CONN_HEALTH_CHECKS={configured[1]}")
+
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            if connection.alias == options['database']:
+                opened.append(connection.alias)
+
+        connection_created.connect(count_connection)
+        try:
+            baseline = None
+            for label, max_age, health_checks in MODES:
+                settings_dict['CONN_MAX_AGE'] = max_age
+                settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                connection.close()
+                opened.clear()
+                times = self.time_requests(options['database'], options['requests'])
+                p50, p95 = times[len(times) // 2], times[int(len(times) * 0.95)]
+                baseline = baseline or p50
+                self.stdout.write(f"  {label:<28} p50 {p50 * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms  "
+                                  f"{len(opened):>4} connection(s) opened  ({p50 / baseline:.2f}x)")
+        finally:
+            connection_created.disconnect(count_connection)
+            settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'] = configured
+            connection.close()
+
+    def time_requests(self, alias, requests):
+        issues = Issue.objects.using(alias).order_by('-id').values_list('id', flat=True)
+        times = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            # close_old_connections runs on both signals, as in a real request
+            request_started.send(sender=self.__class__)
+            list(issues[:20])
+            request_finished.send(sender=self.__class__)
+            times.append(time.perf_counter() - started)
+        return sorted(times)
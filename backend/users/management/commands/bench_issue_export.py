@@ -0,0 +1,81 @@
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from users.models import Issue, User
+from users.seeding import seed_issues, seed_users
+from users.serializers import IssueSerializer
+from users.views import RegistrarIssueExportView
+
+
+class Command(BaseCommand):
+    help = "Times the streaming issue export (CSV and XLSX) and reports its peak Python memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Bulk create this many issues first (e.g. 1000000)")
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--lecturers', type=int, default=200)
+        parser.add_argument('--format', choices=['csv', 'xlsx', 'both'], default='both')
+        parser.add_argument('--status', default=None, help="Export only issues with this status")
+        parser.add_argument('--compare-json', action='store_true',
+                            help="Also time serializing the same issues into one in-memory JSON list, like the old list view")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options)
+        registrar = User.objects.filter(role='registrar').first()
+        if registrar is None:
+            self.stderr.write("Needs a registrar user, run with --seed")
+            return
+        count = Issue.objects.count()
+        self.stdout.write(f"{count} issues")
+
+        formats = ['csv', 'xlsx'] if options['format'] == 'both' else [options['format']]
+        params = {'status': options['status']} if options['status'] else {}
+        for file_format in formats:
+            self.measure(f"export {file_format}", lambda: self.export(registrar, file_format, params))
+        if options['compare_json']:
+            self.measure("json list (in memory)", lambda: self.serialize_all(params))
+
+    def seed(self, options):
+        rng = random.Random(42)
+        students = seed_users('student', options['students'], prefix='bench', rng=rng)
+        lecturers = seed_users('lecturer', options['lecturers'], prefix='bench', rng=rng)
+        if not User.objects.filter(role='registrar').exists():
+            seed_users('registrar', 1, prefix='bench', rng=rng)
+        started = time.perf_counter()
+        seed_issues(options['seed'], students, lecturers, rng=rng,
+                    progress=lambda done: self.stdout.write(f"  seeded {done} issues", ending='\r'))
+        self.stdout.write(f"\nSeeded {options['seed']} issues in {time.perf_counter() - started:.1f}s")
+
+    def export(self, registrar, file_format, params):
+        request = APIRequestFactory().get(f'/api/registrar/issues/export/{file_format}/', params)
+        force_authenticate(request, user=registrar)
+        response = RegistrarIssueExportView.as_view()(request, file_format=file_format)
+        size = 0
+        first_chunk = None
+        started = time.perf_counter()
+        for chunk in response.streaming_content:
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - started
+            size += len(chunk)
+        return size, first_chunk
+
+    def serialize_all(self, params):
+        issues = Issue.objects.with_related().filter(**params).order_by('created_at')
+        return len(JSONRenderer().render(IssueSerializer(issues, many=True).data)), None
+
+    def measure(self, label, run):
+        # tracemalloc slows the run down a lot, so the times are only comparable to each other
+        tracemalloc.start()
+        started = time.perf_counter()
+        size, first_chunk = run()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        first = f", first bytes after {first_chunk * 1000:.0f} ms" if first_chunk is not None else ""
+        self.stdout.write(f"  {label}: {elapsed:.2f}s, {size / 1e6:.1f} MB, peak Python memory {peak / 1e6:.1f} MB{first}")
@@ -0,0 +1,113 @@
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+
+from users import views
+from users.models import Issue, User
+from users.pagination import KeysetPagination
+from users.seeding import seed_issues, seed_users
+
+
+# (label, view class, role of the user making the request, extra query params)
+VIEW_QUERIES = [
+    ('student my-issues', views.StudentIssueView, 'student', {}),
+    ('resolved-issues', views.ResolvedIssuesView, 'lecturer', {}),
+    ('lecturer assigned-issues', views.LecturerAssignedIssuesView, 'lecturer', {}),
+    ('lecturer pending_issues', views.LecturerPendingIssuesView, 'lecturer', {}),
+    ('registrar issues', views.RegistrarIssueView, 'registrar', {}),
+    ('registrar issues ?status=pending', views.RegistrarIssueView, 'registrar', {'status': 'pending'}),
+    ('registrar issues ?status=pending&category=appeal', views.RegistrarIssueView, 'registrar', {'status': 'pending', 'category': 'appeal'}),
+]
+
+
+class Command(BaseCommand):
+    help = "Reports EXPLAIN plans and latency of the querysets behind each issue view, with and without the issue indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Bulk create this many issues first (e.g. 1000000)")
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--lecturers', type=int, default=200)
+        parser.add_argument('--runs', type=int, default=20, help="Timed runs per queryset")
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--compare', action='store_true',
+                            help="Also measure with the Issue Meta.indexes dropped (they are re-created afterwards)")
+        parser.add_argument('--no-explain', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options)
+
+        # Planner statistics, without them SQLite guesses badly at index selectivity
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        users = {role: User.objects.filter(role=role).order_by('?').first() for role in ('student', 'lecturer', 'registrar')}
+        # Benchmark the busiest lecturer, that's the slow dashboard
+        busiest = Issue.objects.order_by().exclude(assigned_to=None).values('assigned_to').annotate(n=Count('id')).order_by('-n').first()
+        if busiest:
+            users['lecturer'] = User.objects.get(id=busiest['assigned_to'])
+        self.stdout.write(f"{Issue.objects.count()} issues on {connection.vendor}")
+
+        if options['compare']:
+            indexes = Issue._meta.indexes
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(Issue, index)
+            try:
+                before = self.measure(users, options, 'without indexes')
+            finally:
+                with connection.schema_editor() as editor:
+                    for index in indexes:
+                        editor.add_index(Issue, index)
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+            after = self.measure(users, options, 'with indexes')
+            self.stdout.write("\nSummary (median ms, without -> with indexes)")
+            for label in before:
+                self.stdout.write(f"  {label:<52} {before[label]:>9.2f} -> {after[label]:>9.2f}")
+        else:
+            self.measure(users, options, 'current schema')
+
+    def seed(self, options):
+        rng = random.Random(42)
+        students = seed_users('student', options['students'], prefix='bench', rng=rng)
+        lecturers = seed_users('lecturer', options['lecturers'], prefix='bench', rng=rng)
+        if not User.objects.filter(role='registrar').exists():
+            seed_users('registrar', 1, prefix='bench', rng=rng)
+        started = time.perf_counter()
+        seed_issues(options['seed'], students, lecturers, rng=rng,
+                    progress=lambda done: self.stdout.write(f"  seeded {done} issues", ending='\r'))
+        self.stdout.write(f"\nSeeded {options['seed']} issues in {time.perf_counter() - started:.1f}s")
+
+    def first_page(self, view_class, user, params, page_size):
+        # Build the queryset exactly as the view and its paginator would
+        view = view_class()
+        view.request = SimpleNamespace(user=user, GET=params, query_params=params)
+        view.kwargs = {}
+        view.format_kwarg = None
+        queryset = view.get_queryset()
+        for backend in getattr(view, 'filter_backends', []):
+            queryset = backend().filter_queryset(view.request, queryset, view)
+        ordering = KeysetPagination().get_ordering(view.request, queryset, view)
+        return queryset.order_by(*ordering)[:page_size]
+
+    def measure(self, users, options, title):
+        self.stdout.write(f"\n=== {title} ===")
+        results = {}
+        for label, view_class, role, params in VIEW_QUERIES:
+            queryset = self.first_page(view_class, users[role], params, options['page_size'])
+            if not options['no_explain']:
+                self.stdout.write(f"\n-- {label}\n{queryset.explain()}")
+            timings = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = statistics.median(timings)
+            self.stdout.write(f"   {label}: median {results[label]:.2f} ms, max {max(timings):.2f} ms")
+        return results
@@ -0,0 +1,57 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from users.directory import invalidate_lecturer_directory, lecturer_directory
+from users.models import LecturerProfile, User
+from users.seeding import seed_users
+
+
+class Command(BaseCommand):
+    help = "Compares typeahead lookups through the in-memory lecturer directory with the old icontains queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Bulk create this many lecturers first")
+        parser.add_argument('--queries', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed_users('lecturer', options['seed'], prefix='bench', rng=random.Random(7))
+            invalidate_lecturer_directory()
+
+        names = list(User.objects.filter(role='lecturer').values_list('first_name', 'last_name'))
+        if not names:
+            self.stderr.write("No lecturers, run with --seed N")
+            return
+        rng = random.Random(1)
+        # Prefixes of 1 to 4 characters, the way someone types into the assignment dialog
+        queries = []
+        for _ in range(options['queries']):
+            name = rng.choice(rng.choice(names)) or 'a'
+            queries.append(name[:rng.randint(1, 4)])
+        self.stdout.write(f"{len(names)} lecturers, {len(queries)} lookups")
+
+        def database(query):
+            matching = User.objects.filter(role='lecturer').filter(
+                Q(first_name__icontains=query) | Q(last_name__icontains=query)
+            )
+            return list(LecturerProfile.objects.select_related('user').filter(user__in=matching))
+
+        started = time.perf_counter()
+        lecturer_directory.search('')
+        self.stdout.write(f"directory load: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        for label, lookup in [('database icontains', database), ('directory', lecturer_directory.search)]:
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                lookup(query)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f"{label:<20} median {statistics.median(timings):8.3f} ms   "
+                f"p99 {timings[int(len(timings) * 0.99) - 1]:8.3f} ms"
+            )
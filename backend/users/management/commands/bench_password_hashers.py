@@ -0,0 +1,49 @@
+import time
+
+from django.contrib.auth.hashers import (Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher,
+                                         get_hasher)
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Times one password check with PBKDF2, scrypt at several work factors and Argon2 (if installed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5, help="Checks per hasher; the median is reported")
+        parser.add_argument('--target-ms', type=float, default=50,
+                            help="Suggest the largest scrypt work factor whose check stays under this")
+
+    def handle(self, *args, **options):
+        candidates = [('pbkdf2 (Django default)', PBKDF2PasswordHasher())]
+        for exponent in range(12, 18):
+            hasher = ScryptPasswordHasher()
+            hasher.work_factor = 2 ** exponent
+            hasher.maxmem = 128 * hasher.work_factor * hasher.block_size * 2
+            candidates.append((f'scrypt n=2**{exponent} ({128 * hasher.work_factor * hasher.block_size >> 20} MB)', hasher))
+        try:
+            import argon2  # noqa: F401
+            candidates.append(('argon2 (Django default)', Argon2PasswordHasher()))
+        except ImportError:
+            self.stdout.write("argon2-cffi is not installed, skipping Argon2")
+
+        configured = get_hasher('default')
+        self.stdout.write(f"Configured hasher: {configured.algorithm} {configured.safe_summary(configured.encode('x', configured.salt()))}")
+
+        suggested = None
+        for label, hasher in candidates:
+            median = self.time_check(hasher, options['rounds'])
+            self.stdout.write(f"  {label}: {median * 1000:.1f} ms per check, ~{1 / median:.0f} logins/s per core")
+            if isinstance(hasher, ScryptPasswordHasher) and median * 1000 <= options['target_ms']:
+                suggested = hasher.work_factor
+        if suggested:
+            self.stdout.write(f"Largest scrypt work factor under {options['target_ms']:.0f} ms: "
+                              f"PASSWORD_SCRYPT_PARAMS = {{'work_factor': {suggested}}}")
+
+    def time_check(self, hasher, rounds):
+        encoded = hasher.encode('correct horse battery staple', hasher.salt())
+        times = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            hasher.verify('correct horse battery staple', encoded)
+            times.append(time.perf_counter() - started)
+        return sorted(times)[len(times) // 2]
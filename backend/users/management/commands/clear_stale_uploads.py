@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.uploads import clear_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Removes chunked uploads that were never completed, with their temp files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=None, help="Idle time after which an open upload is removed")
+
+    def handle(self, *args, **options):
+        removed = clear_stale_uploads(options['hours'])
+        self.stdout.write(f"Removed {removed} stale upload(s)")
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.previews import backfill_previews, preview_executor, process_previews
+
+
+class Command(BaseCommand):
+    help = "Makes thumbnails and extracts text from issue attachments in a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+        parser.add_argument('--batch-size', type=int, default=None, help="Attachments claimed per round")
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new attachments instead of exiting")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when there is nothing to do")
+        parser.add_argument('--backfill', action='store_true', help="First queue issues whose attachment has no preview yet")
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            self.stdout.write(f"Queued {backfill_previews()} attachment(s)")
+        with preview_executor(options['workers']) as executor:
+            while True:
+                done, failed = process_previews(executor, options['batch_size'])
+                if done or failed:
+                    self.stdout.write(f"Previewed {done} attachment(s), {failed} failed")
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from users.notifications import prune_notifications, recount_unread
+
+
+class Command(BaseCommand):
+    help = "Deletes old notifications so the inbox table stays small (run it daily, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-days', type=int, default=None, help="Age after which read notifications are deleted")
+        parser.add_argument('--unread-days', type=int, default=None, help="Age after which any notification is deleted")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows deleted per transaction")
+        parser.add_argument('--recount', action='store_true', help="Also rebuild every unread counter from the table")
+
+    def handle(self, *args, **options):
+        deleted = prune_notifications(options['read_days'], options['unread_days'], options['batch_size'])
+        self.stdout.write(f"Deleted {deleted} notification(s)")
+        if options['recount']:
+            recount_unread()
+            self.stdout.write("Unread counters rebuilt")
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text issue search index from scratch (e.g. after bulk loading issues)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild_index(options['batch_size'])
+        self.stdout.write(f"Indexed {total} issues in {time.perf_counter() - started:.1f}s")
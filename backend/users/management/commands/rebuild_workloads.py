@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.workload import refresh_workloads
+
+
+class Command(BaseCommand):
+    help = ("Recounts every lecturer's workload from their issues (e.g. after bulk loading issues, "
+            "or nightly to correct changes made around the signals)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        lecturers, corrected = refresh_workloads()
+        self.stdout.write(f"Counted {lecturers} lecturers in {time.perf_counter() - started:.1f}s, {corrected} row(s) were missing or wrong")
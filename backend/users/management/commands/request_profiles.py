@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import RequestProfile
+from users.profiling import prune_profiles
+
+
+class Command(BaseCommand):
+    help = "Lists recent request profiles, writes one out as collapsed stacks, or deletes old ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', default='', help="Only profiles of this url name")
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--download', type=int, metavar='ID', help="Write this profile's collapsed stacks")
+        parser.add_argument('--output', default='', help="File for --download, default stdout (e.g. | flamegraph.pl > out.svg)")
+        parser.add_argument('--prune', action='store_true', help="Delete profiles older than --days")
+        parser.add_argument('--days', type=int, default=None, help="Default PROFILING_RETENTION_DAYS")
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            self.stdout.write(f"Deleted {prune_profiles(options['days'])} profile(s)")
+            return
+        if options['download']:
+            profile = RequestProfile.objects.filter(pk=options['download']).first()
+            if profile is None:
+                raise CommandError(f"No profile {options['download']}")
+            if options['output']:
+                with open(options['output'], 'w') as output:
+                    output.write(profile.stacks + '\n')
+                self.stderr.write(f"Wrote {profile.samples} samples of {profile.view} to {options['output']}")
+            else:
+                sys.stdout.write(profile.stacks + '\n')
+            return
+
+        profiles = RequestProfile.objects.defer('stacks').order_by('-created_at', '-id')
+        if options['view']:
+            profiles = profiles.filter(view=options['view'])
+        for profile in profiles[:options['limit']]:
+            self.stdout.write(f"{profile.id:>6}  {profile.created_at:%Y-%m-%d %H:%M:%S}  {profile.method:<6} {profile.view:<28} "
+                              f"{profile.status_code}  {profile.duration_ms:>8.1f} ms  {profile.samples:>5} samples  {profile.trigger}")
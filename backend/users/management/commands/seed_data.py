@@ -0,0 +1,50 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.directory import invalidate_lecturer_directory
+from users.search import rebuild_index
+from users.seeding import SEED_PASSWORD, seed_issues, seed_users
+from users.stats import invalidate_issue_statistics
+from users.workload import refresh_workloads
+
+
+class Command(BaseCommand):
+    help = "Bulk creates synthetic students, lecturers, registrars (with profiles) and issues for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--lecturers', type=int, default=100)
+        parser.add_argument('--registrars', type=int, default=2)
+        parser.add_argument('--issues', type=int, default=20000, help="e.g. 1000000 for a results-release sized table")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, the same seed gives the same data")
+        parser.add_argument('--prefix', default='seed', help="Username prefix, e.g. seed_student_0")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--no-index', action='store_true',
+                            help="Skip rebuilding the search index (bulk_create does not send the signals that keep it current)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        users = {}
+        for role in ('student', 'lecturer', 'registrar'):
+            users[role] = seed_users(role, options[f'{role}s'], prefix=options['prefix'], rng=rng)
+            self.stdout.write(f"{len(users[role])} {role}s")
+        if options['issues'] and not users['student']:
+            self.stderr.write("Issues need at least one student")
+            return
+
+        seed_issues(options['issues'], users['student'], users['lecturer'], rng=rng, batch_size=options['batch_size'],
+                    progress=lambda done: self.stdout.write(f"  {done} issues", ending='\r'))
+        self.stdout.write(f"\nSeeded in {time.perf_counter() - started:.1f}s, every seeded user's password is '{SEED_PASSWORD}'")
+
+        # Caches the skipped signals would have cleared
+        invalidate_issue_statistics()
+        invalidate_lecturer_directory()
+        lecturers, _ = refresh_workloads()
+        self.stdout.write(f"Counted the workload of {lecturers} lecturers")
+        if not options['no_index']:
+            started = time.perf_counter()
+            total = rebuild_index()
+            self.stdout.write(f"Indexed {total} issues in {time.perf_counter() - started:.1f}s")
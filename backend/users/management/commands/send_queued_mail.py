@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = "Delivers emails waiting in the outbox, optionally running forever as a worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Messages sent per SMTP connection")
+        parser.add_argument('--loop', action='store_true', help="Keep polling the outbox instead of exiting once it is empty")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when the outbox is empty")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_mail(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed")
+                continue
+            # Outbox is drained
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
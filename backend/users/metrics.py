@@ -0,0 +1,227 @@
+# users/metrics.py
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+
+# A small in-process metrics registry, scraped by Prometheus from /metrics.
+# Each server process keeps its own numbers, and a scrape is answered by
+# whichever process gets it. That is only the whole picture with a single
+# process. Server workers share one address, so Prometheus can't scrape them
+# one by one. When there are several workers, METRICS_MULTIPROCESS_DIR names
+# a directory they share. Each process then writes its numbers to its own
+# file there, at most once per METRICS_FLUSH_SECONDS, and /metrics adds up
+# every file. Files of exited workers are kept, so counters never go down.
+# The directory should be emptied before the server starts.
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self.changed()
+
+    def changed(self):
+        # Set by Registry.register
+        pass
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels.get(label, '')) for label in self.labels), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def empty(self):
+        return Counter(self.name, self.documentation, self.labels)
+
+    def merge(self, snapshot):
+        for key, value in snapshot:
+            key = tuple(key)
+            self._values[key] = self._values.get(key, 0) + value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for name, labels, value in self.samples():
+            lines.append(f'{name}{format_labels(labels)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values = {}  # label values -> [count per bucket..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        bucket = bisect_left(self.buckets, value)  # the first bound >= value, len(buckets) for +Inf
+        with self._lock:
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = [0] * (len(self.buckets) + 2)
+            values[bucket] += 1
+            values[-1] += value
+        self.changed()
+
+    def changed(self):
+        # Set by Registry.register
+        pass
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(counts)] for key, counts in self._values.items()]
+
+    def empty(self):
+        return Histogram(self.name, self.documentation, self.labels, buckets=self.buckets)
+
+    def merge(self, snapshot):
+        for key, counts in snapshot:
+            if len(counts) != len(self.buckets) + 2:
+                continue  # written with other buckets, before a deploy changed them
+            key = tuple(key)
+            values = self._values.setdefault(key, [0] * len(counts))
+            for index, count in enumerate(counts):
+                values[index] += count
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            values = {key: list(counts) for key, counts in self._values.items()}
+        for key, counts in sorted(values.items()):
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{format_labels({**labels, "le": bound})} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {counts[-1]}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"')) for key, value in labels.items())
+    return '{' + pairs + '}'
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._flush_lock = threading.Lock()
+        self._flushed = 0.0
+        self._pid = None
+        self._path = None
+
+    def register(self, metric):
+        # Registering the same name twice returns the first metric, so module reloads are harmless
+        with self._lock:
+            metric = self._metrics.setdefault(metric.name, metric)
+        metric.changed = self.changed
+        return metric
+
+    def directory(self):
+        return getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+
+    def changed(self):
+        if self.directory() and time.monotonic() - self._flushed >= getattr(settings, 'METRICS_FLUSH_SECONDS', 1):
+            self.flush(wait=False)
+
+    def flush(self, wait=True):
+        """
+        Writes this process's numbers to its file in METRICS_MULTIPROCESS_DIR.
+        Without wait it gives up if another thread is already writing.
+        """
+        directory = self.directory()
+        if not directory or not self._flush_lock.acquire(blocking=wait):
+            return
+        try:
+            self._flushed = time.monotonic()
+            if self._pid != os.getpid():
+                # A forked worker gets a file of its own, and a reused pid doesn't overwrite a dead worker's
+                self._pid = os.getpid()
+                self._path = os.path.join(directory, f'{self._pid}-{time.time_ns()}.json')
+            snapshot = {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+            temporary = f'{self._path}.tmp'
+            os.makedirs(directory, exist_ok=True)
+            with open(temporary, 'w') as file:
+                json.dump(snapshot, file)
+            os.replace(temporary, self._path)  # readers never see half a file
+        except OSError:
+            # Metrics aren't worth failing a request over, the next flush tries again
+            logger.warning('could not write metrics to %s', directory, exc_info=True)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        # This process's metrics, or with METRICS_MULTIPROCESS_DIR every process's added up
+        directory = self.directory()
+        if not directory:
+            return list(self._metrics.values())
+        self.flush()
+        merged = {name: metric.empty() for name, metric in list(self._metrics.items())}
+        for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for name, values in snapshot.items():
+                if name in merged:
+                    merged[name].merge(values)
+        return list(merged.values())
+
+    def render(self):
+        lines = []
+        for metric in self.collect():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+atexit.register(registry.flush)  # what changed since the last flush, when a worker exits cleanly
+
+
+def counter(name, documentation, labels=()):
+    return registry.register(Counter(name, documentation, labels))
+
+
+def histogram(name, documentation, labels=(), **kwargs):
+    return registry.register(Histogram(name, documentation, labels, **kwargs))
+
+
+def metrics_view(request):
+    # Prometheus text format; only the addresses in METRICS_ALLOWED_IPS may scrape it
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if allowed and request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
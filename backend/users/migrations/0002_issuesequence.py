@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:39
+
+from django.db import migrations, models
+
+
+def seed_issue_sequence(apps, schema_editor):
+    # Start the allocator after the highest ISSxxxx id that already exists
+    Issue = apps.get_model('users', 'Issue')
+    IssueSequence = apps.get_model('users', 'IssueSequence')
+    highest = 0
+    for issue_id in Issue.objects.filter(issue_id__startswith='ISS').values_list('issue_id', flat=True):
+        try:
+            highest = max(highest, int(issue_id[3:]))
+        except ValueError:
+            continue
+    IssueSequence.objects.create(name='issue_id', next_value=highest + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+            ],
+        ),
+        migrations.RunPython(seed_issue_sequence, migrations.RunPython.noop),
+    ]
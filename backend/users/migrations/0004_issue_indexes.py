@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['assigned_to', 'created_at', 'id'], name='issue_lecturer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(condition=models.Q(('status', 'resolved'), _negated=True), fields=['assigned_to', 'created_at'], name='issue_lecturer_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(condition=models.Q(('status', 'resolved')), fields=['assigned_to', 'resolved_at'], name='issue_lecturer_resolved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['submitted_by', 'created_at', 'id'], name='issue_student_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['created_at', 'id'], name='issue_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['status', 'category', 'created_at'], name='issue_status_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='issue_pending_created_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE users_issue_fts USING fts5("
+    "title, description, course_unit, student_name, registration_no, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO users_issue_fts (rowid, title, description, course_unit, student_name, registration_no) "
+    "SELECT i.id, i.title, i.description, i.course_unit, u.first_name || ' ' || u.last_name, "
+    "COALESCE(p.registration_no || ' ' || p.student_no, i.registration_no || ' ' || i.student_no) "
+    "FROM users_issue i JOIN users_user u ON u.id = i.submitted_by_id "
+    "LEFT JOIN users_studentprofile p ON p.user_id = u.id",
+]
+SQLITE_DROP = ["DROP TABLE IF EXISTS users_issue_fts"]
+
+POSTGRES_CREATE = [
+    "CREATE TABLE users_issuesearch ("
+    "issue_id bigint PRIMARY KEY REFERENCES users_issue (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX users_issuesearch_document_gin ON users_issuesearch USING gin (document)",
+    "INSERT INTO users_issuesearch (issue_id, document) "
+    "SELECT i.id, "
+    "setweight(to_tsvector('simple', i.title), 'A') || "
+    "setweight(to_tsvector('simple', u.first_name || ' ' || u.last_name || ' ' || "
+    "COALESCE(p.registration_no || ' ' || p.student_no, i.registration_no || ' ' || i.student_no)), 'B') || "
+    "setweight(to_tsvector('simple', i.course_unit), 'C') || "
+    "setweight(to_tsvector('simple', i.description), 'D') "
+    "FROM users_issue i JOIN users_user u ON u.id = i.submitted_by_id "
+    "LEFT JOIN users_studentprofile p ON p.user_id = u.id",
+]
+POSTGRES_DROP = ["DROP TABLE IF EXISTS users_issuesearch"]
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+    # The full-text index lives outside the ORM, see users/search.py
+
+    dependencies = [
+        ('users', '0004_issue_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_CREATE, 'postgresql': POSTGRES_CREATE}),
+            run({'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}),
+        ),
+    ]
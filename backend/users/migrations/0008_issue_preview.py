@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_attachment_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssuePreview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('thumbnail', models.FileField(blank=True, max_length=255, upload_to='previews/')),
+                ('text', models.TextField(blank=True)),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('issue', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='preview', to='users.issue')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='preview_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:37
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+
+def backfill_updated_at(apps, schema_editor):
+    # The last change we know of, instead of the time the migration ran
+    Issue = apps.get_model('users', 'Issue')
+    Issue.objects.update(updated_at=Coalesce(F('resolved_at'), F('created_at')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_request_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['submitted_by', 'updated_at'], name='issue_student_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['assigned_to', 'updated_at'], name='issue_lecturer_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:41
+
+import django.db.models.deletion
+from django.conf import settings
+from datetime import datetime, time, timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def count_workloads(apps, schema_editor):
+    Issue = apps.get_model('users', 'Issue')
+    LecturerProfile = apps.get_model('users', 'LecturerProfile')
+    LecturerWorkload = apps.get_model('users', 'LecturerWorkload')
+    today = timezone.localdate()
+    week = today - timedelta(days=today.weekday())
+    since = timezone.make_aware(datetime.combine(week, time.min))
+    counts = {
+        row['assigned_to']: row for row in Issue.objects.filter(assigned_to__isnull=False).order_by().values('assigned_to').annotate(
+            open_issues=Count('pk', filter=~Q(status='resolved')),
+            in_progress=Count('pk', filter=Q(status='in_progress')),
+            resolved=Count('pk', filter=Q(status='resolved', resolved_at__gte=since)),
+        )
+    }
+    LecturerWorkload.objects.bulk_create([
+        LecturerWorkload(
+            lecturer_id=lecturer_id, department=department, resolved_week=week,
+            open_issues=counts.get(lecturer_id, {}).get('open_issues', 0),
+            in_progress=counts.get(lecturer_id, {}).get('in_progress', 0),
+            resolved_week_count=counts.get(lecturer_id, {}).get('resolved', 0),
+        )
+        for lecturer_id, department in LecturerProfile.objects.values_list('user_id', 'department')
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_issue_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LecturerWorkload',
+            fields=[
+                ('lecturer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='workload', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('department', models.CharField(choices=[('CS', 'Department of Computer Science'), ('IS', 'Department of Information Systems'), ('DIT', 'Department of Information Technology'), ('NET', 'Department of Networks'), ('RAM', 'Department of Records and Archives Management'), ('LIS', 'Department of Library & Information Science')], max_length=100)),
+                ('open_issues', models.PositiveIntegerField(default=0)),
+                ('in_progress', models.PositiveIntegerField(default=0)),
+                ('resolved_week', models.DateField(blank=True, null=True)),
+                ('resolved_week_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['department', 'open_issues', 'lecturer'], name='workload_least_loaded_idx')],
+            },
+        ),
+        migrations.RunPython(count_workloads, migrations.RunPython.noop),
+    ]
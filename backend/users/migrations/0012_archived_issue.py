@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_lecturer_workload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedIssue',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('issue_id', models.CharField(max_length=20, unique=True)),
+                ('student_no', models.CharField(max_length=20)),
+                ('registration_no', models.CharField(max_length=20)),
+                ('category', models.CharField(choices=[('missing_marks', 'Missing Marks'), ('appeal', 'Appeal'), ('correction', 'Correction'), ('others', 'Others')], max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('resolved', 'Resolved')], max_length=20)),
+                ('description', models.TextField()),
+                ('course_unit', models.CharField(max_length=100)),
+                ('year_of_study', models.IntegerField(choices=[(1, '1'), (2, '2'), (3, '3'), (4, '4')])),
+                ('semester', models.CharField(choices=[('Semester 1', 'Semester 1'), ('Semester 2', 'Semester 2')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('lecturer_name', models.CharField(max_length=255)),
+                ('title', models.CharField(max_length=255)),
+                ('attachments', models.FileField(blank=True, null=True, upload_to='issue_attachments/')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(condition=models.Q(('status', 'resolved')), fields=['resolved_at', 'id'], name='issue_resolved_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedissue',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_assigned_issues', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedissue',
+            name='submitted_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_submitted_issues', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
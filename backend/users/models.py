@@ -1,9 +1,14 @@
 # users/models.py
+import uuid
+from datetime import timedelta
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from .allocators import allocate_issue_id
+
 
 class User(AbstractUser):
     
@@ -15,6 +20,9 @@ class User(AbstractUser):
     
     email = models.EmailField(unique=True)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    # Set by save() (not by the last_login update); the profile ETags and the
+    # lecturer directory read it (users/conditional.py, users/directory.py)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Method for students to submit issues
     def submit_issue(self, category, description, course_unit, semester, year_of_study):
@@ -55,6 +63,7 @@ class StudentProfile(models.Model):
     registration_no = models.CharField(max_length=50, unique=True)  # Unique student identifier
     student_no = models.CharField(max_length=50, unique=True)
     programme = models.CharField(max_length=100, choices=PROGRAMME_CHOICES)
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 # Profile model for lecturers, linked to the User model
@@ -69,12 +78,26 @@ class LecturerProfile(models.Model):
     ]
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='lecturer_profile')
     department = models.CharField(max_length=100, choices=DEPARTMENT_CHOICES)  # Changed from ForeignKey to CharField
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 
 class RegistrarProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='registrar_profile')
     college = models.CharField(max_length=100)  # College name
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class IssueQuerySet(models.QuerySet):
+    def with_related(self):
+        # Joins everything IssueSerializer reads from the student and lecturer,
+        # so listing issues costs one query however many rows come back
+        return self.select_related('submitted_by', 'submitted_by__student_profile', 'assigned_to', 'preview')
+
+    def touch(self):
+        # For changes that show in IssueSerializer without saving the issue (student
+        # details, previews), so conditional GETs see them (users/conditional.py)
+        return self.update(updated_at=timezone.now())
 
 
 class Issue(models.Model):
@@ -115,21 +138,269 @@ class Issue(models.Model):
     submitted_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="submitted_issues")
     assigned_to = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="assigned_issues")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set by save(); bulk_update() and update() callers must set it themselves
+    updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
     lecturer_name = models.CharField(max_length=255)
     title = models.CharField(max_length=255)
     attachments = models.FileField(upload_to="issue_attachments/", blank=True, null=True)
 
+    objects = IssueQuerySet.as_manager()
+
+    class Meta:
+        # Matches how the views read issues, see bench_issue_queries for the plans
+        indexes = [
+            # lecturer dashboards: assigned_to filter, ordered by date / cursor
+            models.Index(fields=['assigned_to', 'created_at', 'id'], name='issue_lecturer_created_idx'),
+            models.Index(fields=['assigned_to', 'created_at'], condition=~models.Q(status='resolved'), name='issue_lecturer_open_idx'),
+            models.Index(fields=['assigned_to', 'resolved_at'], condition=models.Q(status='resolved'), name='issue_lecturer_resolved_idx'),
+            # student "my issues"
+            models.Index(fields=['submitted_by', 'created_at', 'id'], name='issue_student_created_idx'),
+            # registrar list, status/category filters and the pending queue
+            models.Index(fields=['created_at', 'id'], name='issue_created_idx'),
+            models.Index(fields=['status', 'category', 'created_at'], name='issue_status_category_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(status='pending'), name='issue_pending_created_idx'),
+            # batches of the archive_issues command
+            models.Index(fields=['resolved_at', 'id'], condition=models.Q(status='resolved'), name='issue_resolved_idx'),
+            # ETag version stamps, max(updated_at) and count(*) from the index alone
+            models.Index(fields=['submitted_by', 'updated_at'], name='issue_student_updated_idx'),
+            models.Index(fields=['assigned_to', 'updated_at'], name='issue_lecturer_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Issue {self.id} - {self.category} ({self.status})"
 
+    # Loaded values of the fields whose changes become issue events (users/signals.py)
+    TRACKED_FIELDS = ('status', 'assigned_to_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tracked_fields()
+        return instance
+
+    def remember_tracked_fields(self):
+        # What the change being signalled started from, for issue_lifecycle receivers
+        self._previous_state = getattr(self, '_loaded_state', {})
+        self._loaded_state = {field: self.__dict__[field] for field in self.TRACKED_FIELDS if field in self.__dict__}
+
     def save(self, *args, **kwargs):
         if not self.issue_id:
-            last_issue = Issue.objects.order_by('-id').first()  # checks last issue once created
-            if last_issue and last_issue.issue_id:
-                last_number = int(last_issue.issue_id.replace('ISS', ''))
-                new_number = last_number + 1
-            else:
-                new_number = 1
-            self.issue_id = f'ISS{new_number:04d}'
-        super().save(*args, **kwargs)
\ No newline at end of file
+            # ids come from a block reserved up front, so no lookup of the last issue is needed
+            self.issue_id = allocate_issue_id()
+        super().save(*args, **kwargs)
+
+
+# Counter row backing the issue_id allocator in users/allocators.py
+class IssueSequence(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name} -> {self.next_value}"
+
+
+# Outgoing email waiting to be delivered by the send_queued_mail worker (see users/mail.py)
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+
+# In-app notification inbox, written by users/notifications.py
+class Notification(models.Model):
+    KIND_CHOICES = [
+        ('assigned', 'Issue assigned'),
+        ('resolved', 'Issue resolved'),
+    ]
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name="notifications")
+    # Kept when the issue goes (as archiving does), a cascade would leave unread counters behind
+    issue = models.ForeignKey(Issue, null=True, blank=True, on_delete=models.SET_NULL, related_name="notifications")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    message = models.CharField(max_length=255)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the inbox page and the unread filter
+            models.Index(fields=['recipient', 'created_at', 'id'], name='notification_inbox_idx'),
+            models.Index(fields=['recipient', 'created_at'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            # pruning
+            models.Index(fields=['created_at'], name='notification_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient} - {self.message}"
+
+
+# Unread count per user, kept next to the inbox so the badge is a single row read
+class NotificationCounter(models.Model):
+    user = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE, related_name="notification_counter")
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} - {self.unread} unread"
+
+
+# One copy of each distinct attachment, keyed by its SHA-256 (see users/uploads.py)
+class StoredFile(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to="attachments/", max_length=255)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
+
+
+# A chunked upload in progress; chunks are appended to a temp file until it is completed
+class UploadSession(models.Model):
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('complete', 'Complete'),
+    ]
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    stored_file = models.ForeignKey(StoredFile, null=True, blank=True, on_delete=models.SET_NULL, related_name="uploads")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} {self.received}/{self.size} ({self.status})"
+
+
+# Thumbnail and extracted text of an issue's attachment, made by the
+# process_attachments worker (see users/previews.py)
+class IssuePreview(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    issue = models.OneToOneField(Issue, on_delete=models.CASCADE, related_name="preview")
+    source = models.CharField(max_length=255)  # attachment name the preview was made from
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    thumbnail = models.FileField(upload_to="previews/", max_length=255, blank=True)
+    text = models.TextField(blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='preview_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Preview of issue {self.issue_id} ({self.status})"
+
+
+# Stacks sampled from one request by the profiler (see users/profiling.py)
+class RequestProfile(models.Model):
+    TRIGGER_CHOICES = [
+        ('sampled', 'Sampled'),
+        ('header', 'Asked for with X-Profile'),
+    ]
+    view = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="request_profiles")
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    samples = models.PositiveIntegerField()
+    stacks = models.TextField()  # collapsed "outer;...;inner count" lines, as flamegraph.pl and speedscope read them
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['view', 'created_at'], name='profile_view_idx'),
+            models.Index(fields=['created_at'], name='profile_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.view} {self.duration_ms:.0f} ms ({self.created_at:%Y-%m-%d %H:%M})"
+
+
+# Issues on each lecturer's desk, kept current from issue_lifecycle by
+# users/workload.py so the registrar and auto-assignment never count issues
+class LecturerWorkload(models.Model):
+    lecturer = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE, related_name="workload")
+    department = models.CharField(max_length=100, choices=LecturerProfile.DEPARTMENT_CHOICES)  # copied from LecturerProfile
+    open_issues = models.PositiveIntegerField(default=0)  # assigned and not resolved, in progress included
+    in_progress = models.PositiveIntegerField(default=0)
+    resolved_week = models.DateField(null=True, blank=True)  # Monday of the week resolved_week_count is for
+    resolved_week_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # least loaded lecturer of a department, see users/workload.py
+            models.Index(fields=['department', 'open_issues', 'lecturer'], name='workload_least_loaded_idx'),
+        ]
+
+    @property
+    def resolved_this_week(self):
+        # The counter restarts with the first resolution of a new week
+        week = timezone.localdate()
+        return self.resolved_week_count if self.resolved_week == week - timedelta(days=week.weekday()) else 0
+
+    def __str__(self):
+        return f"{self.lecturer} - {self.open_issues} open"
+
+
+# Issues resolved before ISSUE_ARCHIVE_AFTER_DAYS, moved out of Issue by the
+# archive_issues command (users/archive.py) with their ids kept, so the issue
+# table only holds what dashboards work on
+class ArchivedIssue(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    issue_id = models.CharField(max_length=20, unique=True)
+    student_no = models.CharField(max_length=20)
+    registration_no = models.CharField(max_length=20)
+    category = models.CharField(max_length=100, choices=Issue.CATEGORY_CHOICES)
+    status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES)
+    description = models.TextField()
+    course_unit = models.CharField(max_length=100)
+    year_of_study = models.IntegerField(choices=Issue.YEAR_OF_STUDY)
+    semester = models.CharField(max_length=20, choices=Issue.SEMESTER_OF_STUDY)
+    submitted_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_submitted_issues")
+    assigned_to = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="archived_assigned_issues")
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    lecturer_name = models.CharField(max_length=255)
+    title = models.CharField(max_length=255)
+    attachments = models.FileField(upload_to="issue_attachments/", blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived issue {self.id} - {self.category}"
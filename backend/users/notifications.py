@@ -0,0 +1,124 @@
+# users/notifications.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Notification, NotificationCounter
+
+
+# In-app notifications. Every issue_lifecycle batch (users/signals.py) is
+# written with one bulk insert, and each recipient's unread total is kept in
+# NotificationCounter in the same transaction, so the badge never has to
+# count the inbox.
+
+
+def notification_for(kind, issue):
+    # (recipient id, message) for an issue change, or None if nobody is told
+    if kind == 'assigned' and issue.assigned_to_id:
+        return issue.assigned_to_id, f"Issue {issue.issue_id} '{issue.title}' has been assigned to you"
+    if kind == 'resolved' and issue.submitted_by_id:
+        return issue.submitted_by_id, f"Your issue {issue.issue_id} '{issue.title}' has been resolved"
+    return None
+
+
+def change_unread(counts):
+    """
+    Adds counts[user_id] (negative to subtract) to each user's unread counter
+    with a single UPDATE, creating missing counter rows first.
+    """
+    counts = {user_id: n for user_id, n in counts.items() if n}
+    if not counts:
+        return
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id in counts], ignore_conflicts=True
+    )
+    delta = Case(
+        *[When(user_id=user_id, then=Value(n)) for user_id, n in counts.items()],
+        default=Value(0), output_field=IntegerField(),
+    )
+    NotificationCounter.objects.filter(user_id__in=counts).update(unread=Greatest(F('unread') + delta, 0))
+
+
+def notify(changes):
+    # changes: (kind, issue, previous_assigned_to) tuples as sent with issue_lifecycle
+    notifications = []
+    for kind, issue, previous_assigned_to in changes:
+        target = notification_for(kind, issue)
+        if target:
+            recipient_id, message = target
+            notifications.append(Notification(recipient_id=recipient_id, issue=issue, kind=kind, message=message[:255]))
+    if not notifications:
+        return []
+    counts = {}
+    for notification in notifications:
+        counts[notification.recipient_id] = counts.get(notification.recipient_id, 0) + 1
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications)
+        change_unread(counts)
+    return notifications
+
+
+def unread_count(user):
+    return NotificationCounter.objects.filter(user=user).values_list('unread', flat=True).first() or 0
+
+
+def mark_read(user, notification_ids=None):
+    # Marks the given notifications (all of them when None) read, returns how many changed
+    with transaction.atomic():
+        unread = Notification.objects.filter(recipient=user, is_read=False)
+        if notification_ids is not None:
+            unread = unread.filter(id__in=notification_ids)
+        changed = unread.update(is_read=True, read_at=timezone.now())
+        change_unread({user.id: -changed})
+    return changed
+
+
+def recount_unread(user_ids=None):
+    """
+    Rebuilds the counters from the notification table, in case they ever
+    drift (e.g. rows removed by hand).
+    """
+    counters = NotificationCounter.objects.all()
+    if user_ids is not None:
+        counters = counters.filter(user_id__in=user_ids)
+    counters.update(unread=0)
+    unread = Notification.objects.filter(is_read=False)
+    if user_ids is not None:
+        unread = unread.filter(recipient_id__in=user_ids)
+    totals = dict(unread.values_list('recipient').annotate(total=Count('id')))
+    change_unread(totals)
+
+
+def prune_notifications(read_days=None, unread_days=None, batch_size=1000):
+    """
+    Deletes read notifications older than read_days and any notification
+    older than unread_days, in batches so the table isn't locked for long.
+    Returns the number of rows deleted.
+    """
+    if read_days is None:
+        read_days = getattr(settings, 'NOTIFICATION_READ_RETENTION_DAYS', 30)
+    if unread_days is None:
+        unread_days = getattr(settings, 'NOTIFICATION_UNREAD_RETENTION_DAYS', 180)
+    now = timezone.now()
+    expired = Notification.objects.filter(
+        Q(is_read=True, created_at__lt=now - timedelta(days=read_days)) |
+        Q(created_at__lt=now - timedelta(days=unread_days))
+    )
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(expired.order_by('created_at').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            # Unread rows going away have to come off the counters too
+            unread = dict(
+                Notification.objects.filter(id__in=ids, is_read=False)
+                .values_list('recipient').annotate(total=Count('id'))
+            )
+            Notification.objects.filter(id__in=ids).delete()
+            change_unread({user_id: -total for user_id, total in unread.items()})
+        deleted += len(ids)
@@ -0,0 +1,30 @@
+# users/pagination.py
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination for every list endpoint. Pages are fetched with a
+    `WHERE created_at > <cursor>` seek instead of OFFSET, so a deep page costs
+    the same as the first one, and the cursors in `next`/`previous` are opaque.
+
+    Views pick their own stable ordering with a `cursor_ordering` attribute,
+    e.g. ('created_at', 'id'); the default is newest first. A filter backend
+    with a get_ordering() method (like IssueSearchFilter) can override it for
+    a request.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 200)
+
+    def get_ordering(self, request, queryset, view):
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return tuple(ordering)
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
@@ -0,0 +1,158 @@
+# users/previews.py
+import hashlib
+import mimetypes
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .extract import render_preview
+from .models import Issue, IssuePreview, StoredFile
+from .search import index_issues
+from .uploads import SIGNATURES
+
+
+# Attachment previews. Saving an issue with an attachment queues an
+# IssuePreview (see users/signals.py); the process_attachments command claims
+# due rows like the mail outbox does and renders them in a process pool, since
+# image decoding and PDF parsing are CPU bound. The extracted text is added to
+# the issue's search document.
+
+
+def queue_preview(issue):
+    # Called after every issue save; only a new or changed attachment queues work
+    if not issue.attachments:
+        return
+    source = issue.attachments.name
+    changed = IssuePreview.objects.filter(issue_id=issue.pk).exclude(source=source).update(
+        source=source, status='pending', thumbnail='', text='', page_count=None,
+        attempts=0, last_error='', next_attempt_at=timezone.now(),
+    )
+    if not changed:
+        preview, created = IssuePreview.objects.get_or_create(issue_id=issue.pk, defaults={'source': source})
+        # So the response for this save already shows the pending preview
+        issue.preview = preview
+
+
+def claim_previews(batch_size):
+    lease = timedelta(seconds=getattr(settings, 'PREVIEW_LEASE_SECONDS', 600))
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            IssuePreview.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        IssuePreview.objects.filter(id__in=[preview.id for preview in batch]).update(next_attempt_at=now + lease)
+    return batch
+
+
+def record_failure(preview, error):
+    preview.attempts += 1
+    preview.last_error = str(error)
+    if preview.attempts >= getattr(settings, 'PREVIEW_MAX_ATTEMPTS', 3):
+        preview.status = 'failed'
+    else:
+        preview.next_attempt_at = timezone.now() + timedelta(minutes=2 ** preview.attempts)
+    preview.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def source_content_type(name, head):
+    stored = StoredFile.objects.filter(file=name).values_list('content_type', flat=True).first()
+    if stored:
+        return stored
+    for content_type, signatures in SIGNATURES.items():
+        if any(head.startswith(signature) for signature in signatures):
+            return content_type
+    return mimetypes.guess_type(name)[0] or ''
+
+
+def thumbnail_name(source):
+    # Keyed by the attachment, so issues sharing a stored file share the thumbnail
+    return f"previews/{hashlib.sha256(source.encode()).hexdigest()}.jpg"
+
+
+def save_result(preview, result):
+    if result['thumbnail']:
+        name = thumbnail_name(preview.source)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        preview.thumbnail = default_storage.save(name, ContentFile(result['thumbnail']))
+    else:
+        preview.thumbnail = ''
+    preview.text = result['text']
+    preview.page_count = result['page_count']
+    preview.status = 'done'
+    preview.last_error = ''
+    preview.save(update_fields=['thumbnail', 'text', 'page_count', 'status', 'last_error', 'updated_at'])
+
+
+def copy_result(preview, done):
+    preview.thumbnail = done.thumbnail.name
+    preview.text = done.text
+    preview.page_count = done.page_count
+    preview.status = 'done'
+    preview.save(update_fields=['thumbnail', 'text', 'page_count', 'status', 'updated_at'])
+
+
+def process_previews(executor, batch_size=None):
+    """
+    Renders one batch of due previews on `executor` and returns
+    (done, failed) counts.
+    """
+    batch = claim_previews(batch_size or getattr(settings, 'PREVIEW_BATCH_SIZE', 20))
+    if not batch:
+        return 0, 0
+    size = tuple(getattr(settings, 'PREVIEW_THUMBNAIL_SIZE', (320, 320)))
+    limit = getattr(settings, 'PREVIEW_TEXT_LIMIT', 20000)
+    done = failed = 0
+    jobs = {}
+    finished = []
+    for preview in batch:
+        # The same stored file attached to another issue has already been rendered
+        existing = IssuePreview.objects.filter(source=preview.source, status='done').exclude(id=preview.id).first()
+        if existing:
+            copy_result(preview, existing)
+            finished.append(preview.issue_id)
+            done += 1
+            continue
+        try:
+            with default_storage.open(preview.source, 'rb') as attachment:
+                data = attachment.read()
+        except OSError as error:
+            record_failure(preview, error)
+            failed += 1
+            continue
+        content_type = source_content_type(preview.source, data[:16])
+        jobs[preview] = executor.submit(render_preview, data, content_type, size, limit)
+
+    for preview, job in jobs.items():
+        try:
+            save_result(preview, job.result())
+            finished.append(preview.issue_id)
+            done += 1
+        except Exception as error:
+            record_failure(preview, error)
+            failed += 1
+    # The preview is part of the issue's JSON, so lists revalidating with an ETag must see it change
+    Issue.objects.filter(id__in=[preview.issue_id for preview in batch if preview.status in ('done', 'failed')]).touch()
+    if finished:
+        # Put the extracted text into the search index
+        index_issues(Issue.objects.with_related().filter(id__in=finished))
+    return done, failed
+
+
+def preview_executor(workers=None):
+    return ProcessPoolExecutor(max_workers=workers or getattr(settings, 'PREVIEW_WORKERS', None))
+
+
+def backfill_previews():
+    # Queues previews for issues with attachments that never had one
+    missing = Issue.objects.exclude(attachments='').exclude(attachments__isnull=True).filter(preview__isnull=True)
+    previews = [IssuePreview(issue_id=issue_id, source=name) for issue_id, name in missing.values_list('id', 'attachments')]
+    IssuePreview.objects.bulk_create(previews, batch_size=1000, ignore_conflicts=True)
+    return len(previews)
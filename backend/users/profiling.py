@@ -0,0 +1,140 @@
+# users/profiling.py
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from .authentication import CachedJWTAuthentication
+from .instrumentation import view_name
+from .models import RequestProfile
+
+
+# Opt-in production profiler. ProfilingMiddleware samples the stack of the
+# thread handling a request every PROFILING_INTERVAL_MS from a background
+# thread, and stores the stacks collapsed ("outer;...;inner count") so they
+# drop straight into flamegraph.pl or speedscope. A request is profiled when
+# it is picked by PROFILING_SAMPLE_RATE, or when a registrar or staff user
+# sends "X-Profile: 1". Profiles are listed and downloaded from
+# /api/profiles/ or with the request_profiles command.
+
+
+def can_profile(user):
+    return bool(user and user.is_authenticated and (user.is_staff or getattr(user, 'role', None) == 'registrar'))
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks one thread is in, every `interval` seconds until stopped."""
+
+    def __init__(self, thread_id, interval, max_seconds):
+        super().__init__(name='aits-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stopped.wait(self.interval) and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    Samples selected requests (see the module comment). Off unless
+    PROFILING_ENABLED. It is sync only so that, under ASGI too, the view runs
+    in the thread being sampled.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        self.views = set(getattr(settings, 'PROFILING_VIEWS', []))
+        self.interval = getattr(settings, 'PROFILING_INTERVAL_MS', 5) / 1000
+        self.max_seconds = getattr(settings, 'PROFILING_MAX_SECONDS', 30)
+
+    def trigger(self, request):
+        if request.headers.get('X-Profile') == '1':
+            # The JWT is only checked here when asked to profile; the view checks it again from the cache
+            try:
+                authenticated = CachedJWTAuthentication().authenticate(request)
+            except APIException:
+                authenticated = None
+            if authenticated and can_profile(authenticated[0]):
+                return 'header'
+        if self.sample_rate and random.random() < self.sample_rate:
+            if self.views:
+                try:
+                    if resolve(request.path_info).view_name not in self.views:
+                        return None
+                except Resolver404:
+                    return None
+            return 'sampled'
+        return None
+
+    def __call__(self, request):
+        trigger = self.trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), self.interval, self.max_seconds)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - started
+
+        user = getattr(request, 'user', None)
+        profile = RequestProfile.objects.create(
+            view=view_name(request),
+            method=request.method,
+            path=request.path[:500],
+            user=user if user is not None and user.is_authenticated else None,
+            trigger=trigger,
+            status_code=response.status_code,
+            duration_ms=elapsed * 1000,
+            samples=sampler.samples,
+            stacks=sampler.collapsed(),
+        )
+        if trigger == 'header':
+            response['X-Profile-Id'] = str(profile.id)
+        return response
+
+
+def prune_profiles(days=None):
+    days = days if days is not None else getattr(settings, 'PROFILING_RETENTION_DAYS', 7)
+    deleted, _ = RequestProfile.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
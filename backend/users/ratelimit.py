@@ -0,0 +1,80 @@
+# users/ratelimit.py
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import counter
+
+
+login_throttled = counter('aits_login_throttled_total', 'Login attempts refused by the rate limiter', ['bucket'])
+
+
+class TokenBucket:
+    """
+    A bucket of `capacity` tokens per key that refills at `rate` tokens a
+    second. Each attempt takes a token; an empty bucket refuses until it has
+    refilled. State lives in the process-local 'ratelimit' cache, so a flood
+    is turned away before it costs a database query or a password hash.
+    """
+
+    # get-then-set on the local cache is not atomic across threads
+    _lock = threading.Lock()
+
+    def __init__(self, name, capacity, rate):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+
+    def take(self, key):
+        """Returns 0 if a token was taken, otherwise the seconds until one is available."""
+        cache = caches['ratelimit']
+        cache_key = f'{self.name}:{key}'
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = cache.get(cache_key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                wait = 0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            # Kept until the bucket would have refilled anyway
+            cache.set(cache_key, (tokens, now), int(self.capacity / self.rate) + 1)
+        return wait
+
+
+def login_buckets():
+    limits = getattr(settings, 'LOGIN_RATE_LIMITS', {})
+    ip_capacity, ip_rate = limits.get('ip', (60, 1))
+    user_capacity, user_rate = limits.get('username', (10, 0.1))
+    return TokenBucket('login-ip', ip_capacity, ip_rate), TokenBucket('login-user', user_capacity, user_rate)
+
+
+class LoginRateThrottle(BaseThrottle):
+    """
+    Token buckets per client address and per username for LoginView (limits
+    in LOGIN_RATE_LIMITS). The address bucket is the larger one since a whole
+    campus can sit behind one NAT address; the username bucket stops a
+    password being guessed from many addresses. DRF answers refusals with
+    429 and a Retry-After header.
+    """
+
+    def allow_request(self, request, view):
+        ip_bucket, user_bucket = login_buckets()
+        self.retry_after = ip_bucket.take(self.get_ident(request))
+        if self.retry_after:
+            login_throttled.inc(bucket='ip')
+            return False
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if username:
+            self.retry_after = user_bucket.take(str(username).lower())
+            if self.retry_after:
+                login_throttled.inc(bucket='username')
+                return False
+        return True
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,120 @@
+# users/replicas.py
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .instrumentation import view_name
+from .metrics import counter
+
+
+# Read replicas (DATABASE_REPLICA_URLS, see AITS_project/database.py).
+# Views with ReplicaReadMixin run their GETs with a replica picked for the
+# request in a context variable, and ReplicaRouter sends every read made
+# meanwhile there; everything else reads and writes the default database.
+# A user who has just written (any non-GET request, marked by
+# ReplicaStickinessMiddleware) reads from the default database for
+# REPLICA_STICKY_SECONDS, so a student sees the issue they submitted before
+# the replica has caught up.
+
+read_database = contextvars.ContextVar('read_database', default=None)
+
+replica_reads = counter('aits_replica_routed_requests_total', 'GETs of replica-capable views by database', ['view', 'database'])
+
+
+def replica_aliases():
+    return [alias for alias in connections if alias != DEFAULT_DB_ALIAS]
+
+
+def sticky_key(user_id):
+    return f'replica_sticky:{user_id}'
+
+
+def stick_to_primary(user_id):
+    cache.set(sticky_key(user_id), True, getattr(settings, 'REPLICA_STICKY_SECONDS', 10))
+
+
+def pick_read_database(user):
+    replicas = replica_aliases()
+    if not replicas or (user.is_authenticated and cache.get(sticky_key(user.pk))):
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+@contextmanager
+def use_primary():
+    """
+    Reads inside go to the default database. For what gets cached, so
+    replica lag isn't kept past the invalidation that caused the refill.
+    """
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, otherwise an object read from a replica would be saved there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """
+    For list and detail views: a GET, once authenticated, reads from a
+    replica unless the user wrote within REPLICA_STICKY_SECONDS.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            database = pick_read_database(request.user)
+            replica_reads.inc(view=view_name(request), database=database)
+            if database != DEFAULT_DB_ALIAS:
+                self._read_database = read_database.set(database)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            token = getattr(self, '_read_database', None)
+            if token is not None:
+                read_database.reset(token)
+                self._read_database = None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pins the user to the default database after a write. DRF sets the user it
+    authenticated on the underlying request, so it is known here.
+    """
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                stick_to_primary(user.pk)
+        return response
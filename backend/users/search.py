@@ -0,0 +1,199 @@
+# users/search.py
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Issue
+
+
+# Search index over each issue's title, description (plus any text extracted
+# from its attachment), course unit and the submitting student's names and
+# numbers. PostgreSQL keeps a tsvector per issue
+# in users_issuesearch (GIN indexed), SQLite keeps an FTS5 table
+# users_issue_fts. Both are created by migration 0005 and kept current by the
+# signal handlers in users/signals.py.
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    return TERM_RE.findall(query or '')[:10]
+
+
+def issue_document(issue):
+    # The text that gets indexed for one issue
+    student = issue.submitted_by
+    profile = getattr(student, 'student_profile', None) if student else None
+    # Text extracted from the attachment (users/previews.py) is searched along with the description
+    preview = getattr(issue, 'preview', None)
+    attachment_text = preview.text if preview and preview.status == 'done' else ''
+    return {
+        'title': issue.title or '',
+        'description': ' '.join(filter(None, [issue.description, attachment_text])),
+        'course_unit': issue.course_unit or '',
+        'student_name': f"{student.first_name} {student.last_name}" if student else '',
+        'registration_no': ' '.join(filter(None, [
+            profile.registration_no if profile else issue.registration_no,
+            profile.student_no if profile else issue.student_no,
+        ])),
+    }
+
+
+class PostgresSearchBackend:
+    document_sql = (
+        "setweight(to_tsvector('simple', %s), 'A') || "
+        "setweight(to_tsvector('simple', %s || ' ' || %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C') || "
+        "setweight(to_tsvector('simple', %s), 'D')"
+    )
+
+    def index(self, issues):
+        with connection.cursor() as cursor:
+            for issue in issues:
+                doc = issue_document(issue)
+                cursor.execute(
+                    f"INSERT INTO users_issuesearch (issue_id, document) VALUES (%s, {self.document_sql}) "
+                    f"ON CONFLICT (issue_id) DO UPDATE SET document = EXCLUDED.document",
+                    [issue.pk, doc['title'], doc['student_name'], doc['registration_no'], doc['course_unit'], doc['description']],
+                )
+
+    def remove(self, issue_ids):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users_issuesearch WHERE issue_id = ANY(%s)", [list(issue_ids)])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users_issuesearch")
+
+    def search(self, queryset, terms):
+        # Prefix match on every term, ranked with ts_rank (title hits weigh most)
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=['users_issuesearch'],
+            where=[
+                f'users_issuesearch.issue_id = "{table}"."id"',
+                "users_issuesearch.document @@ to_tsquery('simple', %s)",
+            ],
+            params=[tsquery],
+        ).annotate(search_rank=RawSQL(
+            "ts_rank(users_issuesearch.document, to_tsquery('simple', %s))", [tsquery], output_field=FloatField()
+        ))
+
+
+class SQLiteSearchBackend:
+    def index(self, issues):
+        with connection.cursor() as cursor:
+            for issue in issues:
+                doc = issue_document(issue)
+                cursor.execute("DELETE FROM users_issue_fts WHERE rowid = %s", [issue.pk])
+                cursor.execute(
+                    "INSERT INTO users_issue_fts (rowid, title, description, course_unit, student_name, registration_no) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    [issue.pk, doc['title'], doc['description'], doc['course_unit'], doc['student_name'], doc['registration_no']],
+                )
+
+    def remove(self, issue_ids):
+        issue_ids = list(issue_ids)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM users_issue_fts WHERE rowid IN (%s)" % ', '.join(['%s'] * len(issue_ids)), issue_ids
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM users_issue_fts")
+
+    def search(self, queryset, terms):
+        # Every term as a quoted prefix query, ranked with bm25 (lower is better, hence the minus).
+        # The FTS table is joined rather than queried per row so the MATCH runs once.
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=['users_issue_fts'],
+            where=[f'users_issue_fts.rowid = "{table}"."id"', 'users_issue_fts MATCH %s'],
+            params=[match],
+        ).annotate(search_rank=RawSQL(
+            '-bm25(users_issue_fts, 10.0, 1.0, 2.0, 5.0, 5.0)', [], output_field=FloatField()
+        ))
+
+
+class BasicSearchBackend:
+    # Any other database: no index, plain icontains scans
+    fields = ['title', 'description', 'course_unit', 'submitted_by__first_name', 'submitted_by__last_name',
+              'submitted_by__student_profile__registration_no', 'submitted_by__student_profile__student_no']
+
+    def index(self, issues):
+        pass
+
+    def remove(self, issue_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, queryset, terms):
+        for term in terms:
+            condition = Q()
+            for field in self.fields:
+                condition |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    return BasicSearchBackend()
+
+
+def index_issues(issues):
+    get_search_backend().index(issues)
+
+
+def remove_issues(issue_ids):
+    if issue_ids:
+        get_search_backend().remove(issue_ids)
+
+
+def rebuild_index(batch_size=2000):
+    backend = get_search_backend()
+    backend.clear()
+    total = 0
+    batch = []
+    for issue in Issue.objects.with_related().order_by('id').iterator(chunk_size=batch_size):
+        batch.append(issue)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            total += len(batch)
+            batch = []
+    backend.index(batch)
+    return total + len(batch)
+
+
+class IssueSearchFilter(BaseFilterBackend):
+    """
+    ?search= over issue text and student names/numbers using the full-text
+    index. Results come back best match first.
+    """
+    search_param = 'search'
+
+    def get_terms(self, request):
+        return search_terms(request.query_params.get(self.search_param, ''))
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms)
+
+    def get_ordering(self, request, queryset, view):
+        # Picked up by KeysetPagination so search results page by relevance
+        if self.get_terms(request) and 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', '-id')
+        return None
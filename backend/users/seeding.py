@@ -0,0 +1,120 @@
+# users/seeding.py
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from .allocators import allocate_issue_ids
+from .models import Issue, LecturerProfile, RegistrarProfile, StudentProfile, User
+
+
+SEED_PASSWORD = 'seed-password'
+COLLEGES = ['COCIS', 'CEDAT', 'CHUSS', 'CONAS', 'COBAMS', 'CAES']
+
+
+@contextmanager
+def explicit_created_at():
+    # created_at is auto_now_add; switch that off so seeded dates are kept
+    field = Issue._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed_users(role, count, prefix='seed', rng=None, batch_size=1000):
+    """
+    Bulk creates `count` synthetic users of the given role (with their
+    profiles) and returns them. Everyone shares one password hash so seeding
+    does not spend minutes in PBKDF2.
+    """
+    rng = rng or random.Random(0)
+    password = make_password(SEED_PASSWORD)
+    start = User.objects.filter(username__startswith=f'{prefix}_{role}_').count()
+    users = [
+        User(
+            username=f'{prefix}_{role}_{number}',
+            email=f'{prefix}_{role}_{number}@example.com',
+            first_name=f'{role.title()}{number}',
+            last_name=rng.choice(['Okello', 'Nakato', 'Mugisha', 'Namubiru', 'Ssemanda', 'Achieng']),
+            role=role,
+            password=password,
+        )
+        for number in range(start, start + count)
+    ]
+    User.objects.bulk_create(users, batch_size=batch_size)
+    if users and users[0].pk is None:
+        # Backends that can't return ids from a bulk insert
+        users = list(User.objects.filter(username__startswith=f'{prefix}_{role}_').order_by('id')[start:])
+
+    if role == 'student':
+        StudentProfile.objects.bulk_create(
+            [
+                StudentProfile(
+                    user=user,
+                    registration_no=f'{prefix}/REG/{user.id}',
+                    student_no=f'{prefix}{user.id:08d}',
+                    programme=rng.choice(StudentProfile.PROGRAMME_CHOICES)[0],
+                )
+                for user in users
+            ],
+            batch_size=batch_size,
+        )
+    elif role == 'lecturer':
+        LecturerProfile.objects.bulk_create(
+            [LecturerProfile(user=user, department=rng.choice(LecturerProfile.DEPARTMENT_CHOICES)[0]) for user in users],
+            batch_size=batch_size,
+        )
+    elif role == 'registrar':
+        RegistrarProfile.objects.bulk_create(
+            [RegistrarProfile(user=user, college=rng.choice(COLLEGES)) for user in users],
+            batch_size=batch_size,
+        )
+    return users
+
+
+def seed_issues(count, students, lecturers, rng=None, batch_size=5000, days=365 * 4, progress=None):
+    """
+    Bulk creates `count` issues spread over the last `days` days, roughly a
+    third pending, a third assigned and a third resolved.
+    """
+    rng = rng or random.Random(0)
+    now = timezone.now()
+    categories = [choice[0] for choice in Issue.CATEGORY_CHOICES]
+    semesters = [choice[0] for choice in Issue.SEMESTER_OF_STUDY]
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        batch = []
+        for issue_id in allocate_issue_ids(size):
+            student = rng.choice(students)
+            created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+            state = rng.random()
+            lecturer = rng.choice(lecturers) if lecturers and state > 0.33 else None
+            resolved = lecturer is not None and state > 0.66
+            batch.append(Issue(
+                issue_id=issue_id,
+                student_no='',
+                registration_no='',
+                category=rng.choice(categories),
+                status='resolved' if resolved else ('assigned' if lecturer else 'pending'),
+                description='Synthetic issue generated for load testing. ' * rng.randint(1, 6),
+                course_unit=f'CSC{rng.randint(1000, 3999)}',
+                year_of_study=rng.randint(1, 4),
+                semester=rng.choice(semesters),
+                submitted_by=student,
+                created_at=created_at,
+                assigned_to=lecturer,
+                resolved_at=created_at + timedelta(hours=rng.randint(1, 24 * 30)) if resolved else None,
+                lecturer_name=f'{lecturer.first_name} {lecturer.last_name}' if lecturer else '',
+                title=f'{rng.choice(categories).replace("_", " ").title()} for CSC{rng.randint(1000, 3999)}',
+            ))
+        with explicit_created_at():
+            Issue.objects.bulk_create(batch, batch_size=batch_size)
+        created += size
+        if progress:
+            progress(created)
+    return created
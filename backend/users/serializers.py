@@ -1,7 +1,9 @@
 # users/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import StudentProfile, LecturerProfile, RegistrarProfile, Issue
+from .models import StudentProfile, LecturerProfile, RegistrarProfile, Issue, IssuePreview, Notification, RequestProfile, LecturerWorkload, ArchivedIssue
+from django.urls import reverse
+from .instrumentation import TimedSerializerMixin
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.response import Response
@@ -11,7 +13,7 @@ from rest_framework import status
 User = get_user_model()
 
 # Serializer for the StudentProfile model
-class StudentProfileSerializer(serializers.ModelSerializer):
+class StudentProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     first_name = serializers.CharField(source='user.first_name', read_only=True)
     last_name = serializers.CharField(source='user.last_name', read_only=True)
 
@@ -21,7 +23,7 @@ class StudentProfileSerializer(serializers.ModelSerializer):
         #changed college and department to programme and student_no
 
 # Serializer for the LecturerProfile model
-class LecturerProfileSerializer(serializers.ModelSerializer):
+class LecturerProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = serializers.IntegerField(source='user.id',read_only=True)
     first_name = serializers.CharField(source='user.first_name', read_only=True)
     last_name = serializers.CharField(source='user.last_name', read_only=True)
@@ -30,13 +32,13 @@ class LecturerProfileSerializer(serializers.ModelSerializer):
         fields = ["id","first_name","last_name",'department']  # Fields to include in the serialized output
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
      class Meta:
          model = User
          fields = '__all__'
 
 # Serializer for the RegistrarProfile model
-class RegistrarProfileSerializer(serializers.ModelSerializer):
+class RegistrarProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     first_name = serializers.CharField(source='user.first_name', read_only=True)#his should appear in the profile as read only
     last_name = serializers.CharField(source='user.last_name', read_only=True)
     class Meta:
@@ -112,14 +114,44 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True) 
     loginType = serializers.CharField(required=False)  
 
+# Attachment thumbnail and a short text excerpt, so detail pages don't need the file itself
+class IssuePreviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    thumbnail = serializers.SerializerMethodField()
+    excerpt = serializers.SerializerMethodField()
+
+    class Meta:
+        model = IssuePreview
+        fields = ['status', 'thumbnail', 'excerpt', 'page_count']
+
+    def get_thumbnail(self, preview):
+        if preview.status != 'done' or not preview.thumbnail:
+            return None
+        url = reverse('issue_thumbnail', args=[preview.issue_id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_excerpt(self, preview):
+        return preview.text[:300]
+
+
+class DynamicFieldsSerializerMixin:
+    # Takes fields=[...] and outputs only those, for ?fields= and ?omit= (users/fieldsets.py)
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 # Serializer for the Issue model
-class IssueSerializer(serializers.ModelSerializer):
+class IssueSerializer(TimedSerializerMixin, DynamicFieldsSerializerMixin, serializers.ModelSerializer):
     # Auto-fetch student details from User and StudentProfile
     first_name = serializers.CharField(source='submitted_by.first_name', read_only=True)
     last_name = serializers.CharField(source='submitted_by.last_name', read_only=True)
     registration_no = serializers.CharField(source='submitted_by.student_profile.registration_no', read_only=True)
     student_no = serializers.CharField(source='submitted_by.student_profile.student_no', read_only=True)
     programme = serializers.CharField(source='submitted_by.student_profile.programme', read_only=True)
+    preview = IssuePreviewSerializer(read_only=True, allow_null=True)
 
 
     class Meta:
@@ -128,10 +160,60 @@ class IssueSerializer(serializers.ModelSerializer):
             'id', 'issue_id','category', 'status', 'description', "title",
             'year_of_study', 'semester', 'submitted_by', 'lecturer_name', 
             'created_at', 'resolved_at', 'first_name', 'last_name', 
-            'registration_no', 'student_no',"title","course_unit","programme","attachments"
+            'registration_no', 'student_no',"title","course_unit","programme","attachments","preview"
         ]
         read_only_fields = [
             'status', 'submitted_by', 'created_at', 'resolved_at', 
             'first_name', 'last_name', 'registration_no', 'student_no',"programme"
         ]  # These fields CANNOT be modified manually
    
+
+
+# What dashboards list issues by, for ?summary=1 on the issue lists
+class IssueSummarySerializer(TimedSerializerMixin, DynamicFieldsSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Issue
+        fields = ['id', 'issue_id', 'title', 'status', 'category', 'course_unit', 'created_at', 'resolved_at']
+        read_only_fields = fields
+
+
+# An issue moved to the archive (users/archive.py), shaped like IssueSerializer
+class ArchivedIssueSerializer(IssueSerializer):
+    preview = serializers.SerializerMethodField()
+
+    class Meta(IssueSerializer.Meta):
+        model = ArchivedIssue
+        fields = IssueSerializer.Meta.fields + ['archived_at']
+        read_only_fields = fields
+
+    def get_preview(self, issue):
+        return None
+
+
+# Serializer for the notification inbox
+class NotificationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ['id', 'kind', 'message', 'issue', 'is_read', 'created_at', 'read_at']
+        read_only_fields = fields
+
+
+# Profile metadata for the list, the stacks themselves are downloaded separately
+class RequestProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = RequestProfile
+        fields = ['id', 'view', 'method', 'path', 'user', 'trigger', 'status_code', 'duration_ms', 'samples', 'created_at']
+        read_only_fields = fields
+
+
+# One lecturer's row of the workload summary (users/workload.py)
+class LecturerWorkloadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    id = serializers.IntegerField(source='lecturer_id', read_only=True)
+    first_name = serializers.CharField(source='lecturer.first_name', read_only=True)
+    last_name = serializers.CharField(source='lecturer.last_name', read_only=True)
+    resolved_this_week = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = LecturerWorkload
+        fields = ['id', 'first_name', 'last_name', 'department', 'open_issues', 'in_progress', 'resolved_this_week']
+        read_only_fields = fields
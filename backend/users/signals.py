@@ -0,0 +1,170 @@
+# users/signals.py
+from collections import Counter
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Issue, LecturerProfile, LecturerWorkload, RegistrarProfile, StudentProfile, User
+from .authentication import invalidate_auth_user
+from .directory import invalidate_lecturer_directory
+from .events import publish_issue_event
+from .notifications import notify
+from .previews import queue_preview
+from .search import index_issues, remove_issues
+from .stats import invalidate_issue_statistics
+from .workload import change_workloads, contribution, refresh_workloads, workload_deltas
+
+
+# Sent after a bulk_update of issues, which skips post_save.
+# Arguments: issues (the updated Issue objects) and action ('assigned' or 'resolved').
+issues_bulk_updated = Signal()
+
+# Sent when issues are created, (re)assigned, started or resolved, through save() or a bulk
+# update. Argument: changes, a list of (kind, issue, previous_assigned_to) tuples where kind
+# is 'created', 'assigned', 'started' (moved to in_progress) or 'resolved' and
+# previous_assigned_to is a user id. issue._previous_state has the tracked fields as they were.
+issue_lifecycle = Signal()
+
+
+def lifecycle_changes(issue, created=False):
+    # Compares the issue with the values it was loaded with (Issue.from_db)
+    loaded = getattr(issue, '_loaded_state', {})
+    kinds = []
+    if created:
+        kinds.append('created')
+    else:
+        if 'assigned_to_id' in loaded and issue.assigned_to_id and loaded['assigned_to_id'] != issue.assigned_to_id:
+            kinds.append('assigned')
+        if 'status' in loaded and loaded['status'] != 'in_progress' and issue.status == 'in_progress':
+            kinds.append('started')
+        if 'status' in loaded and loaded['status'] != 'resolved' and issue.status == 'resolved':
+            kinds.append('resolved')
+    previous_assigned_to = loaded.get('assigned_to_id')
+    issue.remember_tracked_fields()
+    return [(kind, issue, previous_assigned_to) for kind in kinds]
+
+
+def send_issue_lifecycle(issues, created=False):
+    changes = []
+    for issue in issues:
+        changes.extend(lifecycle_changes(issue, created))
+    if changes:
+        issue_lifecycle.send(sender=Issue, changes=changes)
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(sender, instance, created, **kwargs):
+    send_issue_lifecycle([instance], created)
+
+
+@receiver(issues_bulk_updated)
+def issues_bulk_saved(sender, issues, **kwargs):
+    send_issue_lifecycle(issues)
+
+
+@receiver(issue_lifecycle)
+def broadcast_issue_events(sender, changes, **kwargs):
+    for kind, issue, previous_assigned_to in changes:
+        publish_issue_event(kind, issue, previous_assigned_to)
+
+
+@receiver(issue_lifecycle)
+def notify_issue_changes(sender, changes, **kwargs):
+    # One inbox insert for the whole batch
+    notify(changes)
+
+
+@receiver(issue_lifecycle)
+def track_workloads(sender, changes, **kwargs):
+    change_workloads(workload_deltas(changes))
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted_workload(sender, instance, **kwargs):
+    removed = contribution(instance.assigned_to_id, instance.status)
+    change_workloads({instance.assigned_to_id: Counter({field: -n for field, n in removed.items()})})
+
+
+@receiver(post_save, sender=Issue)
+@receiver(post_delete, sender=Issue)
+@receiver(issues_bulk_updated)
+def issue_changed(sender, **kwargs):
+    # Any issue write can move the dashboard counters. Cleared once the write
+    # is committed, or a dashboard read in between would cache the old figures
+    transaction.on_commit(invalidate_issue_statistics)
+
+
+@receiver(post_save, sender=Issue)
+def index_issue(sender, instance, **kwargs):
+    index_issues([instance])
+
+
+@receiver(post_save, sender=Issue)
+def queue_attachment_preview(sender, instance, **kwargs):
+    # Thumbnail and text are made by the process_attachments worker
+    queue_preview(instance)
+
+
+@receiver(post_delete, sender=Issue)
+def unindex_issue(sender, instance, **kwargs):
+    remove_issues([instance.pk])
+
+
+def password_only(kwargs):
+    # Login rehashing a password saves the user with update_fields=['password']
+    return kwargs.get('update_fields') == {'password'}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=StudentProfile)
+def reindex_student_issues(sender, instance, created, **kwargs):
+    # Student names and numbers are part of the search document
+    if created or password_only(kwargs):
+        return
+    user = instance if sender is User else instance.user
+    if user.role == 'student':
+        # and part of every issue's JSON, so their issue lists get a new ETag
+        Issue.objects.filter(submitted_by=user).touch()
+        index_issues(Issue.objects.with_related().filter(submitted_by=user))
+
+
+@receiver(post_save, sender=LecturerProfile)
+@receiver(post_delete, sender=LecturerProfile)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def lecturer_changed(sender, instance, **kwargs):
+    # Names and departments in the typeahead directory
+    if password_only(kwargs):
+        return
+    if sender is LecturerProfile or instance.role == 'lecturer':
+        # Only once committed: a directory reloaded from before the write would
+        # be kept until the next check
+        transaction.on_commit(invalidate_lecturer_directory)
+
+
+@receiver(post_save, sender=LecturerProfile)
+def lecturer_workload(sender, instance, **kwargs):
+    # New lecturers get a row, a department change moves theirs
+    refresh_workloads([instance.user_id])
+
+
+@receiver(post_delete, sender=LecturerProfile)
+def lecturer_profile_deleted(sender, instance, **kwargs):
+    # No longer someone issues can be assigned to
+    LecturerWorkload.objects.filter(lecturer_id=instance.user_id).delete()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_save, sender=LecturerProfile)
+@receiver(post_delete, sender=LecturerProfile)
+@receiver(post_save, sender=RegistrarProfile)
+@receiver(post_delete, sender=RegistrarProfile)
+def auth_user_changed(sender, instance, **kwargs):
+    # Drops the cached copy CachedJWTAuthentication keeps of the user and profile,
+    # once committed so a concurrent request can't cache the old one again
+    user_id = instance.pk if sender is User else instance.user_id
+    transaction.on_commit(lambda: invalidate_auth_user(user_id))
@@ -0,0 +1,157 @@
+# users/stats.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from .models import ArchivedIssue, Issue
+from .replicas import use_primary
+
+
+ISSUE_STATS_CACHE_KEY = 'issue_statistics'
+ARCHIVED_STATS_CACHE_KEY = 'issue_statistics_archived'
+
+OPEN = ~Q(status='resolved')
+RESOLVED = Q(status='resolved')
+
+
+def resolve_time():
+    return ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+
+
+CELL_KEYS = ('status', 'category', 'semester', 'year_of_study')
+LECTURER_KEYS = ('assigned_to', 'assigned_to__first_name', 'assigned_to__last_name', 'assigned_to__lecturer_profile__department')
+PROGRAMME_KEYS = ('submitted_by__student_profile__programme',)
+
+
+def grouped_counts(queryset):
+    """
+    The three grouped queries every dashboard figure comes from: the status x
+    category x semester x year_of_study breakdown (which also sums resolution
+    times), one per lecturer and one per programme. Works on Issue and
+    ArchivedIssue alike.
+    """
+    queryset = queryset.order_by()
+    return {
+        'cells': list(
+            queryset.values(*CELL_KEYS)
+            .annotate(count=Count('id'), resolve_time=Sum(resolve_time(), filter=RESOLVED))
+        ),
+        'lecturers': list(
+            queryset.filter(assigned_to__isnull=False).values(*LECTURER_KEYS)
+            .annotate(open=Count('id', filter=OPEN), resolved=Count('id', filter=RESOLVED))
+        ),
+        'programmes': list(
+            queryset.values(*PROGRAMME_KEYS)
+            .annotate(open=Count('id', filter=OPEN), resolved=Count('id', filter=RESOLVED))
+        ),
+    }
+
+
+def archived_counts():
+    # The archive only changes when archive_issues runs, which clears this
+    counts = cache.get(ARCHIVED_STATS_CACHE_KEY)
+    if counts is None:
+        counts = grouped_counts(ArchivedIssue.objects.all())
+        cache.set(ARCHIVED_STATS_CACHE_KEY, counts, None)
+    return counts
+
+
+def merge_rows(*row_lists, keys, sums):
+    merged = {}
+    for rows in row_lists:
+        for row in rows:
+            key = tuple(row[k] for k in keys)
+            if key not in merged:
+                merged[key] = dict(row)
+                continue
+            for field in sums:
+                if row[field] is not None:
+                    merged[key][field] = row[field] if merged[key][field] is None else merged[key][field] + row[field]
+    return list(merged.values())
+
+
+def compute_issue_statistics():
+    """
+    Builds every dashboard figure from the grouped counts of the live issues
+    and of the archived ones, which are cached apart since they don't change
+    between archive runs.
+    """
+    live, archived = grouped_counts(Issue.objects.all()), archived_counts()
+    cells = merge_rows(live['cells'], archived['cells'], keys=CELL_KEYS, sums=('count', 'resolve_time'))
+
+    by_status = defaultdict(int)
+    by_category = defaultdict(int)
+    by_semester = defaultdict(int)
+    by_year = defaultdict(int)
+    total_resolve_seconds = 0.0
+    for cell in cells:
+        by_status[cell['status']] += cell['count']
+        by_category[cell['category']] += cell['count']
+        by_semester[cell['semester']] += cell['count']
+        by_year[cell['year_of_study']] += cell['count']
+        if cell['resolve_time'] is not None:
+            total_resolve_seconds += cell['resolve_time'].total_seconds()
+
+    resolved = by_status.get('resolved', 0)
+    mean_hours = round(total_resolve_seconds / resolved / 3600, 2) if resolved else None
+
+    lecturer_backlog = [
+        {
+            'lecturer_id': row['assigned_to'],
+            'first_name': row['assigned_to__first_name'],
+            'last_name': row['assigned_to__last_name'],
+            'department': row['assigned_to__lecturer_profile__department'],
+            'open': row['open'],
+            'resolved': row['resolved'],
+        }
+        for row in merge_rows(live['lecturers'], archived['lecturers'], keys=LECTURER_KEYS, sums=('open', 'resolved'))
+    ]
+
+    programme_backlog = [
+        {
+            'programme': row['submitted_by__student_profile__programme'],
+            'open': row['open'],
+            'resolved': row['resolved'],
+        }
+        for row in merge_rows(live['programmes'], archived['programmes'], keys=PROGRAMME_KEYS, sums=('open', 'resolved'))
+    ]
+
+    return {
+        'total_issues': sum(by_status.values()),
+        'pending_issues': by_status.get('pending', 0),
+        'resolved_issues': resolved,
+        'by_status': dict(by_status),
+        'by_category': dict(by_category),
+        'by_semester': dict(by_semester),
+        'by_year_of_study': dict(by_year),
+        'breakdown': [
+            {key: cell[key] for key in (*CELL_KEYS, 'count')}
+            for cell in cells
+        ],
+        'mean_time_to_resolve_hours': mean_hours,
+        'lecturer_backlog': lecturer_backlog,
+        'programme_backlog': programme_backlog,
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_issue_statistics():
+    # Served from the cache until an Issue is saved or deleted (see users/signals.py)
+    stats = cache.get(ISSUE_STATS_CACHE_KEY)
+    if stats is None:
+        # Not from a replica that may not have the write which cleared the cache yet
+        with use_primary():
+            stats = compute_issue_statistics()
+        cache.set(ISSUE_STATS_CACHE_KEY, stats, getattr(settings, 'ISSUE_STATS_CACHE_TIMEOUT', 300))
+    return stats
+
+
+def invalidate_issue_statistics():
+    cache.delete(ISSUE_STATS_CACHE_KEY)
+
+
+def invalidate_archived_statistics():
+    cache.delete_many([ARCHIVED_STATS_CACHE_KEY, ISSUE_STATS_CACHE_KEY])
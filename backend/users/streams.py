@@ -0,0 +1,65 @@
+# users/streams.py
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .authentication import CachedJWTAuthentication
+from .events import event_for_user, get_broker
+
+
+def stream_user(request):
+    # Header only: a token in the query string would end up in access logs
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def issue_event_stream(request):
+    """
+    Server-sent events with issue changes visible to the user, so dashboards
+    can apply small deltas instead of re-fetching whole lists. Needs the ASGI
+    application (AITS_project/asgi.py, e.g. uvicorn AITS_project.asgi:application).
+    Under WSGI Django would read the endless stream into memory before sending
+    anything, so it answers 501 there and the dashboards poll instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Live updates need the server to run under ASGI'}, status=501)
+    user = await sync_to_async(stream_user)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided or are invalid'}, status=401)
+
+    broker = get_broker()
+    subscription = broker.subscribe()
+    heartbeat = getattr(settings, 'ISSUE_EVENT_HEARTBEAT', 20)
+
+    async def events():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+                    continue
+                event = event_for_user(event, user)
+                if event is not None:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
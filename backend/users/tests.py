@@ -0,0 +1,671 @@
+# users/tests.py
+import io
+import math
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.allocators import issue_id_allocator
+from users.directory import lecturer_directory
+from users.mail import queue_mail, send_queued_mail
+from users.metrics import Counter, Histogram, Registry
+from users.notifications import mark_read, notify, prune_notifications, unread_count
+from users.models import Issue, IssuePreview, LecturerProfile, Notification, OutboundEmail, StudentProfile, User
+from users.replicas import read_database, sticky_key, use_primary
+from users.seeding import seed_issues, seed_users
+from users.uploads import ranged_file_response
+
+
+# The SQLite test database is a file when DATABASE_URL is a sqlite:// URL (see
+# AITS_project/database.py); the tests that open several connections at once
+# skip themselves on the in-memory one.
+
+ISSUE_FORM = {
+    'category': 'missing_marks',
+    'description': 'Marks for the coursework are missing',
+    'course_unit': 'CSC1100',
+    'year_of_study': 1,
+    'semester': 'Semester 1',
+    'lecturer_name': 'Dr. Okello',
+    'student_no': '2400700001',
+    'registration_no': '24/U/0001',
+}
+
+
+def skip_on_memory_database(test):
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        test.skipTest("needs a database several connections can open, set DATABASE_URL=sqlite:///<file>")
+
+
+def table_queries(queries, table):
+    # The statements of `queries` that read or write `table`
+    return [query['sql'] for query in queries if f'"{table}"' in query['sql']]
+
+
+@override_settings(ISSUE_ID_BLOCK_SIZE=10)
+class ConcurrentSubmissionTests(TransactionTestCase):
+    """
+    SubmitIssueView from several threads at once, each with its own
+    connection: every issue gets a distinct issue_id, and an insert only
+    touches the sequence row when its thread's block has run out.
+    """
+
+    threads = 4
+    submissions = 10
+
+    def setUp(self):
+        skip_on_memory_database(self)
+        issue_id_allocator.reset()
+        self.addCleanup(issue_id_allocator.reset)
+        self.students = seed_users('student', self.threads)
+
+    def submit(self, student, results, errors):
+        client = APIClient()
+        client.force_authenticate(student)
+        try:
+            for n in range(self.submissions):
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.post('/api/submit-issue/', {**ISSUE_FORM, 'title': f'{student.username} {n}'})
+                results.append((response.status_code, response.data.get('issue_id'), queries.captured_queries))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def test_concurrent_submissions_get_distinct_issue_ids(self):
+        results, errors = [], []
+        workers = [threading.Thread(target=self.submit, args=(student, results, errors)) for student in self.students]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        total = self.threads * self.submissions
+        self.assertEqual([status for status, _, _ in results], [201] * total)
+        issue_ids = [issue_id for _, issue_id, _ in results]
+        self.assertEqual(len(set(issue_ids)), total)
+        self.assertCountEqual(Issue.objects.values_list('issue_id', flat=True), issue_ids)
+
+        reservations = 0
+        for _, _, queries in results:
+            issue_queries = table_queries(queries, 'users_issue')
+            self.assertEqual(len(issue_queries), 1)
+            self.assertTrue(issue_queries[0].startswith('INSERT'))
+            sequence_queries = table_queries(queries, 'users_issuesequence')
+            # None, or the UPDATE and SELECT of reserve_block()
+            self.assertIn(len(sequence_queries), (0, 2))
+            reservations += bool(sequence_queries)
+        # Threads that run out together each reserve a block and keep one,
+        # so at worst every thread reserves once per block used
+        self.assertLessEqual(reservations, math.ceil(total / settings.ISSUE_ID_BLOCK_SIZE) * self.threads)
+        self.assertLess(reservations, total)
+
+
+class IssueListQueryCountTests(TestCase):
+    """
+    The issue lists, in full and with sparse fieldsets, run as many queries
+    for ten times the issues: nothing is loaded per row.
+    """
+
+    issues = 4
+    lists = [
+        ('student', '/api/my-issues/'),
+        ('student', '/api/resolved-issues/'),
+        ('registrar', '/api/registrar/issues/'),
+        ('lecturer', '/api/assigned-issues/'),
+        ('lecturer', '/api/lecturer/pending_issues/'),
+        ('lecturer', '/api/resolved-issues/'),
+    ]
+    variants = [
+        '',
+        '?fields=issue_id,title,first_name,programme,preview',
+        '?omit=description,attachments',
+        '?summary=1',
+        '?summary=1&fields=issue_id,status',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = {role: seed_users(role, 1)[0] for role in ('student', 'lecturer', 'registrar')}
+
+    def setUp(self):
+        cache.clear()
+
+    def add_issues(self, count):
+        seed_issues(count, [self.users['student']], [self.users['lecturer']])
+        # Every other issue with a preview, so the list serializes some
+        issues = Issue.objects.filter(preview__isnull=True).order_by('id')[::2]
+        IssuePreview.objects.bulk_create([IssuePreview(issue=issue, source='marks.pdf', status='done') for issue in issues])
+
+    def get(self, role, url):
+        client = APIClient()
+        client.force_authenticate(self.users[role])
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        return data['results'] if isinstance(data, dict) else data
+
+    def test_query_count_does_not_grow_with_the_issues(self):
+        self.add_issues(self.issues)
+        counts, rows = {}, {}
+        for role, path in self.lists:
+            for variant in self.variants:
+                with CaptureQueriesContext(connection) as queries:
+                    rows[role, path + variant] = len(self.get(role, path + variant))
+                counts[role, path + variant] = len(queries)
+
+        self.add_issues(self.issues * 9)
+        for (role, url), count in counts.items():
+            with self.subTest(role=role, url=url):
+                cache.clear()
+                with self.assertNumQueries(count):
+                    listed = len(self.get(role, url))
+                self.assertGreater(listed, rows[role, url])
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    users/replicas.py against a read replica: a second SQLite file, added as
+    replica_1 for each test and filled by replicate(), which stands in for
+    replication. What the primary gets afterwards shows up on the replica
+    only at the next replicate(), as with a lagging replica.
+    """
+
+    replica = 'replica_1'
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("the replica is a SQLite file, which needs a SQLite primary to copy")
+        skip_on_memory_database(self)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # Added after the test case was set up, so Django lets it be queried
+        connections.settings[self.replica] = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            'NAME': os.path.join(directory.name, 'replica.sqlite3'),
+        }
+        self.addCleanup(self.remove_replica)
+        cache.clear()
+
+        self.student = seed_users('student', 1)[0]
+        seed_issues(3, [self.student], [])
+        self.replicate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def remove_replica(self):
+        connections[self.replica].close()
+        del connections[self.replica]
+        del connections.settings[self.replica]
+
+    def replicate(self):
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[self.replica]
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+
+    def get(self, url):
+        # The response and the statements each database ran for it
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[self.replica]) as replica:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), table_queries(primary, 'users_issue'), table_queries(replica, 'users_issue')
+
+    def listed(self, data):
+        return [issue['issue_id'] for issue in data['results']]
+
+    def test_lists_and_details_read_from_the_replica(self):
+        replicated = list(Issue.objects.order_by('created_at').values_list('issue_id', flat=True))
+        seed_issues(1, [self.student], [])
+
+        data, primary, replica = self.get('/api/my-issues/')
+        self.assertEqual(self.listed(data), replicated)
+        self.assertEqual(primary, [])
+        self.assertNotEqual(replica, [])
+
+        issue = Issue.objects.get(issue_id=replicated[0])
+        data, primary, replica = self.get(f'/api/issue/{issue.pk}/')
+        self.assertEqual(data['issue_id'], issue.issue_id)
+        self.assertEqual(primary, [])
+        self.assertNotEqual(replica, [])
+
+    def test_a_write_sticks_the_user_to_the_primary(self):
+        response = self.client.post('/api/submit-issue/', {**ISSUE_FORM, 'title': 'Missing coursework marks'})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(cache.get(sticky_key(self.student.pk)))
+
+        data, primary, replica = self.get('/api/my-issues/')
+        self.assertIn(response.data['issue_id'], self.listed(data))
+        self.assertNotEqual(primary, [])
+        self.assertEqual(replica, [])
+
+        # Once the stickiness expires reads go back to the replica, which is still behind
+        cache.delete(sticky_key(self.student.pk))
+        data, primary, replica = self.get('/api/my-issues/')
+        self.assertNotIn(response.data['issue_id'], self.listed(data))
+        self.assertEqual(primary, [])
+
+    def test_use_primary_reads_the_default_database(self):
+        seed_issues(1, [self.student], [])
+        token = read_database.set(self.replica)
+        try:
+            self.assertEqual(Issue.objects.count(), 3)
+            with use_primary():
+                self.assertEqual(Issue.objects.count(), 4)
+            self.assertEqual(Issue.objects.count(), 3)
+        finally:
+            read_database.reset(token)
+
+
+class IssueEventStreamTests(TestCase):
+    """/api/events/ only streams under ASGI and only takes the token from the header."""
+
+    def setUp(self):
+        self.student = seed_users('student', 1)[0]
+        self.token = str(AccessToken.for_user(self.student))
+
+    def test_wsgi_is_refused(self):
+        response = self.client.get('/api/events/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, 501)
+
+    async def test_token_in_the_query_string_is_refused(self):
+        response = await self.async_client.get('/api/events/', {'token': self.token})
+        self.assertEqual(response.status_code, 401)
+
+
+class ConditionalGetTests(TestCase):
+    """
+    The issue lists and profile views answer 304 to a current ETag and 200
+    once what they return has changed.
+    """
+
+    def setUp(self):
+        self.student = seed_users('student', 1)[0]
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_issue_list(self):
+        seed_issues(3, [self.student], [])
+        response = self.client.get('/api/my-issues/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            # Only the version is read, nothing is serialized
+            response = self.client.get('/api/my-issues/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        issue = Issue.objects.filter(submitted_by=self.student).first()
+        issue.title = 'Retitled'
+        issue.save()
+        response = self.client.get('/api/my-issues/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Retitled', [row['title'] for row in response.data['results']])
+
+        # A deletion changes the version as well
+        etag = response['ETag']
+        issue.delete()
+        response = self.client.get('/api/my-issues/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile_etag_follows_the_database(self):
+        response = self.client.get('/api/student/profile/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get('/api/student/profile/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # As another worker would: no signal runs here, so no cache entry changes
+        # and the authenticated user object still holds the old profile
+        programme = 'BIT' if self.student.student_profile.programme != 'BIT' else 'BLIS'
+        StudentProfile.objects.filter(user=self.student).update(programme=programme, updated_at=timezone.now())
+
+        response = self.client.get('/api/student/profile/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['programme'], programme)
+
+
+class LecturerDirectoryTests(TestCase):
+    """
+    The typeahead directory answers from memory and picks up changes: at
+    once for a save in this process, after LECTURER_DIRECTORY_CHECK_SECONDS
+    for one made elsewhere.
+    """
+
+    def setUp(self):
+        self.lecturers = seed_users('lecturer', 2000, prefix='directory')
+        lecturer_directory.invalidate()
+        self.addCleanup(lecturer_directory.invalidate)
+
+    def other_department(self, profile):
+        return next(code for code, _ in LecturerProfile.DEPARTMENT_CHOICES if code != profile.department)
+
+    def test_lookups_do_not_query_the_database(self):
+        self.assertEqual(len(lecturer_directory.search('')), 2000)
+        with self.assertNumQueries(0):
+            for query in ['a', 'na', 'oke', 'student', 'x']:
+                lecturer_directory.search(query, limit=10)
+
+    def test_saved_profile_shows_up_after_commit(self):
+        lecturer_directory.search('')
+        profile = self.lecturers[0].lecturer_profile
+        department = self.other_department(profile)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.department = department
+            profile.save()
+            user = profile.user
+            user.first_name = 'Zebedee'
+            user.save()
+        [entry] = lecturer_directory.search('zeb')
+        self.assertEqual((entry['id'], entry['department']), (user.id, department))
+
+    def test_change_made_elsewhere_shows_up_after_the_check_interval(self):
+        lecturer_directory.search('')
+        user = self.lecturers[0]
+        # As another worker would: no signal reaches this process
+        User.objects.filter(pk=user.pk).update(first_name='Zebedee', updated_at=timezone.now())
+
+        with override_settings(LECTURER_DIRECTORY_CHECK_SECONDS=3600):
+            self.assertEqual(lecturer_directory.search('zeb'), [])
+        with override_settings(LECTURER_DIRECTORY_CHECK_SECONDS=0):
+            self.assertEqual([entry['id'] for entry in lecturer_directory.search('zeb')], [user.id])
+
+
+@override_settings(MAIL_QUEUE_RETRY_DELAY=60, MAIL_QUEUE_MAX_ATTEMPTS=3)
+class MailQueueTests(TestCase):
+    """queue_mail() stores mail once the transaction commits, send_queued_mail delivers it."""
+
+    def queue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_mail('Issue received', 'We got your issue.', ['student@example.com', ''])
+        return OutboundEmail.objects.get()
+
+    def test_round_trip(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            queue_mail('Issue received', 'We got your issue.', ['student@example.com'])
+        # Nothing is stored for a transaction that hasn't committed
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(OutboundEmail.objects.exists())
+
+        email = self.queue()
+        self.assertEqual(email.recipients, ['student@example.com'])
+        output = io.StringIO()
+        call_command('send_queued_mail', stdout=output)
+        self.assertEqual(output.getvalue(), "Sent 1 email(s), 0 failed\n")
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual((mail.outbox[0].subject, mail.outbox[0].to), ('Issue received', ['student@example.com']))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('sent', 1))
+        self.assertIsNotNone(email.sent_at)
+        # Sent mail isn't picked up again
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+    def test_failures_back_off_then_give_up(self):
+        email = self.queue()
+        refused = mock.patch.object(EmailBackend, 'send_messages', side_effect=SMTPException('refused'))
+        delays = []
+        for attempt in range(1, 4):
+            with refused:
+                started = timezone.now()
+                self.assertEqual(send_queued_mail(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.attempts, email.last_error), (attempt, 'refused'))
+            if attempt < 3:
+                self.assertEqual(email.status, 'queued')
+                delays.append(email.next_attempt_at - started)
+                # Not due again until the delay has passed
+                self.assertEqual(send_queued_mail(), (0, 0))
+                OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(email.status, 'failed')
+        # 60s after the first failure, then twice that
+        self.assertAlmostEqual(delays[0].total_seconds(), 60, delta=5)
+        self.assertAlmostEqual(delays[1].total_seconds(), 120, delta=5)
+
+        self.assertEqual(send_queued_mail(), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+
+@skipUnless(connection.vendor == 'sqlite', "checks the SQLite FTS5 backend")
+class IssueSearchTests(TestCase):
+    """?search= on the registrar list, served by the users_issue_fts index."""
+
+    def setUp(self):
+        self.student = seed_users('student', 1)[0]
+        self.client = APIClient()
+        self.client.force_authenticate(seed_users('registrar', 1)[0])
+
+    def create_issue(self, title, description='Marks are missing'):
+        return Issue.objects.create(
+            title=title, description=description, category='missing_marks', course_unit='CSC1100',
+            year_of_study=1, semester='Semester 1', submitted_by=self.student, lecturer_name='Dr. Okello',
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/registrar/issues/', {'search': query})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [issue['id'] for issue in response.data['results']]
+
+    def indexed(self, issue_id):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM users_issue_fts WHERE rowid = %s", [issue_id])
+            return cursor.fetchone()[0]
+
+    def test_title_matches_rank_first(self):
+        in_description = self.create_issue('Coursework marks', 'The calculus test marks are missing')
+        in_title = self.create_issue('Calculus marks missing')
+        self.create_issue('Networks appeal')
+        self.assertEqual(self.search('calculus'), [in_title.id, in_description.id])
+
+    def test_prefixes_of_every_term_must_match(self):
+        calculus = self.create_issue('Calculus exam marks')
+        self.create_issue('Calculus coursework marks')
+        self.assertEqual(len(self.search('calc')), 2)
+        self.assertEqual(self.search('calc exa'), [calculus.id])
+        self.assertEqual(self.search(self.student.first_name[:4].lower()), self.search('marks'))
+
+    def test_index_follows_saves_and_deletes(self):
+        issue = self.create_issue('Calculus exam marks')
+        issue_id = issue.id
+        self.assertEqual(self.indexed(issue_id), 1)
+        issue.title = 'Statistics exam marks'
+        issue.save()
+        self.assertEqual(self.search('calculus'), [])
+        self.assertEqual(self.search('statistics'), [issue_id])
+
+        issue.delete()
+        self.assertEqual(self.indexed(issue_id), 0)
+        self.assertEqual(self.search('statistics'), [])
+
+
+class UnreadCounterTests(TestCase):
+    """The unread counter matches the unread notifications through every change."""
+
+    def setUp(self):
+        self.lecturer = seed_users('lecturer', 1)[0]
+        seed_issues(5, seed_users('student', 1), [self.lecturer])
+        self.issues = list(Issue.objects.filter(assigned_to=self.lecturer))
+        notify([('assigned', issue, None) for issue in self.issues])
+
+    def assertUnread(self, count):
+        self.assertEqual(unread_count(self.lecturer), count)
+        self.assertEqual(Notification.objects.filter(recipient=self.lecturer, is_read=False).count(), count)
+
+    def test_created_and_marked_read(self):
+        total = len(self.issues)
+        self.assertUnread(total)
+        first = Notification.objects.filter(recipient=self.lecturer).first()
+        self.assertEqual(mark_read(self.lecturer, [first.id]), 1)
+        self.assertUnread(total - 1)
+        # Already read, nothing changes
+        self.assertEqual(mark_read(self.lecturer, [first.id]), 0)
+        self.assertUnread(total - 1)
+        self.assertEqual(mark_read(self.lecturer), total - 1)
+        self.assertUnread(0)
+
+    def test_prune_takes_unread_rows_off_the_counter(self):
+        notifications = list(Notification.objects.filter(recipient=self.lecturer).order_by('id'))
+        read, unread_old = notifications[0], notifications[1:3]
+        mark_read(self.lecturer, [read.id])
+        Notification.objects.filter(id=read.id).update(created_at=timezone.now() - timedelta(days=31))
+        Notification.objects.filter(id__in=[n.id for n in unread_old]).update(created_at=timezone.now() - timedelta(days=181))
+
+        self.assertEqual(prune_notifications(read_days=30, unread_days=180, batch_size=1), 3)
+        self.assertUnread(len(notifications) - 3)
+
+    def test_deleting_an_issue_keeps_its_notification(self):
+        issue = self.issues[0]
+        issue.delete()
+        self.assertUnread(len(self.issues))
+        self.assertEqual(Notification.objects.filter(recipient=self.lecturer, issue=None).count(), 1)
+
+
+@override_settings(LOGIN_RATE_LIMITS={'ip': (5, 0.001), 'username': (3, 0.001)})
+class LoginThrottleTests(TestCase):
+    """LoginView and /api/token/ share the per-address and per-username token buckets."""
+
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.addCleanup(caches['ratelimit'].clear)
+        self.client = APIClient()
+
+    def attempts(self, url, usernames, **headers):
+        return [self.client.post(url, {'username': username, 'password': 'wrong'}, **headers).status_code
+                for username in usernames]
+
+    def test_username_bucket(self):
+        self.assertEqual(self.attempts('/api/login/', ['okello'] * 4), [400, 400, 400, 429])
+        response = self.client.post('/api/login/', {'username': 'okello', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_token_endpoint_is_throttled_too(self):
+        self.assertEqual(self.attempts('/api/token/', ['okello'] * 4), [401, 401, 401, 429])
+        # The same bucket as LoginView's
+        self.assertEqual(self.attempts('/api/login/', ['okello']), [429])
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 0})
+    def test_forwarded_for_does_not_reset_the_address_bucket(self):
+        statuses = [
+            self.client.post('/api/login/', {'username': f'user{n}', 'password': 'wrong'},
+                             HTTP_X_FORWARDED_FOR=f'203.0.113.{n}').status_code
+            for n in range(6)
+        ]
+        self.assertEqual(statuses, [400] * 5 + [429])
+
+
+class UploadTests(TestCase):
+    """Chunked uploads take each chunk once, in order; downloads honour single ranges."""
+
+    content = b'%PDF-1.4 ' + bytes(range(256)) * 4
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        storage = override_settings(MEDIA_ROOT=os.path.join(directory.name, 'media'),
+                                    UPLOAD_TEMP_DIR=os.path.join(directory.name, 'upload_tmp'))
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(seed_users('student', 1)[0])
+
+    def put(self, session, start, end):
+        return self.client.put(
+            f"/api/uploads/{session['id']}/", self.content[start:end + 1], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.content)}',
+        )
+
+    def test_chunks_must_follow_on(self):
+        session = self.client.post('/api/uploads/', {
+            'filename': 'transcript.pdf', 'size': len(self.content), 'content_type': 'application/pdf',
+        }, format='json').data
+        self.assertEqual(self.put(session, 0, 99).data['received'], 100)
+        # The same chunk again, as a retried or duplicated request would send it
+        response = self.put(session, 0, 99)
+        self.assertEqual((response.status_code, response.data['received']), (409, 100))
+        response = self.put(session, 200, 299)
+        self.assertEqual((response.status_code, response.data['received']), (409, 100))
+        self.assertEqual(self.put(session, 100, len(self.content) - 1).data['received'], len(self.content))
+
+        response = self.client.post(f"/api/uploads/{session['id']}/complete/")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['size'], len(self.content))
+
+    def download(self, range_header=None):
+        name = default_storage.save('attachments/test.pdf', ContentFile(self.content))
+        headers = {'HTTP_RANGE': range_header} if range_header else {}
+        self.addCleanup(default_storage.delete, name)
+        response = ranged_file_response(RequestFactory().get('/', **headers), name, 'application/pdf')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, body
+
+    def test_ranges(self):
+        size = len(self.content)
+        self.assertEqual(self.download(), (200, self.content))
+        self.assertEqual(self.download('bytes=2-5'), (206, self.content[2:6]))
+        self.assertEqual(self.download('bytes=-3'), (206, self.content[-3:]))
+        self.assertEqual(self.download(f'bytes={size - 2}-'), (206, self.content[-2:]))
+        for unsatisfiable in ['bytes=-', f'bytes={size}-', 'bytes=5-2', 'items=0-1']:
+            with self.subTest(range=unsatisfiable):
+                self.assertEqual(self.download(unsatisfiable), (416, b''))
+
+
+class MetricsRegistryTests(TestCase):
+    """With METRICS_MULTIPROCESS_DIR, /metrics adds up what every worker wrote."""
+
+    def worker(self):
+        # A Registry of its own stands in for another server process
+        registry = Registry()
+        requests = registry.register(Counter('test_requests_total', 'Requests', ['view']))
+        latency = registry.register(Histogram('test_latency_seconds', 'Latency', buckets=(0.1, 1)))
+        return registry, requests, latency
+
+    def test_workers_are_added_up(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        first, first_requests, first_latency = self.worker()
+        second, second_requests, second_latency = self.worker()
+
+        first_requests.inc(2, view='issues')
+        first_latency.observe(0.05)
+        # Alone, a worker only knows its own numbers
+        self.assertIn('test_requests_total{view="issues"} 2', first.render())
+
+        with override_settings(METRICS_MULTIPROCESS_DIR=directory.name, METRICS_FLUSH_SECONDS=3600):
+            first.flush()
+            second_requests.inc(3, view='issues')
+            second_requests.inc(view='profile')
+            second_latency.observe(0.5)
+            second_latency.observe(5)
+            text = second.render()
+
+        self.assertIn('test_requests_total{view="issues"} 5', text)
+        self.assertIn('test_requests_total{view="profile"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count 3', text)
+        self.assertEqual(len(os.listdir(directory.name)), 2)
+        # The merged totals aren't written back into either worker
+        self.assertEqual(second_requests.value(view='issues'), 3)
@@ -0,0 +1,257 @@
+# users/uploads.py
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import StoredFile, UploadSession
+
+
+# Attachment uploads. Clients open an UploadSession, PUT the file in chunks
+# (resuming from `received` after a dropped connection) and complete it; the
+# finished file is stored once per SHA-256 under attachments/sha256/, and
+# Issue.attachments just points at that name. The old multipart path goes
+# through store_file() too, so re-submitted transcripts aren't duplicated.
+
+BLOCK_SIZE = 64 * 1024
+
+# Leading bytes of each allowed type, checked against the first chunk
+SIGNATURES = {
+    'application/pdf': [b'%PDF-'],
+    'image/png': [b'\x89PNG\r\n\x1a\n'],
+    'image/jpeg': [b'\xff\xd8\xff'],
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': [b'PK\x03\x04'],
+}
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(Exception):
+    # Carries the HTTP status the view should answer with
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def max_attachment_size():
+    return getattr(settings, 'ATTACHMENT_MAX_SIZE', 10 * 1024 * 1024)
+
+
+def allowed_content_types():
+    return getattr(settings, 'ATTACHMENT_ALLOWED_TYPES', list(SIGNATURES))
+
+
+def check_declared_file(size, content_type):
+    # Limits checked from what the client declares, before any content is read
+    if size <= 0:
+        raise UploadError('File is empty')
+    if size > max_attachment_size():
+        raise UploadError(f'Attachments can be at most {max_attachment_size()} bytes', 413)
+    if content_type not in allowed_content_types():
+        raise UploadError(f'Attachments must be one of: {", ".join(allowed_content_types())}', 415)
+
+
+def sniff_content_type(head, declared):
+    # The first bytes have to match the declared type, so renamed files are refused
+    signatures = SIGNATURES.get(declared)
+    if signatures and not any(head.startswith(signature) for signature in signatures):
+        raise UploadError(f'File content does not look like {declared}', 415)
+
+
+def temp_path(session):
+    directory = getattr(settings, 'UPLOAD_TEMP_DIR', os.path.join(tempfile.gettempdir(), 'aits_uploads'))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{session.id}.part')
+
+
+def parse_content_range(header, size):
+    # "bytes start-end/total" -> (start, end), end inclusive
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError('Content-Range must look like "bytes <start>-<end>/<total>"')
+    start, end, total = (int(value) for value in match.groups())
+    if total != size or start > end or end >= size:
+        raise UploadError('Content-Range does not fit the upload')
+    return start, end
+
+
+def write_chunk(session, stream, content_range, content_length):
+    """
+    Writes one chunk of `session` from `stream`. Everything that can be
+    checked from the headers is checked before the body is read, and the
+    chunk has to start where the previous one ended (409 otherwise, with
+    the session's offset so the client can resume). The session row stays
+    locked from that check until the new offset is saved, so two requests
+    for the same offset can't both write the .part file: the second waits,
+    then gets the 409. `session` is updated to what was saved.
+    """
+    start, end = parse_content_range(content_range, session.size)
+    length = end - start + 1
+    if content_length != length:
+        raise UploadError('Content-Length does not match Content-Range')
+    if length > getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 5 * 1024 * 1024):
+        raise UploadError('Chunk is too large', 413)
+
+    with transaction.atomic():
+        locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+        session.status, session.received = locked.status, locked.received
+        if session.status != 'open':
+            raise UploadError('Upload is already complete', 409)
+        if start != session.received:
+            raise UploadError(f'Expected a chunk starting at byte {session.received}', 409)
+
+        path = temp_path(session)
+        written = 0
+        # r+b so a half written earlier attempt is overwritten, not appended to
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as part:
+            part.seek(start)
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                if start == 0 and written == 0:
+                    sniff_content_type(block, session.content_type)
+                part.write(block)
+                written += len(block)
+            part.truncate()
+        if written != length:
+            raise UploadError('Chunk body ended early')
+        locked.received = start + length
+        locked.save(update_fields=['received', 'updated_at'])
+        session.received = locked.received
+
+
+def file_sha256(fileobj):
+    digest = hashlib.sha256()
+    for block in iter(lambda: fileobj.read(BLOCK_SIZE), b''):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def blob_name(sha256):
+    return f'attachments/sha256/{sha256[:2]}/{sha256[2:4]}/{sha256}'
+
+
+def store_file(fileobj, size, content_type):
+    """
+    Stores the content of `fileobj` once per SHA-256 and returns its
+    StoredFile. A second copy of the same bytes just reuses the first one.
+    """
+    sha256 = file_sha256(fileobj)
+    stored = StoredFile.objects.filter(sha256=sha256).first()
+    if stored:
+        return stored
+    name = blob_name(sha256)
+    if not default_storage.exists(name):
+        name = default_storage.save(name, File(fileobj))
+    try:
+        with transaction.atomic():
+            return StoredFile.objects.create(sha256=sha256, file=name, size=size, content_type=content_type)
+    except IntegrityError:
+        # Someone stored the same file at the same moment
+        return StoredFile.objects.get(sha256=sha256)
+
+
+def complete_upload(session):
+    if session.status == 'complete':
+        return session.stored_file
+    if session.received != session.size:
+        raise UploadError(f'Only {session.received} of {session.size} bytes were received', 409)
+    path = temp_path(session)
+    with open(path, 'rb') as part:
+        stored = store_file(part, session.size, session.content_type)
+    os.remove(path)
+    session.status = 'complete'
+    session.stored_file = stored
+    session.save(update_fields=['status', 'stored_file', 'updated_at'])
+    return stored
+
+
+def store_uploaded_file(uploaded):
+    # The multipart path: same limits and dedupe as the chunked uploads
+    content_type = uploaded.content_type or mimetypes.guess_type(uploaded.name)[0] or ''
+    check_declared_file(uploaded.size, content_type)
+    sniff_content_type(uploaded.read(16), content_type)
+    uploaded.seek(0)
+    return store_file(uploaded, uploaded.size, content_type)
+
+
+def clear_stale_uploads(hours=None):
+    # Drops open sessions (and their temp files) nobody has written to for a while
+    hours = hours or getattr(settings, 'UPLOAD_SESSION_EXPIRY_HOURS', 24)
+    stale = UploadSession.objects.filter(status='open', updated_at__lt=timezone.now() - timedelta(hours=hours))
+    removed = 0
+    for session in stale.iterator():
+        path = temp_path(session)
+        if os.path.exists(path):
+            os.remove(path)
+        session.delete()
+        removed += 1
+    return removed
+
+
+def file_chunks(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        while length > 0:
+            block = fileobj.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        fileobj.close()
+
+
+def ranged_file_response(request, name, content_type, etag=None, filename=None):
+    """
+    Streams a stored file, honouring a single "Range: bytes=a-b" request
+    with a 206 so downloads can be resumed and PDFs viewed page by page.
+    """
+    size = default_storage.size(name)
+    start, end = 0, size - 1
+    status = 200
+    range_header = request.META.get('HTTP_RANGE', '')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range == etag):
+        match = RANGE_RE.match(range_header)
+        if match and match.group(1):
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+        elif match and match.group(2):
+            # Suffix range, the last N bytes
+            start = max(size - int(match.group(2)), 0)
+        else:
+            # Not a range, "bytes=-" included
+            match = None
+        if not match or start > end or start >= size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        status = 206
+
+    length = end - start + 1
+    response = StreamingHttpResponse(file_chunks(default_storage.open(name, 'rb'), start, length),
+                                     status=status, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if etag:
+        response['ETag'] = etag
+    if filename:
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
@@ -3,8 +3,17 @@ from django.urls import path
 from .views import( RegisterView,
                    LoginView,
                    SubmitIssueView,
+                   UploadSessionView,
+                   UploadChunkView,
+                   UploadCompleteView,
+                   IssueAttachmentView,
+                   IssueThumbnailView,
                    AssignIssueView,
+                   BulkAssignIssuesView,
+                   AutoAssignIssuesView,
+                   LecturerWorkloadView,
                    ResolveIssueView,
+                   BulkResolveIssuesView,
                    StudentIssueView,
                    ResolvedIssuesView,
                    IssueDetailView,
@@ -15,17 +24,27 @@ from .views import( RegisterView,
                    RegistrarIssueView,
                    IssueCountView,
                    RegisterCountView,
+                   IssueStatisticsView,
+                   RegistrarIssueExportView,
                    LecturerSearchView,
                    LecturerAssignedIssuesView,
                    LecturerIssueDetailView,
                    LecturerPendingIssuesView,
-                   DebugRequestView,
+                   NotificationListView,
+                   NotificationUnreadCountView,
+                   NotificationReadView,
+                   NotificationBulkReadView,
+                   RequestProfileListView,
+                   RequestProfileDownloadView,
                    UsersView,
                    #LecturerResolvedIssueView
                    UsersView,
                    )
 
 
+from .streams import issue_event_stream
+from .ratelimit import LoginRateThrottle
+
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,)
@@ -44,27 +63,50 @@ urlpatterns = [
     path('registrar/profile/', RegistrarProfileView.as_view(), name='registrar_profile'),
     path('submit-issue/', SubmitIssueView.as_view(), name='submit_issue'),
     
+    path('uploads/', UploadSessionView.as_view(), name='upload_session'),
+    path('uploads/<uuid:pk>/', UploadChunkView.as_view(), name='upload_chunk'),
+    path('uploads/<uuid:pk>/complete/', UploadCompleteView.as_view(), name='upload_complete'),
+    path('issue/<int:pk>/attachment/', IssueAttachmentView.as_view(), name='issue_attachment'),
+    path('issue/<int:pk>/thumbnail/', IssueThumbnailView.as_view(), name='issue_thumbnail'),
+
     path('my-issues/',StudentIssueView.as_view(),name='my-issues'),
     path('resolved-issues/',ResolvedIssuesView.as_view(),name='resolved-issues'),
     path('issue/<int:pk>/',IssueDetailView.as_view(),name='issue-detail'),
     path('issue-count/', IssueCountView.as_view(), name='issue-count'),
     path('logout/', LogoutView.as_view(), name='logout'),
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    # Also checks passwords, so it shares LoginView's buckets
+    path('token/', TokenObtainPairView.as_view(throttle_classes=[LoginRateThrottle]), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     #registrar
     path('registrar/issues/', RegistrarIssueView.as_view(), name='registrar_issues'),
     path('Registrar_issue_counts/',RegisterCountView.as_view(),name='Registrar_issue_counts'),
+    path('registrar/issues/export/<str:file_format>/', RegistrarIssueExportView.as_view(), name='registrar_issues_export'),
+    path('registrar/issue-statistics/', IssueStatisticsView.as_view(), name='issue_statistics'),
     path('search-lecturers/', LecturerSearchView.as_view(), name='search-lecturers'),#lecturer in the database
     path('assign-issue/<int:issue_id>/', AssignIssueView.as_view(), name='assign_issue'),
+    path('assign-issues/', BulkAssignIssuesView.as_view(), name='bulk_assign_issues'),
+    path('auto-assign-issues/', AutoAssignIssuesView.as_view(), name='auto_assign_issues'),
+    path('registrar/lecturer-workload/', LecturerWorkloadView.as_view(), name='lecturer_workload'),
 
     #lecturer 
     path('assigned-issues/', LecturerAssignedIssuesView.as_view(), name='lecturer_assigned_issues'),
     path('lecturer/issue/<int:pk>/',LecturerIssueDetailView.as_view(), name='lecturer_issue_detail'),
     path('lecturer/pending_issues/', LecturerPendingIssuesView.as_view(), name='lecturer_pending_issues'),
     path('resolve-issue/', ResolveIssueView.as_view(), name='resolve_issue'),
+    path('resolve-issues/', BulkResolveIssuesView.as_view(), name='bulk_resolve_issues'),
     #path('lecturer/resolved-issues/', LecturerResolvedIssuesView.as_view(), name='lecturer_resolved_issues'),
     
-    path('api/debug-request/', DebugRequestView.as_view(), name='debug-request'),
+    #notifications (any signed in user's own inbox)
+    path('notifications/', NotificationListView.as_view(), name='notifications'),
+    path('notifications/unread-count/', NotificationUnreadCountView.as_view(), name='notifications_unread_count'),
+    path('notifications/<int:pk>/read/', NotificationReadView.as_view(), name='notification_read'),
+    path('notifications/read/', NotificationBulkReadView.as_view(), name='notifications_bulk_read'),
+
+    #profiling (registrars and staff)
+    path('profiles/', RequestProfileListView.as_view(), name='request_profiles'),
+    path('profiles/<int:pk>/', RequestProfileDownloadView.as_view(), name='request_profile'),
+
     path('users/', UsersView.as_view(), name='users'),
+    path('events/', issue_event_stream, name='issue_events'),  # server-sent events, ASGI only
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from email import message
-from django.contrib.auth import authenticate
+import mimetypes
+from collections import Counter
 from rest_framework.views import APIView
 from .models import Issue,User
 from .models import Issue,User, StudentProfile
@@ -9,17 +10,35 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils.decorators import method_decorator
 from django.db.models import Q
+from django.db import transaction
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import api_view, parser_classes
 
 #from ACADEMIC_TRACKING_SYSTEM.backend.AITS_project.settings import DEFAULT_FROM_EMAIL
-from .models import Issue,User,LecturerProfile
-from .serializers import RegisterSerializer, LoginSerializer, IssueSerializer,StudentProfileSerializer,LecturerProfileSerializer,RegistrarProfileSerializer,UserSerializer
+from .models import Issue,User,LecturerProfile,LecturerWorkload,Notification,StoredFile,UploadSession,IssuePreview,RequestProfile,ArchivedIssue
+from .serializers import RegisterSerializer, LoginSerializer, IssueSerializer,StudentProfileSerializer,LecturerProfileSerializer,RegistrarProfileSerializer,UserSerializer,NotificationSerializer,RequestProfileSerializer,LecturerWorkloadSerializer,ArchivedIssueSerializer
 from django.contrib.auth import get_user_model
 from django_filters.rest_framework import DjangoFilterBackend
-from django.core.mail import send_mail
+from .mail import queue_mail
+from .stats import get_issue_statistics
+from .search import IssueSearchFilter
+from .directory import lecturer_directory
+from .signals import issues_bulk_updated
+from .authentication import auth_users, cache_auth_user, invalidate_auth_user
+from .ratelimit import LoginRateThrottle
+from .notifications import mark_read, unread_count
+from .profiling import can_profile
+from .conditional import ConditionalIssueListMixin, ConditionalProfileMixin
+from .replicas import ReplicaReadMixin
+from .fieldsets import SparseFieldsMixin
+from .workload import LeastLoaded, department_workloads, issue_department
+from .exports import EXPORT_FORMATS, export_rows
+from .uploads import (UploadError, check_declared_file, complete_upload, max_attachment_size,
+                      ranged_file_response, store_uploaded_file, write_chunk)
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.conf import settings
 from django.db.models import Q
 from django.shortcuts import get_object_or_404
@@ -29,7 +48,6 @@ User = get_user_model()
 class RegisterView(APIView):
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
-        print(request.data)
         if serializer.is_valid():
             user = serializer.save()
             
@@ -41,22 +59,17 @@ class RegisterView(APIView):
                 message = f"Hello {user.first_name},\n\nYou have successfully registered into the Academic Issue Tracking System as a lecturer."
             elif user.role == 'registrar':
                 message = f"Hello {user.first_name},\n\nYou have successfully registered into the Academic Issue Tracking System as a registrar."
-            # Send email
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
+            # Queue the email, the send_queued_mail worker delivers it
+            queue_mail(subject, message, [user.email])
             return Response(
                 {"message": "User created successfully", "user": serializer.data}, 
                 status=status.HTTP_201_CREATED
             )
-        print(serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class LoginView(APIView):
+    throttle_classes = [LoginRateThrottle]
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
@@ -64,59 +77,63 @@ class LoginView(APIView):
             password = serializer.validated_data['password']
             login_type = serializer.validated_data.get('loginType')  # Use get() for optional field
             
-            # Find user by username
+            # One query for the user and their profile. check_password rewrites
+            # the hash with the preferred hasher (PASSWORD_HASHERS) when it
+            # was made with an older one or older parameters.
             try:
-                user = User.objects.get(username=username)  # Find user by username instead of email
-                # Authenticate with username and password
-                authenticated_user = authenticate(request, username=user.username, password=password)
-                
-                if authenticated_user is not None:
-                    # Optional role check
-                    if login_type and authenticated_user.role != login_type:
-                        return Response({'error': 'Invalid role for this login type'}, 
-                                       status=status.HTTP_403_FORBIDDEN)
-                    
-                    refresh = RefreshToken.for_user(authenticated_user)
-                    return Response({
-                        'refresh': str(refresh),
-                        'access': str(refresh.access_token),
-                        'user': {
-                
-                            'id': authenticated_user.id,
-                            'username': authenticated_user.username,
-                            'email': authenticated_user.email,
-                            'role': authenticated_user.role,
-                            'first_name': authenticated_user.first_name,
-                            'last_name': authenticated_user.last_name,
-                                                }
-                    })
-                return Response({'error': 'Invalid password'}, status=status.HTTP_400_BAD_REQUEST)
+                user = auth_users().get(username=username)
             except User.DoesNotExist:
                 return Response({'error': 'User not found'}, status=status.HTTP_400_BAD_REQUEST)
+            if not user.is_active or not user.check_password(password):
+                return Response({'error': 'Invalid password'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Optional role check
+            if login_type and user.role != login_type:
+                return Response({'error': 'Invalid role for this login type'}, 
+                               status=status.HTTP_403_FORBIDDEN)
+
+            cache_auth_user(user)
+            refresh = RefreshToken.for_user(user)
+            return Response({
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
+                'user': {
+                    'id': user.id,
+                    'username': user.username,
+                    'email': user.email,
+                    'role': user.role,
+                    'first_name': user.first_name,
+                    'last_name': user.last_name,
+                }
+            })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-class StudentProfileView(generics.RetrieveUpdateAPIView):
+class StudentProfileView(ReplicaReadMixin, ConditionalProfileMixin, generics.RetrieveUpdateAPIView):
     serializer_class = StudentProfileSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-         return get_object_or_404(StudentProfile, user=self.request.user)
+        # Already loaded with the user by CachedJWTAuthentication
+        profile = self.get_profile(getattr(self.request.user, 'student_profile', None))
+        if profile is None:
+            raise Http404('No student profile')
+        return profile
 
 # View for retrieving the lecturer profile
-class LecturerProfileView(generics.RetrieveUpdateAPIView):
+class LecturerProfileView(ReplicaReadMixin, ConditionalProfileMixin, generics.RetrieveUpdateAPIView):
     serializer_class = LecturerProfileSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user.lecturer_profile
+        return self.get_profile(self.request.user.lecturer_profile)
 
 # View for retrieving the registrar profile
-class RegistrarProfileView(generics.RetrieveUpdateAPIView):
+class RegistrarProfileView(ReplicaReadMixin, ConditionalProfileMixin, generics.RetrieveUpdateAPIView):
     serializer_class = RegistrarProfileSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user.registrar_profile
+        return self.get_profile(self.request.user.registrar_profile)
 
 
 class SubmitIssueView(APIView):
@@ -128,32 +145,44 @@ class SubmitIssueView(APIView):
                 {'error': 'Only students can submit issues'},
                 status=status.HTTP_403_FORBIDDEN
             )
-        # Automatically include student details in the request data
-        request_data = request.data.copy()
-        student_profile = request.user.student_profile
-        request_data['first_name'] = request.user.first_name
-        request_data['last_name'] = request.user.last_name
-        request_data['registration_no'] = student_profile.registration_no # From student profile
-        request_data['student_no'] = student_profile.student_no  # From student profile
+        # Refuse oversized multipart bodies before Django reads them
+        if content_length(request) > max_attachment_size() + getattr(settings, 'ISSUE_FORM_OVERHEAD', 64 * 1024):
+            return Response({'error': f'Attachments can be at most {max_attachment_size()} bytes'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
         serializer = IssueSerializer(data=request.data, context={'request':request})
-        if serializer.is_valid():
-            serializer.save(submitted_by=request.user)
-            #Get the registrar's email
-            registrar= User.objects.filter(role='registrar').first()
-            if registrar and registrar.email:
-                #send email notification to registrar
-                send_mail(
-                    subject="New Issue Submitted",
-                    message=f"A new issue has been submitted by {request.user.first_name}",
-                    from_email= settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[registrar.email],
-                    fail_silently=False,        
-
-                )
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        print(serializer.errors)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # The attachment is either a finished chunked upload (upload_id) or a plain multipart file,
+        # either way it is stored once per content hash. Only once the issue is valid, so a
+        # rejected submission leaves no stored file behind
+        extra = {}
+        try:
+            if request.data.get('upload_id'):
+                upload = UploadSession.objects.select_related('stored_file').filter(
+                    pk=request.data['upload_id'], owner=request.user, status='complete'
+                ).first()
+                if upload is None:
+                    return Response({'error': 'Upload not found or not complete'}, status=status.HTTP_400_BAD_REQUEST)
+                extra['attachments'] = upload.stored_file.file.name
+            elif request.FILES.get('attachments'):
+                extra['attachments'] = store_uploaded_file(request.FILES['attachments']).file.name
+        except (UploadError, ValidationError) as error:
+            message = error.message if isinstance(error, UploadError) else 'Invalid upload id'
+            return Response({'error': message}, status=getattr(error, 'status', status.HTTP_400_BAD_REQUEST))
+
+        serializer.save(submitted_by=request.user, **extra)
+        #Get the registrar's email
+        registrar= User.objects.filter(role='registrar').first()
+        if registrar and registrar.email:
+            #queue email notification to registrar
+            queue_mail(
+                subject="New Issue Submitted",
+                message=f"A new issue has been submitted by {request.user.first_name}",
+                recipient_list=[registrar.email],
+            )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     @api_view(['POST'])
     @parser_classes([MultiPartParser, FormParser])
     def submit_issue(request):
@@ -164,6 +193,118 @@ class SubmitIssueView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+def content_length(request):
+    try:
+        return int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return 0
+
+
+#chunked attachment uploads (users/uploads.py)
+class UploadSessionView(APIView):
+    """
+    Starts a chunked upload: {"filename", "size", "content_type"}. Size and
+    type limits are checked here, before any file content is sent.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        filename = str(request.data.get('filename') or '')[:255]
+        content_type = request.data.get('content_type') or ''
+        try:
+            size = int(request.data.get('size'))
+        except (ValueError, TypeError):
+            return Response({'error': 'size must be the file size in bytes'}, status=status.HTTP_400_BAD_REQUEST)
+        if not filename:
+            return Response({'error': 'filename is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            check_declared_file(size, content_type)
+        except UploadError as error:
+            return Response({'error': error.message}, status=error.status)
+
+        session = UploadSession.objects.create(owner=request.user, filename=filename, size=size, content_type=content_type)
+        return Response({
+            'id': session.id,
+            'size': session.size,
+            'received': session.received,
+            'chunk_size': getattr(settings, 'UPLOAD_CHUNK_SIZE', 1024 * 1024),
+        }, status=status.HTTP_201_CREATED)
+
+
+class UploadChunkView(APIView):
+    """
+    GET reports how much of the upload has arrived, so an interrupted client
+    knows where to resume. PUT sends the next chunk as the raw body with a
+    Content-Range header.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, owner=request.user)
+        return Response({'id': session.id, 'size': session.size, 'received': session.received, 'status': session.status})
+
+    def put(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, owner=request.user)
+        try:
+            # Locks the session itself while it writes
+            write_chunk(session, request.stream, request.META.get('HTTP_CONTENT_RANGE'), content_length(request))
+        except UploadError as error:
+            return Response({'error': error.message, 'received': session.received}, status=error.status)
+        return Response({'id': session.id, 'size': session.size, 'received': session.received})
+
+
+class UploadCompleteView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        with transaction.atomic():
+            session = get_object_or_404(UploadSession.objects.select_for_update(), pk=pk, owner=request.user)
+            try:
+                stored = complete_upload(session)
+            except UploadError as error:
+                return Response({'error': error.message, 'received': session.received}, status=error.status)
+        return Response({'id': session.id, 'sha256': stored.sha256, 'size': stored.size, 'content_type': stored.content_type})
+
+
+def can_view_issue(user, issue):
+    return user.role == 'registrar' or user.id in (issue.submitted_by_id, issue.assigned_to_id)
+
+
+class IssueAttachmentView(APIView):
+    # Streams an issue's attachment with Range support, to the people who can see the issue
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        issue = get_object_or_404(Issue, pk=pk)
+        if not can_view_issue(request.user, issue):
+            return Response({'error': 'You do not have access to this issue'}, status=status.HTTP_403_FORBIDDEN)
+        if not issue.attachments:
+            return Response({'error': 'Issue has no attachment'}, status=status.HTTP_404_NOT_FOUND)
+        stored = StoredFile.objects.filter(file=issue.attachments.name).first()
+        if stored:
+            return ranged_file_response(request, stored.file.name, stored.content_type, etag=f'"{stored.sha256}"',
+                                        filename=f"{issue.issue_id}{mimetypes.guess_extension(stored.content_type) or ''}")
+        # Attachments saved before content addressed storage
+        name = issue.attachments.name
+        return ranged_file_response(request, name, mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                                    filename=name.rsplit('/', 1)[-1])
+
+
+class IssueThumbnailView(APIView):
+    # Small JPEG made from the attachment by the process_attachments worker
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        preview = get_object_or_404(IssuePreview.objects.select_related('issue'), issue_id=pk, status='done')
+        if not can_view_issue(request.user, preview.issue):
+            return Response({'error': 'You do not have access to this issue'}, status=status.HTTP_403_FORBIDDEN)
+        if not preview.thumbnail:
+            return Response({'error': 'Attachment has no thumbnail'}, status=status.HTTP_404_NOT_FOUND)
+        response = ranged_file_response(request, preview.thumbnail.name, 'image/jpeg')
+        response['Cache-Control'] = 'private, max-age=86400'
+        return response
+
+
 class ResolveIssueView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -176,7 +317,7 @@ class ResolveIssueView(APIView):
             )
         
         try:
-            issue = Issue.objects.get(id=request.data["issueId"], assigned_to=request.user)
+            issue = Issue.objects.select_related('submitted_by').get(id=request.data["issueId"], assigned_to=request.user)
             if issue.status =='resolved':
                 return Response({'error: Issue is already resolved'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -185,15 +326,13 @@ class ResolveIssueView(APIView):
             issue.resolved_at = timezone.now()
             issue.save()
 
-            #send an email notification to the student who submitted the issue
+            #queue an email notification to the student who submitted the issue
             student_user= issue.submitted_by
             if student_user and student_user.email:
-               send_mail(
+               queue_mail(
                     subject= "Your Issue has been resolved",
                     message=(f"Hello {student_user.first_name},your issue has been successfully resolved "),
-                    from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[student_user.email],
-                    fail_silently=False,   
                     )
 
                 
@@ -263,45 +402,254 @@ class AssignIssueView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+def parse_issue_ids(request):
+    # Unique issue ids from the request body in their original order, or an error Response
+    issue_ids = request.data.get('issue_ids')
+    if not isinstance(issue_ids, list) or not issue_ids:
+        return None, Response({'error': 'issue_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = getattr(settings, 'BULK_ISSUE_LIMIT', 500)
+    if len(issue_ids) > limit:
+        return None, Response({'error': f'At most {limit} issues can be handled per request'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        issue_ids = list(dict.fromkeys(int(issue_id) for issue_id in issue_ids))
+    except (ValueError, TypeError):
+        return None, Response({'error': 'Issue IDs must be valid integers'}, status=status.HTTP_400_BAD_REQUEST)
+    return issue_ids, None
+
+
+def queue_assignment_digest(lecturer, issues):
+    # One email listing every issue just assigned to the lecturer
+    if lecturer.email:
+        titles = '\n'.join(f"- {issue.issue_id}: {issue.title}" for issue in issues)
+        queue_mail(
+            subject="New Issues Assigned",
+            message=f"Dear {lecturer.first_name}, {len(issues)} issue(s) have been assigned to you:\n\n{titles}",
+            recipient_list=[lecturer.email],
+        )
+
+
+class BulkAssignIssuesView(APIView):
+    """
+    Assigns many issues to one lecturer in a single transaction and sends the
+    lecturer one digest email instead of one per issue.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role != 'registrar':
+            return Response(
+                {'error': 'Only Registrar can assign issues'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        issue_ids, error = parse_issue_ids(request)
+        if error:
+            return error
+        try:
+            user_id = int(request.data.get('user_id'))
+        except (ValueError, TypeError):
+            return Response({'error': 'Lecturer User ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The lecturer is validated once for the whole batch
+        lecturer = User.objects.select_related('lecturer_profile').filter(
+            id=user_id, role='lecturer', lecturer_profile__isnull=False
+        ).first()
+        if lecturer is None:
+            return Response(
+                {'error': 'Lecturer not found or not properly registered'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        results = []
+        assigned = []
+        now = timezone.now()
+        with transaction.atomic():
+            issues = Issue.objects.select_for_update().in_bulk(issue_ids)
+            for issue_id in issue_ids:
+                issue = issues.get(issue_id)
+                if issue is None:
+                    results.append({'issue_id': issue_id, 'result': 'not_found'})
+                elif issue.status == 'resolved':
+                    results.append({'issue_id': issue_id, 'result': 'already_resolved'})
+                else:
+                    issue.assigned_to = lecturer
+                    issue.status = 'assigned'
+                    issue.updated_at = now
+                    assigned.append(issue)
+                    results.append({'issue_id': issue_id, 'result': 'assigned'})
+            Issue.objects.bulk_update(assigned, ['assigned_to', 'status', 'updated_at'])
+            issues_bulk_updated.send(sender=Issue, issues=assigned, action='assigned')
+
+            if assigned:
+                queue_assignment_digest(lecturer, assigned)
+
+        return Response({
+            'assigned': len(assigned),
+            'results': results,
+            'assigned_to': {
+                'id': lecturer.id,
+                'name': f"{lecturer.first_name} {lecturer.last_name}",
+                'department': lecturer.lecturer_profile.department,
+            }
+        }, status=status.HTTP_200_OK)
+
+
+class AutoAssignIssuesView(APIView):
+    """
+    Assigns each given unassigned issue to the least loaded lecturer of the
+    department that handles the student's programme (AUTO_ASSIGN_DEPARTMENTS),
+    or of "department" when the request names one. Loads come from the
+    LecturerWorkload table (users/workload.py); each lecturer gets one
+    digest email.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role != 'registrar':
+            return Response(
+                {'error': 'Only Registrar can assign issues'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        issue_ids, error = parse_issue_ids(request)
+        if error:
+            return error
+        department = request.data.get('department') or None
+        if department is not None and department not in dict(LecturerProfile.DEPARTMENT_CHOICES):
+            return Response({'error': 'Unknown department'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        assigned = []
+        now = timezone.now()
+        with transaction.atomic():
+            issues = Issue.objects.select_for_update(of=('self',)).select_related('submitted_by__student_profile').in_bulk(issue_ids)
+            departments = {issue_id: department or issue_department(issue) for issue_id, issue in issues.items()}
+            lecturers = LeastLoaded(Counter(departments.values()))
+            for issue_id in issue_ids:
+                issue = issues.get(issue_id)
+                if issue is None:
+                    results.append({'issue_id': issue_id, 'result': 'not_found'})
+                elif issue.status == 'resolved':
+                    results.append({'issue_id': issue_id, 'result': 'already_resolved'})
+                elif issue.assigned_to_id:
+                    results.append({'issue_id': issue_id, 'result': 'already_assigned'})
+                elif departments[issue_id] is None:
+                    results.append({'issue_id': issue_id, 'result': 'no_department'})
+                else:
+                    lecturer_id = lecturers.pick(departments[issue_id])
+                    if lecturer_id is None:
+                        results.append({'issue_id': issue_id, 'result': 'no_lecturer', 'department': departments[issue_id]})
+                        continue
+                    issue.assigned_to_id = lecturer_id
+                    issue.status = 'assigned'
+                    issue.updated_at = now
+                    assigned.append(issue)
+                    results.append({'issue_id': issue_id, 'result': 'assigned', 'assigned_to': lecturer_id,
+                                    'department': departments[issue_id]})
+            Issue.objects.bulk_update(assigned, ['assigned_to', 'status', 'updated_at'])
+            issues_bulk_updated.send(sender=Issue, issues=assigned, action='assigned')
+
+            by_lecturer = {}
+            for issue in assigned:
+                by_lecturer.setdefault(issue.assigned_to_id, []).append(issue)
+            for lecturer in User.objects.filter(id__in=by_lecturer):
+                queue_assignment_digest(lecturer, by_lecturer[lecturer.id])
+
+        return Response({'assigned': len(assigned), 'results': results}, status=status.HTTP_200_OK)
+
+
+class BulkResolveIssuesView(APIView):
+    """
+    Resolves many of the lecturer's assigned issues at once, each student gets
+    one email listing all of their resolved issues.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.user.role != 'lecturer':
+            return Response(
+                {'error': 'Only lecturers can resolve issues'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        issue_ids, error = parse_issue_ids(request)
+        if error:
+            return error
+
+        results = []
+        resolved = []
+        now = timezone.now()
+        with transaction.atomic():
+            issues = Issue.objects.select_for_update().select_related('submitted_by').filter(
+                assigned_to=request.user
+            ).in_bulk(issue_ids)
+            for issue_id in issue_ids:
+                issue = issues.get(issue_id)
+                if issue is None:
+                    results.append({'issue_id': issue_id, 'result': 'not_found'})
+                elif issue.status == 'resolved':
+                    results.append({'issue_id': issue_id, 'result': 'already_resolved'})
+                else:
+                    issue.status = 'resolved'
+                    issue.resolved_at = now
+                    issue.updated_at = now
+                    resolved.append(issue)
+                    results.append({'issue_id': issue_id, 'result': 'resolved'})
+            Issue.objects.bulk_update(resolved, ['status', 'resolved_at', 'updated_at'])
+            issues_bulk_updated.send(sender=Issue, issues=resolved, action='resolved')
+
+            # One digest per student
+            by_student = {}
+            for issue in resolved:
+                by_student.setdefault(issue.submitted_by, []).append(issue)
+            for student_user, student_issues in by_student.items():
+                if student_user.email:
+                    titles = '\n'.join(f"- {issue.issue_id}: {issue.title}" for issue in student_issues)
+                    queue_mail(
+                        subject="Your Issues have been resolved",
+                        message=f"Hello {student_user.first_name}, the following issue(s) have been resolved:\n\n{titles}",
+                        recipient_list=[student_user.email],
+                    )
+
+        return Response({'resolved': len(resolved), 'results': results}, status=status.HTTP_200_OK)
+
 #functionality of the students dashboard
 
     
-class LecturerSearchView(generics.ListAPIView):
+class LecturerSearchView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = LecturerProfileSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = None  # answered from memory, use ?limit= to cap typeahead results
 
-    def get_queryset(self):
-        query = self.request.GET.get('q', '')
-
-        # Get all users who are lecturers and match the search query
-        matching_lecturers = User.objects.filter(
-            role='lecturer'
-        ).filter(
-            Q(first_name__icontains=query) | Q(last_name__icontains=query)
-        )
+    def list(self, request):
+        query = request.GET.get('q', '')
+        department = request.GET.get('department') or None
+        try:
+            limit = int(request.GET.get('limit', 0)) or None
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Return the related LecturerProfile objects
-        return LecturerProfile.objects.filter(user__in=matching_lecturers)
+        # Lecturers whose first or last name starts with each typed word, without touching the database
+        return Response(lecturer_directory.search(query, department=department, limit=limit))
 
-class StudentIssueView(generics.ListAPIView):
+class StudentIssueView(ReplicaReadMixin, ConditionalIssueListMixin, SparseFieldsMixin, generics.ListAPIView):
     serializer_class=IssueSerializer
     permission_classes=[IsAuthenticated]
+    cursor_ordering=('created_at', 'id')
 
     def get_queryset(self):
-        return Issue.objects.filter(submitted_by=self.request.user).order_by('created_at')
+        return Issue.objects.with_related().filter(submitted_by=self.request.user).order_by('created_at')
 
 
 
-class ResolvedIssuesView(generics.ListAPIView):
+class ResolvedIssuesView(ReplicaReadMixin, SparseFieldsMixin, generics.ListAPIView):
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Issue.objects.filter(Q(assigned_to=self.request.user) | Q(submitted_by=self.request.user), status='resolved')
+        return Issue.objects.with_related().filter(Q(assigned_to=self.request.user) | Q(submitted_by=self.request.user), status='resolved')
 
-class UsersView(generics.ListAPIView):
+class UsersView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('id',)
 
     def get_queryset(self):
         return User.objects.all()
@@ -310,23 +658,31 @@ class UsersView(generics.ListAPIView):
         #O11 serializer.save(student=self.request.use
         serializer.save()
 
-class IssueDetailView(generics.RetrieveAPIView):
-    queryset = Issue.objects.all()
+class IssueDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
+    queryset = Issue.objects.with_related()
     serializer_class=IssueSerializer
     permission_classes=[IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Issues resolved long ago live in the archive (users/archive.py), under the same id
+            archived = get_object_or_404(
+                ArchivedIssue.objects.select_related('submitted_by__student_profile'), pk=kwargs['pk'],
+            )
+            return Response(ArchivedIssueSerializer(archived, context=self.get_serializer_context()).data)
 
-class IssueCountView(generics.ListAPIView):
+
+class IssueCountView(ReplicaReadMixin, generics.ListAPIView):
     permission_classes=[IsAuthenticated]
 
     def list(self,request):
-        total_issues = Issue.objects.count()
-        resolved_issues = Issue.objects.filter(status="resolved").count()
-        pending_issues = Issue.objects.filter(status="pending").count()
+        stats = get_issue_statistics()
         return Response({
-            "total_issues":total_issues,
-            "resolved_issues":resolved_issues,
-            "pending_issues":pending_issues
+            "total_issues":stats["total_issues"],
+            "resolved_issues":stats["resolved_issues"],
+            "pending_issues":stats["pending_issues"]
         })
         
 
@@ -339,6 +695,7 @@ class LogoutView(APIView):
                 return Response({'error': 'Refresh token is required'}, status=status.HTTP_400_BAD_REQUEST)
             token=RefreshToken(refresh_token)
             token.blacklist() #Blacklist the refresh token
+            invalidate_auth_user(request.user.id) #and drop the cached user
             return Response({'message': 'Successfully logged out'}, status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -346,19 +703,20 @@ class LogoutView(APIView):
 
 
 #functionality for Registrar dashboard
-class RegistrarIssueView(generics.ListAPIView):
+class RegistrarIssueView(ReplicaReadMixin, SparseFieldsMixin, generics.ListAPIView):
     # API endpoint for registrar to view all submitted issues and filter all submitted issues
     
     serializer_class= IssueSerializer
     permission_classes= [IsAuthenticated]
+    cursor_ordering= ('created_at', 'id')
     #Retrieves all issues for the registar
     def get_queryset(self):
-        return Issue.objects.all().order_by('created_at')
+        return Issue.objects.with_related().order_by('created_at')
     #filtering capabalities
     
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, IssueSearchFilter]
     filterset_fields = ['status', 'category']  # Add programme
-    search_fields = ['first_name', 'last_name', 'registration_no']  # Add search fields
+    # ?search= goes through the full-text index (title, description, course unit, student names and numbers)
 
     # Method for registrars to assign issues to lecturers
     def assign_issue(self, issue, lecturer):
@@ -373,81 +731,203 @@ class RegistrarIssueView(generics.ListAPIView):
         issue.status = 'assigned'
         issue.save()
 
+class RegistrarIssueExportView(generics.GenericAPIView):
+    """
+    Streams every issue with student and lecturer details as CSV or XLSX.
+    Takes the same ?status=, ?category= and ?search= filters as the
+    registrar issue list; rows go out as they are read so memory use doesn't
+    grow with the number of issues.
+    """
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, IssueSearchFilter]
+    filterset_fields = ['status', 'category']
+    pagination_class = None
+
+    def get_queryset(self):
+        return Issue.objects.all()
+
+    def get(self, request, file_format):
+        if request.user.role != 'registrar':
+            return Response({'error': 'Only registrars can export issues'}, status=status.HTTP_403_FORBIDDEN)
+        if file_format not in EXPORT_FORMATS:
+            return Response({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        stream, content_type, extension = EXPORT_FORMATS[file_format]
+        issues = self.filter_queryset(self.get_queryset())
+
+        response = StreamingHttpResponse(stream(export_rows(issues)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="issues-{timezone.now():%Y%m%d}.{extension}"'
+        return response
+
      #viewing Issue statistics 
-class RegisterCountView(generics.ListAPIView):
+class RegisterCountView(ReplicaReadMixin, generics.ListAPIView):
     permission_classes=[IsAuthenticated]
 
     def list(self,request):
         if request.user.role == "registrar":
-            total_issues = Issue.objects.count()
-            resolved_issues = Issue.objects.filter(status="resolved").count()
-            pending_issues = Issue.objects.filter(status="pending").count()
+            stats = get_issue_statistics()
             return Response({
-            "total_issues":total_issues,
-            "resolved_issues":resolved_issues,
-            "pending_issues":pending_issues
+            "total_issues":stats["total_issues"],
+            "resolved_issues":stats["resolved_issues"],
+            "pending_issues":stats["pending_issues"]
         })
 
 
+#full breakdown for the registrar dashboard, served from the cache
+class IssueStatisticsView(APIView):
+    permission_classes=[IsAuthenticated]
+
+    def get(self,request):
+        if request.user.role != "registrar":
+            return Response({'error': 'Only registrars can view issue statistics'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(get_issue_statistics())
+
+
 
         
+#lecturer workloads for the registrar, kept by users/workload.py
+class LecturerWorkloadView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = LecturerWorkloadSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None  # one row per lecturer
+
+    def get_queryset(self):
+        workloads = LecturerWorkload.objects.select_related('lecturer').order_by('department', 'open_issues', 'lecturer')
+        department = self.request.query_params.get('department')
+        if department:
+            workloads = workloads.filter(department=department)
+        return workloads
+
+    def list(self, request):
+        if request.user.role != 'registrar':
+            return Response({'error': 'Only registrars can view lecturer workloads'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({
+            'lecturers': self.get_serializer(self.get_queryset(), many=True).data,
+            'departments': department_workloads(),
+        })
+
+
+#notification inbox, written when issues are assigned or resolved (users/notifications.py)
+class NotificationListView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        notifications = Notification.objects.filter(recipient=self.request.user)
+        if self.request.query_params.get('unread') in ('1', 'true'):
+            notifications = notifications.filter(is_read=False)
+        return notifications
+
+
+class NotificationUnreadCountView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Read from the counter row, not counted
+        return Response({'unread': unread_count(request.user)})
+
+
+class NotificationReadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request, pk):
+        notification = get_object_or_404(Notification, pk=pk, recipient=request.user)
+        mark_read(request.user, [notification.pk])
+        return Response({'id': notification.pk, 'is_read': True, 'unread': unread_count(request.user)})
+
+
+class NotificationBulkReadView(APIView):
+    """
+    Marks many notifications read in one request: {"ids": [...]} for some,
+    {"all": true} for the whole inbox.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.data.get('all') is True:
+            notification_ids = None
+        else:
+            notification_ids = request.data.get('ids')
+            if not isinstance(notification_ids, list) or not notification_ids:
+                return Response({'error': 'ids must be a non-empty list, or send "all": true'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                notification_ids = [int(notification_id) for notification_id in notification_ids]
+            except (ValueError, TypeError):
+                return Response({'error': 'Notification IDs must be valid integers'}, status=status.HTTP_400_BAD_REQUEST)
+        marked = mark_read(request.user, notification_ids)
+        return Response({'marked': marked, 'unread': unread_count(request.user)})
+
+
 #Functionality of lecture dashboard
-class LecturerAssignedIssuesView(generics.ListAPIView):
+class LecturerAssignedIssuesView(ReplicaReadMixin, ConditionalIssueListMixin, SparseFieldsMixin, generics.ListAPIView):
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('created_at', 'id')
 
     def get_queryset(self):
-        return Issue.objects.filter(assigned_to=self.request.user).order_by('created_at')
-class LecturerIssueDetailView(generics.RetrieveAPIView):
+        return Issue.objects.with_related().filter(assigned_to=self.request.user).order_by('created_at')
+class LecturerIssueDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Issue.objects.filter(assigned_to=self.request.user)
+        return Issue.objects.with_related().filter(assigned_to=self.request.user)
     
-class LecturerPendingIssuesView(generics.ListAPIView):
+class LecturerPendingIssuesView(ReplicaReadMixin, SparseFieldsMixin, generics.ListAPIView):
         serializer_class = IssueSerializer
         permission_classes = [IsAuthenticated]
         
         def get_queryset(self):
-            return Issue.objects.filter(assigned_to=self.request.user).order_by('-created_at')
+            return Issue.objects.with_related().filter(assigned_to=self.request.user).order_by('-created_at')
     
-class LecturerResolvedIssuesView(generics.ListAPIView):
+class LecturerResolvedIssuesView(ReplicaReadMixin, SparseFieldsMixin, generics.ListAPIView):
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ('resolved_at', 'id')
 
     def get_queryset(self):
-        return Issue.objects.filter(assigned_to=self.request.user, status='resolved').order_by('resolved_at')       
+        return Issue.objects.with_related().filter(assigned_to=self.request.user, status='resolved').order_by('resolved_at')       
     def notify_lecturer(issue):
         lecturer = issue.assigned_to
         if lecturer and lecturer.email:
-            send_mail(
+            queue_mail(
                 subject="New Issue Assigned",
                 message=f"Dear {lecturer.first_name}, a new issue titled '{issue.title}' has been assigned to you.",
-                from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=[lecturer.email],
-                fail_silently=False,
             )
 
-class UsersView(generics.ListAPIView):
+class UsersView(ReplicaReadMixin, generics.ListAPIView):
      serializer_class = UserSerializer
      permission_classes = [IsAuthenticated]
+     cursor_ordering = ('id',)
  
      def get_queryset(self):
          return User.objects.all()
      
-class DebugRequestView(APIView):
-    """
-    A simple view that echoes back request data for debugging purposes.
-    """
+#profiles recorded by ProfilingMiddleware (users/profiling.py), for registrars and staff
+class RequestProfileListView(ReplicaReadMixin, generics.ListAPIView):
+    serializer_class = RequestProfileSerializer
     permission_classes = [IsAuthenticated]
-    
-    def post(self, request, *args, **kwargs):
-        return Response({
-            'headers': dict(request.headers),
-            'method': request.method,
-            'path': request.path,
-            'data': request.data,
-            'query_params': request.query_params,
-            'user': request.user.username
-        }, status=status.HTTP_200_OK)
+
+    def get_queryset(self):
+        profiles = RequestProfile.objects.defer('stacks')
+        if self.request.query_params.get('view'):
+            profiles = profiles.filter(view=self.request.query_params['view'])
+        return profiles
+
+    def list(self, request, *args, **kwargs):
+        if not can_profile(request.user):
+            return Response({'error': 'Only registrars and staff can view profiles'}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+
+
+class RequestProfileDownloadView(APIView):
+    # The collapsed stacks, ready for flamegraph.pl or speedscope
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        if not can_profile(request.user):
+            return Response({'error': 'Only registrars and staff can view profiles'}, status=status.HTTP_403_FORBIDDEN)
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        response = HttpResponse(profile.stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{profile.view}-{profile.id}.folded"'
+        return response
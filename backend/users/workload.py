@@ -0,0 +1,195 @@
+# users/workload.py
+import heapq
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Issue, LecturerProfile, LecturerWorkload
+
+
+# Lecturer workloads. Every issue_lifecycle batch (users/signals.py) moves
+# the counters of the lecturers involved with one UPDATE, so nothing
+# counts issues to show the registrar who is busy or to pick a lecturer for
+# auto-assignment. A lecturer without a row gets one counted from their
+# issues the first time they are touched; the rebuild_workloads command
+# recounts everyone, for changes made around the signals (queryset
+# update() and delete(), issues unassigned or reopened by hand).
+
+
+def week_start():
+    today = timezone.localdate()
+    return today - timedelta(days=today.weekday())
+
+
+def contribution(lecturer_id, status):
+    # What one issue adds to its lecturer's counters
+    if not lecturer_id or status == 'resolved':
+        return Counter()
+    return Counter(open_issues=1, in_progress=int(status == 'in_progress'))
+
+
+def workload_deltas(changes):
+    """
+    Counter changes per lecturer id for an issue_lifecycle batch: each issue
+    leaves the counters it was in before the change and joins the ones it is
+    in now.
+    """
+    deltas = defaultdict(Counter)
+    seen = set()
+    for kind, issue, previous_assigned_to in changes:
+        if kind == 'resolved' and issue.assigned_to_id:
+            deltas[issue.assigned_to_id]['resolved'] += 1
+        if issue.pk in seen:
+            continue
+        seen.add(issue.pk)
+        before = contribution(previous_assigned_to, issue._previous_state.get('status'))
+        after = contribution(issue.assigned_to_id, issue.status)
+        for lecturer_id, counts, sign in ((previous_assigned_to, before, -1), (issue.assigned_to_id, after, 1)):
+            for field, n in counts.items():
+                deltas[lecturer_id][field] += sign * n
+    return deltas
+
+
+def change_workloads(deltas):
+    """
+    Adds deltas[lecturer_id] (a Counter of open_issues, in_progress and
+    resolved) to each lecturer's row with a single UPDATE, counting the row
+    from scratch where there isn't one yet.
+    """
+    deltas = {lecturer_id: delta for lecturer_id, delta in deltas.items() if lecturer_id and any(delta.values())}
+    if not deltas:
+        return
+    week = week_start()
+
+    def per_lecturer(field):
+        return Case(
+            *[When(lecturer_id=lecturer_id, then=Value(delta[field])) for lecturer_id, delta in deltas.items()],
+            default=Value(0), output_field=IntegerField(),
+        )
+
+    changes = {
+        'open_issues': Greatest(F('open_issues') + per_lecturer('open_issues'), 0),
+        'in_progress': Greatest(F('in_progress') + per_lecturer('in_progress'), 0),
+    }
+    resolved = [lecturer_id for lecturer_id, delta in deltas.items() if delta['resolved']]
+    if resolved:
+        # A lecturer's first resolution of a new week restarts their count
+        changes['resolved_week_count'] = Case(
+            When(lecturer_id__in=resolved, resolved_week=week, then=F('resolved_week_count') + per_lecturer('resolved')),
+            When(lecturer_id__in=resolved, then=per_lecturer('resolved')),
+            default=F('resolved_week_count'), output_field=IntegerField(),
+        )
+        changes['resolved_week'] = Case(When(lecturer_id__in=resolved, then=Value(week)), default=F('resolved_week'))
+    workloads = LecturerWorkload.objects.filter(lecturer_id__in=deltas)
+    if workloads.update(**changes) < len(deltas):
+        # Counted after the change, so the deltas are already in
+        refresh_workloads(set(deltas) - set(workloads.values_list('lecturer_id', flat=True)))
+
+
+def refresh_workloads(lecturer_ids=None):
+    """
+    Counts the workload of the given lecturers (every lecturer when None)
+    from their issues and writes it. Returns (lecturers, rows that were
+    missing or wrong).
+    """
+    week = week_start()
+    since = timezone.make_aware(datetime.combine(week, time.min))
+    profiles = LecturerProfile.objects.all()
+    issues = Issue.objects.filter(assigned_to__isnull=False)
+    if lecturer_ids is not None:
+        profiles = profiles.filter(user_id__in=lecturer_ids)
+        issues = issues.filter(assigned_to__in=lecturer_ids)
+    counts = {
+        row['assigned_to']: row for row in issues.order_by().values('assigned_to').annotate(
+            open_issues=Count('pk', filter=~Q(status='resolved')),
+            in_progress=Count('pk', filter=Q(status='in_progress')),
+            resolved=Count('pk', filter=Q(status='resolved', resolved_at__gte=since)),
+        )
+    }
+    workloads = []
+    for lecturer_id, department in profiles.values_list('user_id', 'department'):
+        row = counts.get(lecturer_id, {})
+        workloads.append(LecturerWorkload(
+            lecturer_id=lecturer_id,
+            department=department,
+            open_issues=row.get('open_issues', 0),
+            in_progress=row.get('in_progress', 0),
+            resolved_week=week,
+            resolved_week_count=row.get('resolved', 0),
+        ))
+
+    existing = LecturerWorkload.objects.all()
+    if lecturer_ids is not None:
+        existing = existing.filter(lecturer_id__in=lecturer_ids)
+    current = {
+        workload.lecturer_id: (workload.department, workload.open_issues, workload.in_progress, workload.resolved_this_week)
+        for workload in existing
+    }
+    corrected = sum(
+        current.get(workload.lecturer_id) != (workload.department, workload.open_issues, workload.in_progress,
+                                              workload.resolved_week_count)
+        for workload in workloads
+    )
+    with transaction.atomic():
+        # Rows of users who are no longer lecturers
+        existing.exclude(lecturer_id__in=[workload.lecturer_id for workload in workloads]).delete()
+        LecturerWorkload.objects.bulk_create(
+            workloads, batch_size=500, update_conflicts=True, unique_fields=['lecturer'],
+            update_fields=['department', 'open_issues', 'in_progress', 'resolved_week', 'resolved_week_count'],
+        )
+    return len(workloads), corrected
+
+
+def department_workloads():
+    # Totals per department, summed over the lecturer rows
+    week = week_start()
+    return list(
+        LecturerWorkload.objects.order_by('department').values('department').annotate(
+            lecturers=Count('lecturer'),
+            open_issues=Sum('open_issues'),
+            in_progress=Sum('in_progress'),
+            resolved_this_week=Sum('resolved_week_count', filter=Q(resolved_week=week), default=0),
+        )
+    )
+
+
+def issue_department(issue):
+    # The lecturer department that handles the programme of the issue's student
+    profile = getattr(issue.submitted_by, 'student_profile', None)
+    return getattr(settings, 'AUTO_ASSIGN_DEPARTMENTS', {}).get(profile.programme) if profile else None
+
+
+class LeastLoaded:
+    """
+    Hands out the least loaded active lecturer of a department, one issue at
+    a time. The first call for a department reads its `wanted` least loaded
+    rows in index order (department, open_issues, lecturer), which are the
+    only ones that can be picked while handing out `wanted` issues; after
+    that each pick is a heap pop and push. Rows are locked until the
+    transaction ends, so concurrent auto-assignments queue per department.
+    """
+
+    def __init__(self, wanted):
+        self.wanted = wanted
+        self.heaps = {}
+
+    def pick(self, department):
+        heap = self.heaps.get(department)
+        if heap is None:
+            # Already sorted, which is a valid heap
+            heap = self.heaps[department] = list(
+                LecturerWorkload.objects.select_for_update(of=('self',))
+                .filter(department=department, lecturer__is_active=True)
+                .order_by('open_issues', 'lecturer')
+                .values_list('open_issues', 'lecturer')[:self.wanted[department]]
+            )
+        if not heap:
+            return None
+        load, lecturer_id = heap[0]
+        heapq.heapreplace(heap, (load + 1, lecturer_id))
+        return lecturer_id